@@ -15,6 +15,7 @@ from faker import Faker
 from PIL import Image, ImageDraw, ImageFont  # Requer Pillow instalado
 
 from reservaapp.models import CentroEsportivo, EspacoEsportivo, Agenda, Reserva, Pagamento
+from reservaapp.estatisticas import reconstruir_estatisticas
 
 fake = Faker('pt_BR')
 User = get_user_model()
@@ -283,6 +284,9 @@ def run():
     agendas = criar_agendas(espacos)
     criar_reservas(agendas, organizadores)
 
+    # As reservas foram criadas direto no banco, então as estatísticas pré-agregadas são recalculadas
+    reconstruir_estatisticas()
+
     print("\n✅ POPULAÇÃO CONCLUÍDA COM SUCESSO!")
     print("------------------------------------------------")
     print(f"Centros criados: {len(centros)}")
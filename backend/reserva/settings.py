@@ -114,6 +114,28 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # transações IMMEDIATE pegam o lock de escrita no BEGIN e esperam até "timeout"
+        # segundos, em vez de falhar com "database is locked" quando duas reservas
+        # disputam o mesmo horário
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
+        # banco de testes em arquivo para que os testes de concorrência usem conexões reais
+        "TEST": {
+            "NAME": BASE_DIR / "test_db.sqlite3",
+        },
+    }
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# em memória por processo; com vários workers use um cache compartilhado (ex.: Redis)
+# para que a invalidação da disponibilidade valha para todos
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
 
@@ -167,6 +189,7 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    "DEFAULT_PAGINATION_CLASS": "reservaapp.pagination.PaginacaoPadrao",
 }
 
 SIMPLE_JWT = {
@@ -176,6 +199,18 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# duração do bloqueio temporário de um horário durante a reserva (pode ser prorrogado uma vez)
+RESERVA_BLOQUEIO_DURACAO = timedelta(minutes=10)
+
+# prazo para pagar uma reserva pendente antes de ela ser cancelada pelo comando expirar_reservas
+RESERVA_PRAZO_PAGAMENTO = timedelta(minutes=30)
+
+# tempo máximo em cache (segundos) do snapshot de horários disponíveis de um espaço/dia
+RESERVA_DISPONIBILIDADE_CACHE_TIMEOUT = 300
+
+# tempo em cache (segundos) das contagens por faceta de cada combinação de filtros
+RESERVA_FACETAS_CACHE_TIMEOUT = 30
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ReservaappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reservaapp'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,155 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+from .geo import invalidar_celulas
+from .models import (
+    NOTAS,
+    RESERVAS_AVALIADAS,
+    CentroEsportivo,
+    EspacoEsportivo,
+    Reserva,
+)
+
+# sufixo das colunas do resumo (soma_<campo>, avaliacoes_<campo>) de cada nota
+CAMPOS = [nota.removeprefix("nota_") for nota in NOTAS]
+SEM_NOTAS = (None,) * len(NOTAS)
+
+
+def _avaliada(notas):
+    return any(nota is not None for nota in notas)
+
+
+# média de todas as notas já com as diferenças aplicadas. o UPDATE lê os valores antigos
+# da linha em todas as expressões, então a média sai consistente com as somas novas
+def _media_atualizada(soma, avaliacoes):
+    soma_total = Value(soma)
+    avaliacoes_total = Value(avaliacoes)
+    for campo in CAMPOS:
+        soma_total = soma_total + F(f"soma_{campo}")
+        avaliacoes_total = avaliacoes_total + F(f"avaliacoes_{campo}")
+    return Coalesce(
+        Round(Cast(soma_total, FloatField()) / NullIf(avaliacoes_total, Value(0)), 1),
+        Value(0),
+        output_field=DecimalField(max_digits=2, decimal_places=1),
+    )
+
+
+# incrementos (F()) que levam o resumo das notas anteriores para as novas
+def _alteracoes(anteriores, novas):
+    alteracoes = {}
+    soma_total = avaliacoes_total = 0
+    for campo, antes, depois in zip(CAMPOS, anteriores, novas):
+        soma = (depois or 0) - (antes or 0)
+        avaliacoes = (depois is not None) - (antes is not None)
+        if soma:
+            alteracoes[f"soma_{campo}"] = F(f"soma_{campo}") + soma
+        if avaliacoes:
+            alteracoes[f"avaliacoes_{campo}"] = F(f"avaliacoes_{campo}") + avaliacoes
+        soma_total += soma
+        avaliacoes_total += avaliacoes
+
+    total = _avaliada(novas) - _avaliada(anteriores)
+    if total:
+        alteracoes["total_avaliacoes"] = F("total_avaliacoes") + total
+    if soma_total or avaliacoes_total:
+        alteracoes["media_avaliacao"] = _media_atualizada(soma_total, avaliacoes_total)
+    return alteracoes
+
+
+# aplica ao centro e ao espaço da reserva a diferença entre as notas anteriores e as novas:
+# um UPDATE em cada, sem reler as reservas
+def registrar_avaliacao(centro_id, espaco_id, anteriores, novas):
+    alteracoes = _alteracoes(anteriores, novas)
+    if not alteracoes:
+        return
+
+    with transaction.atomic():
+        CentroEsportivo.objects.filter(pk=centro_id).update(**alteracoes)
+        EspacoEsportivo.objects.filter(pk=espaco_id).update(**alteracoes)
+    # o mapa mostra o centro mais bem avaliado de cada célula
+    if "media_avaliacao" in alteracoes:
+        invalidar_celulas()
+
+
+# espaço movido para outro centro: o resumo dele (as notas das suas reservas) sai do centro
+# anterior e entra no novo, um UPDATE em cada
+def mover_resumo_do_espaco(espaco_id, centro_anterior, centro_novo):
+    colunas = ["total_avaliacoes"] + [
+        coluna
+        for campo in CAMPOS
+        for coluna in (f"soma_{campo}", f"avaliacoes_{campo}")
+    ]
+    with transaction.atomic():
+        resumo = EspacoEsportivo.objects.filter(pk=espaco_id).values(*colunas).get()
+        if not resumo["total_avaliacoes"]:
+            return
+        soma = sum(resumo[f"soma_{campo}"] for campo in CAMPOS)
+        avaliacoes = sum(resumo[f"avaliacoes_{campo}"] for campo in CAMPOS)
+        for centro, sinal in ((centro_anterior, -1), (centro_novo, 1)):
+            alteracoes = {
+                coluna: F(coluna) + sinal * resumo[coluna] for coluna in colunas
+            }
+            alteracoes["media_avaliacao"] = _media_atualizada(
+                sinal * soma, sinal * avaliacoes
+            )
+            CentroEsportivo.objects.filter(pk=centro).update(**alteracoes)
+    invalidar_celulas()
+
+
+def _media(resumo):
+    soma = sum(resumo[f"soma_{campo}"] for campo in CAMPOS)
+    avaliacoes = sum(resumo[f"avaliacoes_{campo}"] for campo in CAMPOS)
+    if not avaliacoes:
+        return Decimal("0")
+    return (Decimal(soma) / avaliacoes).quantize(Decimal("0.1"), ROUND_HALF_UP)
+
+
+def _reconstruir(modelo, agrupamento, tamanho_lote):
+    agregacoes = {"total_avaliacoes": Count("id", filter=RESERVAS_AVALIADAS)}
+    for campo, nota in zip(CAMPOS, NOTAS):
+        agregacoes[f"soma_{campo}"] = Coalesce(Sum(nota), 0)
+        agregacoes[f"avaliacoes_{campo}"] = Count(nota)
+    colunas = list(agregacoes) + ["media_avaliacao"]
+
+    resumos = (
+        Reserva.objects.filter(RESERVAS_AVALIADAS)
+        .values(agrupamento)
+        .annotate(**agregacoes)
+        .order_by()
+    )
+    atualizados = 0
+    lote = []
+    for resumo in resumos.iterator(chunk_size=tamanho_lote):
+        objeto = modelo(pk=resumo[agrupamento], media_avaliacao=_media(resumo))
+        for coluna in agregacoes:
+            setattr(objeto, coluna, resumo[coluna])
+        lote.append(objeto)
+        if len(lote) >= tamanho_lote:
+            modelo.objects.bulk_update(lote, colunas)
+            atualizados += len(lote)
+            lote = []
+    modelo.objects.bulk_update(lote, colunas)
+    return atualizados + len(lote)
+
+
+# zera e recalcula os resumos de avaliação de todos os centros e espaços a partir das
+# reservas, com uma consulta agrupada e bulk_update em lotes para cada modelo
+def reconstruir_avaliacoes(tamanho_lote=1000):
+    zerado = {
+        coluna: 0
+        for campo in CAMPOS
+        for coluna in (f"soma_{campo}", f"avaliacoes_{campo}")
+    }
+    zerado.update(total_avaliacoes=0, media_avaliacao=0)
+    com_avaliacao = ~Q(total_avaliacoes=0) | ~Q(media_avaliacao=0)
+
+    with transaction.atomic():
+        CentroEsportivo.objects.filter(com_avaliacao).update(**zerado)
+        EspacoEsportivo.objects.filter(com_avaliacao).update(**zerado)
+        centros = _reconstruir(CentroEsportivo, "centro_esportivo", tamanho_lote)
+        espacos = _reconstruir(EspacoEsportivo, "espacoesportivo", tamanho_lote)
+    invalidar_celulas()
+    return centros, espacos
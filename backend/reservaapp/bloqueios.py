@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .disponibilidade import invalidar_disponibilidade
+from .exceptions import HorarioIndisponivel
+from .models import BloqueioAgenda
+
+
+# bloqueios ainda válidos de outros organizadores, que impedem a reserva do horário
+def bloqueios_de_terceiros(organizador, agora=None):
+    agora = agora or timezone.now()
+    return BloqueioAgenda.objects.filter(expira_em__gt=agora).exclude(
+        organizador=organizador
+    )
+
+
+# segura o horário para o organizador por RESERVA_BLOQUEIO_DURACAO. se o próprio organizador
+# já tem o bloqueio ele é devolvido; se outro organizador tem um bloqueio válido, é conflito
+def bloquear_agenda(agenda, organizador):
+    agora = timezone.now()
+    if agenda.status != "ativo":
+        raise HorarioIndisponivel()
+
+    with transaction.atomic():
+        # um bloqueio vencido que o sweeper ainda não apagou não segura mais o horário
+        BloqueioAgenda.objects.filter(agenda=agenda, expira_em__lte=agora).delete()
+
+        existente = BloqueioAgenda.objects.filter(agenda=agenda).first()
+        if existente is not None:
+            if existente.organizador_id != organizador.id:
+                raise HorarioIndisponivel()
+            return existente, False
+
+        try:
+            with transaction.atomic():
+                bloqueio = BloqueioAgenda.objects.create(
+                    agenda=agenda,
+                    organizador=organizador,
+                    expira_em=agora + settings.RESERVA_BLOQUEIO_DURACAO,
+                )
+        except IntegrityError:
+            # outro organizador criou o bloqueio entre a consulta e o insert
+            raise HorarioIndisponivel()
+    # o horário bloqueado sai da disponibilidade (o snapshot novo expira junto com o bloqueio)
+    invalidar_disponibilidade(agenda.espacoesportivo_id, agenda.dia)
+    return bloqueio, True
+
+
+# prorroga um bloqueio válido por mais RESERVA_BLOQUEIO_DURACAO, uma única vez. o UPDATE
+# condicional garante que duas prorrogações simultâneas não passem as duas
+def prorrogar_bloqueio(bloqueio_id, organizador):
+    agora = timezone.now()
+    prorrogados = BloqueioAgenda.objects.filter(
+        pk=bloqueio_id,
+        organizador=organizador,
+        prorrogado=False,
+        expira_em__gt=agora,
+    ).update(expira_em=agora + settings.RESERVA_BLOQUEIO_DURACAO, prorrogado=True)
+    if not prorrogados:
+        return None
+    return BloqueioAgenda.objects.get(pk=bloqueio_id)
+
+
+# apaga de uma vez todos os bloqueios vencidos (um único DELETE usando o índice de expira_em)
+def liberar_bloqueios_expirados():
+    apagados, _ = BloqueioAgenda.objects.filter(expira_em__lte=timezone.now()).delete()
+    return apagados
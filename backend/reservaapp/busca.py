@@ -0,0 +1,199 @@
+import re
+
+from django.db import connection as conexao_padrao
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import CentroEsportivo
+
+# índice de busca textual dos centros: um documento por centro com nome, descrição, cidade
+# e nomes dos espaços. no SQLite é uma tabela virtual FTS5 (rowid = id do centro) e no
+# PostgreSQL uma tabela com tsvector (índice GIN) e o texto sem acentos (índice de
+# trigramas). outros bancos caem no icontains. a tabela fica fora dos models porque a
+# estrutura muda conforme o banco
+TABELA = "reservaapp_busca_centro"
+
+# quantos centros, no máximo, uma busca ranqueada devolve
+MAXIMO_RESULTADOS = 1000
+
+SQL_SQLITE = {
+    "criar": [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA} USING fts5("
+        "nome, descricao, cidade, espacos, tokenize = 'unicode61 remove_diacritics 2')",
+    ],
+    "apagar_tabela": [f"DROP TABLE IF EXISTS {TABELA}"],
+    "remover": f"DELETE FROM {TABELA} WHERE rowid = %s",
+    "limpar": f"DELETE FROM {TABELA}",
+    "inserir": f"""
+        INSERT INTO {TABELA} (rowid, nome, descricao, cidade, espacos)
+        SELECT c.id, c.nome, c.descricao, c.cidade, COALESCE((
+            SELECT group_concat(e.nome, ' ') FROM reservaapp_espacoesportivo e
+            WHERE e.centro_esportivo_id = c.id
+        ), '')
+        FROM reservaapp_centroesportivo c
+    """,
+    # pesos do bm25 na ordem das colunas: nome, descrição, cidade, espaços
+    "buscar": f"""
+        SELECT rowid FROM {TABELA} WHERE {TABELA} MATCH %s
+        ORDER BY bm25({TABELA}, 10.0, 1.0, 2.0, 4.0), rowid LIMIT %s
+    """,
+    "filtrar": f"SELECT rowid FROM {TABELA} WHERE {TABELA} MATCH %s",
+}
+
+SQL_POSTGRES = {
+    "criar": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE EXTENSION IF NOT EXISTS unaccent",
+        f"""CREATE TABLE IF NOT EXISTS {TABELA} (
+            centro_id bigint PRIMARY KEY
+                REFERENCES reservaapp_centroesportivo (id) ON DELETE CASCADE,
+            texto text NOT NULL,
+            documento tsvector NOT NULL
+        )""",
+        f"CREATE INDEX IF NOT EXISTS {TABELA}_documento_idx ON {TABELA} USING GIN (documento)",
+        f"CREATE INDEX IF NOT EXISTS {TABELA}_texto_idx ON {TABELA} USING GIN (texto gin_trgm_ops)",
+    ],
+    "apagar_tabela": [f"DROP TABLE IF EXISTS {TABELA}"],
+    "remover": f"DELETE FROM {TABELA} WHERE centro_id = %s",
+    "limpar": f"DELETE FROM {TABELA}",
+    # pesos A-D: nome, espaços, cidade, descrição
+    "inserir": f"""
+        INSERT INTO {TABELA} (centro_id, texto, documento)
+        SELECT c.id,
+            lower(unaccent(concat_ws(' ', c.nome, esp.nomes, c.cidade, c.descricao))),
+            setweight(to_tsvector('simple', unaccent(c.nome)), 'A')
+            || setweight(to_tsvector('simple', unaccent(coalesce(esp.nomes, ''))), 'B')
+            || setweight(to_tsvector('simple', unaccent(c.cidade)), 'C')
+            || setweight(to_tsvector('simple', unaccent(c.descricao)), 'D')
+        FROM reservaapp_centroesportivo c
+        LEFT JOIN LATERAL (
+            SELECT string_agg(e.nome, ' ') AS nomes FROM reservaapp_espacoesportivo e
+            WHERE e.centro_esportivo_id = c.id
+        ) esp ON true
+    """,
+    # o termo entra duas vezes: como tsquery com prefixo e como texto para os trigramas,
+    # que acham nomes com erro de digitação
+    "buscar": f"""
+        SELECT centro_id FROM {TABELA}, to_tsquery('simple', unaccent(%s)) consulta
+        WHERE documento @@ consulta OR lower(unaccent(%s)) <%% texto
+        ORDER BY ts_rank(documento, consulta) + word_similarity(lower(unaccent(%s)), texto) DESC,
+            centro_id
+        LIMIT %s
+    """,
+    "filtrar": f"""
+        SELECT centro_id FROM {TABELA}
+        WHERE documento @@ to_tsquery('simple', unaccent(%s)) OR lower(unaccent(%s)) <%% texto
+    """,
+}
+
+SQL_POR_BANCO = {"sqlite": SQL_SQLITE, "postgresql": SQL_POSTGRES}
+
+
+def _sql(conexao):
+    return SQL_POR_BANCO.get(conexao.vendor)
+
+
+# palavras do termo digitado; só letras e dígitos, então não há como injetar operadores
+def _palavras(termo):
+    return re.findall(r"\w+", termo.lower())
+
+
+# parâmetros da consulta no formato de cada banco, com busca por prefixo em cada palavra
+# (o usuário ainda está digitando a última)
+def _parametros(conexao, palavras):
+    if conexao.vendor == "sqlite":
+        return [" ".join(f'"{palavra}"*' for palavra in palavras)]
+    return [" & ".join(f"{palavra}:*" for palavra in palavras), " ".join(palavras)]
+
+
+def criar_indice(conexao=conexao_padrao):
+    sql = _sql(conexao)
+    if sql is None:
+        return
+    with conexao.cursor() as cursor:
+        for comando in sql["criar"]:
+            cursor.execute(comando)
+
+
+def apagar_indice(conexao=conexao_padrao):
+    sql = _sql(conexao)
+    if sql is None:
+        return
+    with conexao.cursor() as cursor:
+        for comando in sql["apagar_tabela"]:
+            cursor.execute(comando)
+
+
+# recria todos os documentos do índice a partir das tabelas de centros e espaços
+def reconstruir_indice(conexao=conexao_padrao):
+    sql = _sql(conexao)
+    if sql is None:
+        return
+    with conexao.cursor() as cursor:
+        cursor.execute(sql["limpar"])
+        cursor.execute(sql["inserir"])
+
+
+# atualiza o documento de um centro; chamado pelos signals de CentroEsportivo e
+# EspacoEsportivo (o centro apagado só sai do índice)
+def indexar_centro(centro_id, conexao=conexao_padrao):
+    sql = _sql(conexao)
+    if sql is None:
+        return
+    with conexao.cursor() as cursor:
+        cursor.execute(sql["remover"], [centro_id])
+        cursor.execute(sql["inserir"] + " WHERE c.id = %s", [centro_id])
+
+
+def remover_centro(centro_id, conexao=conexao_padrao):
+    sql = _sql(conexao)
+    if sql is None:
+        return
+    with conexao.cursor() as cursor:
+        cursor.execute(sql["remover"], [centro_id])
+
+
+# ids dos centros que casam com o termo, do mais relevante para o menos relevante
+def buscar_centros(termo, limite=MAXIMO_RESULTADOS, conexao=conexao_padrao):
+    palavras = _palavras(termo)
+    if not palavras:
+        return []
+
+    sql = _sql(conexao)
+    if sql is None:
+        return list(
+            filtrar_centros(CentroEsportivo.objects.all(), termo)
+            .order_by("nome", "id")
+            .values_list("id", flat=True)[:limite]
+        )
+
+    parametros = _parametros(conexao, palavras)
+    if conexao.vendor == "postgresql":
+        parametros = [parametros[0], parametros[1], parametros[1]]
+    with conexao.cursor() as cursor:
+        cursor.execute(sql["buscar"], parametros + [limite])
+        return [linha[0] for linha in cursor.fetchall()]
+
+
+# restringe um queryset de centros aos que casam com o termo, sem ranquear (para combinar
+# com os outros filtros da listagem)
+def filtrar_centros(queryset, termo, conexao=conexao_padrao):
+    palavras = _palavras(termo)
+    if not palavras:
+        return queryset
+
+    sql = _sql(conexao)
+    if sql is None:
+        filtro = Q()
+        for palavra in palavras:
+            filtro &= (
+                Q(nome__icontains=palavra)
+                | Q(descricao__icontains=palavra)
+                | Q(cidade__icontains=palavra)
+                | Q(espacos__nome__icontains=palavra)
+            )
+        return queryset.filter(filtro).distinct()
+
+    return queryset.filter(
+        id__in=RawSQL(sql["filtrar"], _parametros(conexao, palavras))
+    )
@@ -0,0 +1,172 @@
+import hashlib
+import json
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Agenda, BloqueioAgenda, EspacoEsportivo
+from .serializers import HorarioDisponivelSerializer
+
+
+def chave_disponibilidade(espaco_id, dia):
+    return f"disponibilidade:{espaco_id}:{dia.isoformat()}"
+
+
+# descarta os snapshots dos pares (espaço, dia); chamado pelos signals de Agenda e Reserva
+# e explicitamente pelos caminhos que atualizam em lote (queryset.update não dispara
+# signals). apaga de novo no commit para que uma leitura concorrente não deixe em cache o
+# estado anterior à transação
+def invalidar_disponibilidade_em_lote(pares):
+    chaves = [chave_disponibilidade(espaco_id, dia) for espaco_id, dia in pares]
+    if not chaves:
+        return
+    cache.delete_many(chaves)
+    transaction.on_commit(lambda: cache.delete_many(chaves))
+
+
+def invalidar_disponibilidade(espaco_id, dia):
+    invalidar_disponibilidade_em_lote([(espaco_id, dia)])
+
+
+# maior intervalo aceito pela disponibilidade por período (um mês)
+MAXIMO_DIAS_INTERVALO = 31
+
+# máximo de espaços por consulta de disponibilidade em lote
+MAXIMO_ESPACOS_LOTE = 100
+
+
+def _periodo(hora_inicio):
+    if time(5, 0) <= hora_inicio < time(12, 0):
+        return "manha"
+    if time(12, 0) <= hora_inicio < time(18, 0):
+        return "tarde"
+    return "noite"
+
+
+# agendas que podem ser reservadas: ativas, sem reserva paga e sem bloqueio válido
+def agendas_livres(agora=None):
+    return (
+        Agenda.objects.filter(status="ativo")
+        .exclude(reserva__status="pago")
+        .exclude(bloqueio__expira_em__gt=agora or timezone.now())
+    )
+
+
+# separa em manhã/tarde/noite, numa única passada, linhas vindas de .values() e já
+# ordenadas por horário. cada horário sai no formato do HorarioDisponivelSerializer,
+# formatado direto pelos campos dele em vez de um serializer por linha
+def agrupar_por_periodo(linhas):
+    campos = HorarioDisponivelSerializer().fields
+    horarios = {"manha": [], "tarde": [], "noite": []}
+    for linha in linhas:
+        horarios[_periodo(linha["h_inicial"])].append(
+            {
+                nome: campo.to_representation(linha[nome])
+                for nome, campo in campos.items()
+            }
+        )
+    return horarios
+
+
+def _valores_horario(agendas):
+    return agendas.values(*HorarioDisponivelSerializer.Meta.fields)
+
+
+def _snapshot(horarios):
+    conteudo = json.dumps(horarios, cls=DjangoJSONEncoder, sort_keys=True)
+    return {
+        "horarios": horarios,
+        "etag": '"%s"' % hashlib.md5(conteudo.encode()).hexdigest(),
+    }
+
+
+# horários livres de vários espaços no dia, agrupados em manhã/tarde/noite, com o ETag de
+# cada um. devolve {espaco_id: snapshot} só com os espaços que existem. os snapshots já em
+# cache vêm de um get_many; os que faltam saem de uma única consulta de agendas para todos
+# os espaços e ficam em cache até serem invalidados ou até o bloqueio temporário mais
+# próximo daquele espaço vencer, quando o horário bloqueado volta a ficar livre. a
+# existência do espaço só é conferida sem snapshot: apagá-lo apaga as agendas e os
+# signals invalidam
+def horarios_disponiveis_em_lote(espaco_ids, dia):
+    chaves = {
+        chave_disponibilidade(espaco_id, dia): espaco_id for espaco_id in espaco_ids
+    }
+    snapshots = {
+        chaves[chave]: snapshot for chave, snapshot in cache.get_many(chaves).items()
+    }
+    faltando = [espaco_id for espaco_id in espaco_ids if espaco_id not in snapshots]
+    if not faltando:
+        return snapshots
+
+    existentes = set(
+        EspacoEsportivo.objects.filter(pk__in=faltando).values_list("id", flat=True)
+    )
+    if not existentes:
+        return snapshots
+
+    agora = timezone.now()
+    linhas_por_espaco = {espaco_id: [] for espaco_id in existentes}
+    linhas = (
+        agendas_livres(agora)
+        .filter(espacoesportivo_id__in=existentes, dia=dia)
+        .values(*HorarioDisponivelSerializer.Meta.fields, "espacoesportivo_id")
+        .order_by("h_inicial")
+    )
+    for linha in linhas:
+        linhas_por_espaco[linha["espacoesportivo_id"]].append(linha)
+
+    vencimentos = dict(
+        BloqueioAgenda.objects.filter(
+            agenda__espacoesportivo_id__in=existentes,
+            agenda__dia=dia,
+            expira_em__gt=agora,
+        )
+        .values_list("agenda__espacoesportivo_id")
+        .annotate(proximo=Min("expira_em"))
+        .order_by()
+    )
+
+    for espaco_id, linhas_espaco in linhas_por_espaco.items():
+        snapshot = _snapshot(agrupar_por_periodo(linhas_espaco))
+        timeout = settings.RESERVA_DISPONIBILIDADE_CACHE_TIMEOUT
+        if espaco_id in vencimentos:
+            segundos = int((vencimentos[espaco_id] - agora).total_seconds()) + 1
+            timeout = min(timeout, segundos)
+        cache.set(chave_disponibilidade(espaco_id, dia), snapshot, timeout)
+        snapshots[espaco_id] = snapshot
+    return snapshots
+
+
+# snapshot de um único espaço (None se o espaço não existe)
+def horarios_disponiveis(espaco_id, dia):
+    return horarios_disponiveis_em_lote([espaco_id], dia).get(espaco_id)
+
+
+# horários livres do espaço em cada dia de inicio a fim (inclusive), agrupados por dia e
+# período, a partir de uma única consulta ordenada por dia e horário (None se o espaço
+# não existe). dias sem horário livre aparecem com os períodos vazios
+def horarios_disponiveis_intervalo(espaco_id, inicio, fim):
+    if not EspacoEsportivo.objects.filter(pk=espaco_id).exists():
+        return None
+
+    linhas = _valores_horario(
+        agendas_livres().filter(
+            espacoesportivo_id=espaco_id, dia__gte=inicio, dia__lte=fim
+        )
+    ).order_by("dia", "h_inicial")
+
+    por_dia = {}
+    for linha in linhas:
+        por_dia.setdefault(linha["dia"], []).append(linha)
+
+    dias = {}
+    dia = inicio
+    while dia <= fim:
+        dias[dia.isoformat()] = agrupar_por_periodo(por_dia.get(dia, []))
+        dia += timedelta(days=1)
+    return dias
@@ -0,0 +1,325 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+
+from .models import Agenda, EstatisticaDiaria, Reserva
+
+# coluna da EstatisticaDiaria que conta as reservas de cada status
+CAMPO_POR_STATUS = {
+    "pendente": "pendentes",
+    "pago": "pagas",
+    "cancelada": "canceladas",
+}
+
+
+# chave da linha da estatística de uma agenda: o espaço, o dia e o horário reais dela
+def _chave(agenda):
+    return {
+        "espacoesportivo_id": agenda.espacoesportivo_id,
+        "dia": agenda.dia,
+        "h_inicial": agenda.h_inicial,
+        "h_final": agenda.h_final,
+    }
+
+
+# busca (ou cria) a linha da estatística do horário da agenda
+def _linha_da_agenda(agenda):
+    espaco = agenda.espacoesportivo
+    linha, _ = EstatisticaDiaria.objects.get_or_create(
+        **_chave(agenda),
+        defaults={
+            "centro_esportivo_id": espaco.centro_esportivo_id,
+            "categoria": espaco.categoria,
+        },
+    )
+    return linha
+
+
+# atualiza os contadores quando uma reserva muda de status (status_anterior=None na criação).
+# os incrementos usam F() para não perder atualizações concorrentes na mesma linha
+def registrar_mudanca_status(reserva, status_anterior, status_novo):
+    if status_anterior == status_novo:
+        return
+
+    agenda = reserva.agenda
+    alteracoes = {}
+    if status_anterior in CAMPO_POR_STATUS:
+        campo = CAMPO_POR_STATUS[status_anterior]
+        alteracoes[campo] = F(campo) - 1
+    if status_novo in CAMPO_POR_STATUS:
+        campo = CAMPO_POR_STATUS[status_novo]
+        alteracoes[campo] = F(campo) + 1
+    if status_anterior == "pago":
+        alteracoes["arrecadacao"] = F("arrecadacao") - agenda.preco
+    if status_novo == "pago":
+        alteracoes["arrecadacao"] = F("arrecadacao") + agenda.preco
+
+    with transaction.atomic():
+        linha = _linha_da_agenda(agenda)
+        EstatisticaDiaria.objects.filter(pk=linha.pk).update(**alteracoes)
+
+
+# soma o valor de um pagamento registrado ao horário da reserva
+def registrar_pagamento(pagamento):
+    with transaction.atomic():
+        linha = _linha_da_agenda(pagamento.reserva.agenda)
+        EstatisticaDiaria.objects.filter(pk=linha.pk).update(
+            valor_recebido=F("valor_recebido") + pagamento.valor
+        )
+
+
+# desconta da linha do horário uma reserva ou pagamento que deixou de existir. só faz o
+# UPDATE: se o espaço ou o centro estão sendo apagados a linha sai junto em cascata e não
+# há o que descontar (nem deve ser recriada)
+def _descontar(agenda, **alteracoes):
+    EstatisticaDiaria.objects.filter(**_chave(agenda)).update(**alteracoes)
+
+
+# tira o valor de um pagamento apagado, ou o valor antigo de um pagamento alterado
+def remover_pagamento(agenda, valor):
+    _descontar(agenda, valor_recebido=F("valor_recebido") - valor)
+
+
+# tira a reserva apagada (direto ou em cascata com a agenda) do contador do seu status
+def remover_reserva(reserva):
+    campo = CAMPO_POR_STATUS.get(reserva.status)
+    if campo is None:
+        return
+    alteracoes = {campo: F(campo) - 1}
+    if reserva.status == "pago":
+        alteracoes["arrecadacao"] = F("arrecadacao") - reserva.agenda.preco
+    _descontar(reserva.agenda, **alteracoes)
+
+
+# move os contadores das reservas da agenda da linha do horário anterior (uma Agenda não
+# salva com o espaço, dia, horário e preço de antes) para a do horário atual. a arrecadação
+# sai e entra pelo preço anterior, como foi somada; a troca de preço de uma agenda paga
+# continua precisando do reconstruir_estatisticas
+def mover_agenda(agenda, anterior):
+    if _chave(anterior) == _chave(agenda):
+        return
+    totais = Reserva.objects.filter(agenda=agenda).aggregate(
+        **{
+            campo: Count("id", filter=Q(status=status_reserva))
+            for status_reserva, campo in CAMPO_POR_STATUS.items()
+        },
+        valor_recebido=Coalesce(
+            Sum("pagamento__valor"),
+            Value(Decimal("0")),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+    if not any(totais[campo] for campo in CAMPO_POR_STATUS.values()):
+        return
+    totais["arrecadacao"] = totais["pagas"] * anterior.preco
+
+    with transaction.atomic():
+        _descontar(
+            anterior, **{campo: F(campo) - valor for campo, valor in totais.items()}
+        )
+        linha = _linha_da_agenda(agenda)
+        EstatisticaDiaria.objects.filter(pk=linha.pk).update(
+            **{campo: F(campo) + valor for campo, valor in totais.items()}
+        )
+
+
+# passa de pendentes para canceladas as reservas do queryset, em lote: uma consulta
+# agrupada por horário e um UPDATE por linha da EstatisticaDiaria afetada
+def registrar_expiracao(reservas):
+    grupos = (
+        reservas.values(
+            "agenda__espacoesportivo",
+            "agenda__dia",
+            "agenda__h_inicial",
+            "agenda__h_final",
+        )
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for grupo in grupos:
+        EstatisticaDiaria.objects.filter(
+            espacoesportivo_id=grupo["agenda__espacoesportivo"],
+            dia=grupo["agenda__dia"],
+            h_inicial=grupo["agenda__h_inicial"],
+            h_final=grupo["agenda__h_final"],
+        ).update(
+            pendentes=F("pendentes") - grupo["total"],
+            canceladas=F("canceladas") + grupo["total"],
+        )
+
+
+# apaga e recalcula todas as estatísticas a partir das reservas, em lotes. os contadores
+# acompanham as views e os signals de exclusão; mudanças feitas fora deles (UPDATE direto no
+# banco, queryset.update() em reservas ou pagamentos, alteração do preço de uma agenda já
+# paga) só entram depois de rodar o comando reconstruir_estatisticas
+def reconstruir_estatisticas(tamanho_lote=1000):
+    zero = Value(Decimal("0"))
+    agrupado = (
+        Reserva.objects.values(
+            "agenda__espacoesportivo",
+            "agenda__espacoesportivo__centro_esportivo",
+            "agenda__espacoesportivo__categoria",
+            "agenda__dia",
+            "agenda__h_inicial",
+            "agenda__h_final",
+        )
+        .annotate(
+            total_pendentes=Count("id", filter=Q(status="pendente")),
+            total_pagas=Count("id", filter=Q(status="pago")),
+            total_canceladas=Count("id", filter=Q(status="cancelada")),
+            total_arrecadacao=Coalesce(
+                Sum("agenda__preco", filter=Q(status="pago")),
+                zero,
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            total_recebido=Coalesce(
+                Sum("pagamento__valor"),
+                zero,
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+        .order_by()
+    )
+
+    criadas = 0
+    with transaction.atomic():
+        EstatisticaDiaria.objects.all().delete()
+        lote = []
+        for linha in agrupado.iterator(chunk_size=tamanho_lote):
+            lote.append(
+                EstatisticaDiaria(
+                    espacoesportivo_id=linha["agenda__espacoesportivo"],
+                    centro_esportivo_id=linha[
+                        "agenda__espacoesportivo__centro_esportivo"
+                    ],
+                    categoria=linha["agenda__espacoesportivo__categoria"],
+                    dia=linha["agenda__dia"],
+                    h_inicial=linha["agenda__h_inicial"],
+                    h_final=linha["agenda__h_final"],
+                    pendentes=linha["total_pendentes"],
+                    pagas=linha["total_pagas"],
+                    canceladas=linha["total_canceladas"],
+                    arrecadacao=linha["total_arrecadacao"],
+                    valor_recebido=linha["total_recebido"],
+                )
+            )
+            if len(lote) >= tamanho_lote:
+                EstatisticaDiaria.objects.bulk_create(lote)
+                criadas += len(lote)
+                lote = []
+        EstatisticaDiaria.objects.bulk_create(lote)
+        criadas += len(lote)
+    return criadas
+
+
+# granularidades aceitas pela série temporal e a função de truncamento da data no banco
+TRUNCAMENTOS = {
+    "dia": None,
+    "semana": TruncWeek,
+    "mes": TruncMonth,
+}
+
+
+# maior intervalo (em dias) aceito pela série em cada granularidade: um ano de dias, cinco
+# de semanas e dez de meses, no máximo algumas centenas de períodos por resposta
+MAXIMO_DIAS_SERIE = {
+    "dia": 366,
+    "semana": 5 * 366,
+    "mes": 10 * 366,
+}
+
+
+# início do período (dia, segunda-feira da semana ou primeiro dia do mês) de uma data
+def _inicio_periodo(dia, granularidade):
+    if granularidade == "semana":
+        return dia - timedelta(days=dia.weekday())
+    if granularidade == "mes":
+        return dia.replace(day=1)
+    return dia
+
+
+# início do período seguinte, ou None se ele passaria de date.max (ano 9999)
+def _proximo_periodo(dia, granularidade):
+    try:
+        if granularidade == "semana":
+            return dia + timedelta(days=7)
+        if granularidade == "mes":
+            return date(dia.year + dia.month // 12, dia.month % 12 + 1, 1)
+        return dia + timedelta(days=1)
+    except (OverflowError, ValueError):
+        return None
+
+
+def _agrupar_por_periodo(queryset, granularidade, **agregacoes):
+    truncamento = TRUNCAMENTOS[granularidade]
+    periodo = F("dia") if truncamento is None else truncamento("dia")
+    return {
+        linha["periodo"]: linha
+        for linha in queryset.values(periodo=periodo).annotate(**agregacoes).order_by()
+    }
+
+
+# série de reservas, arrecadação e ocupação do gerente entre inicio e fim, em formato
+# colunar (listas paralelas). são duas consultas agrupadas no banco: uma na
+# EstatisticaDiaria e outra na Agenda para o total de horários ofertados
+def serie_temporal(gerente, inicio, fim, granularidade, centro=None, espaco=None):
+    estatisticas = EstatisticaDiaria.objects.filter(
+        centro_esportivo__gerente=gerente, dia__gte=inicio, dia__lte=fim
+    )
+    agendas = Agenda.objects.filter(
+        espacoesportivo__centro_esportivo__gerente=gerente,
+        dia__gte=inicio,
+        dia__lte=fim,
+    )
+    if centro is not None:
+        estatisticas = estatisticas.filter(centro_esportivo=centro)
+        agendas = agendas.filter(espacoesportivo__centro_esportivo=centro)
+    if espaco is not None:
+        estatisticas = estatisticas.filter(espacoesportivo=espaco)
+        agendas = agendas.filter(espacoesportivo=espaco)
+
+    reservas_por_periodo = _agrupar_por_periodo(
+        estatisticas,
+        granularidade,
+        pendentes=Sum("pendentes"),
+        pagas=Sum("pagas"),
+        canceladas=Sum("canceladas"),
+        arrecadacao=Sum("arrecadacao"),
+    )
+    ofertados_por_periodo = _agrupar_por_periodo(
+        agendas, granularidade, ofertados=Count("id")
+    )
+
+    serie = {
+        "granularidade": granularidade,
+        "periodos": [],
+        "reservas": [],
+        "pagas": [],
+        "canceladas": [],
+        "arrecadacao": [],
+        "horarios_ofertados": [],
+        "ocupacao": [],
+    }
+    periodo = _inicio_periodo(inicio, granularidade)
+    while periodo is not None and periodo <= fim:
+        linha = reservas_por_periodo.get(periodo, {})
+        pendentes = linha.get("pendentes") or 0
+        pagas = linha.get("pagas") or 0
+        canceladas = linha.get("canceladas") or 0
+        ofertados = ofertados_por_periodo.get(periodo, {}).get("ofertados", 0)
+
+        serie["periodos"].append(periodo.isoformat())
+        serie["reservas"].append(pendentes + pagas + canceladas)
+        serie["pagas"].append(pagas)
+        serie["canceladas"].append(canceladas)
+        serie["arrecadacao"].append(linha.get("arrecadacao") or Decimal("0"))
+        serie["horarios_ofertados"].append(ofertados)
+        # ocupação = horários com reserva ativa (pendente ou paga) / horários ofertados
+        serie["ocupacao"].append(
+            round((pendentes + pagas) / ofertados, 4) if ofertados else None
+        )
+        periodo = _proximo_periodo(periodo, granularidade)
+    return serie
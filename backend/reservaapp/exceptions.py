@@ -0,0 +1,9 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+# conflito na reserva: outra requisição levou o horário primeiro
+class HorarioIndisponivel(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Horário não está disponível para reserva."
+    default_code = "horario_indisponivel"
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .disponibilidade import invalidar_disponibilidade_em_lote
+from .estatisticas import registrar_expiracao
+from .precos import marcar_precos
+from .models import Agenda, Reserva
+
+
+# cancela as reservas pendentes criadas há mais de RESERVA_PRAZO_PAGAMENTO e libera os
+# horários delas. os lotes são lidos pelo índice (status, criado_em) e tanto as reservas
+# quanto as agendas são atualizadas com um UPDATE por lote, sem salvar objeto por objeto
+def expirar_reservas_pendentes(tamanho_lote=500):
+    expiradas = 0
+    while True:
+        agora = timezone.now()
+        limite = agora - settings.RESERVA_PRAZO_PAGAMENTO
+
+        with transaction.atomic():
+            # reservas com pagamento enviado esperam a confirmação do gerente e não
+            # expiram; skip_locked só pula as linhas travadas por outra transação agora
+            lote = list(
+                Reserva.objects.select_for_update(skip_locked=True, of=("self",))
+                .filter(status="pendente", criado_em__lt=limite, pagamento__isnull=True)
+                .order_by("criado_em")
+                .values_list(
+                    "id", "agenda_id", "agenda__espacoesportivo_id", "agenda__dia"
+                )[:tamanho_lote]
+            )
+            if not lote:
+                break
+
+            ids = [linha[0] for linha in lote]
+            agendas = {linha[1] for linha in lote}
+            reservas = Reserva.objects.filter(id__in=ids)
+
+            registrar_expiracao(reservas)
+            reservas.update(status="cancelada", cancelar_reserva=agora)
+            Agenda.objects.filter(id__in=agendas, status="indisponível").update(
+                status="ativo"
+            )
+            invalidar_disponibilidade_em_lote({linha[2:] for linha in lote})
+            marcar_precos(espacos={linha[2] for linha in lote})
+
+        expiradas += len(lote)
+    return expiradas
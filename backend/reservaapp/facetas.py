@@ -0,0 +1,50 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, Value
+
+# campos agrupados nas facetas da busca de centros: nome da faceta -> caminho no centro
+CAMPOS_FACETAS = {
+    "UF": "UF",
+    "cidade": "cidade",
+    "categoria": "espacos__categoria",
+}
+
+
+# contagem de centros por UF, cidade e categoria de espaço do queryset já filtrado. as três
+# contagens agrupadas são unidas com UNION ALL e saem numa única consulta
+def contar_facetas(queryset):
+    base = queryset.order_by()
+    partes = [
+        base.filter(**{f"{caminho}__isnull": False})
+        .values(valor=F(caminho))
+        .annotate(
+            faceta=Value(nome, output_field=CharField()),
+            total=Count("id", distinct=True),
+        )
+        .values("faceta", "valor", "total")
+        for nome, caminho in CAMPOS_FACETAS.items()
+    ]
+
+    facetas = {nome: [] for nome in CAMPOS_FACETAS}
+    for linha in partes[0].union(*partes[1:], all=True):
+        facetas[linha["faceta"]].append(
+            {"valor": linha["valor"], "total": linha["total"]}
+        )
+    for valores in facetas.values():
+        valores.sort(key=lambda item: (-item["total"], item["valor"]))
+    return facetas
+
+
+# mesma contagem com cache curto por combinação de filtros (os parâmetros ordenados viram a
+# chave), já que buscas repetidas são comuns e um atraso de alguns segundos é aceitável
+def contar_facetas_em_cache(queryset, parametros):
+    combinacao = urlencode(sorted(parametros.lists()), doseq=True)
+    chave = "facetas:" + hashlib.md5(combinacao.encode()).hexdigest()
+    facetas = cache.get(chave)
+    if facetas is None:
+        facetas = contar_facetas(queryset)
+        cache.set(chave, facetas, settings.RESERVA_FACETAS_CACHE_TIMEOUT)
+    return facetas
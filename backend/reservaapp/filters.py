@@ -1,14 +1,26 @@
 import django_filters
+from django.db.models import Exists, OuterRef
+from .busca import filtrar_centros
 from .models import CentroEsportivo, EspacoEsportivo, Agenda, Reserva
 
+# categorias separadas por vírgula, no formato gravado no banco (minúsculas, sem espaços)
+def normalizar_categorias(valor):
+    return [categoria.strip().lower() for categoria in valor.split(',') if categoria.strip()]
+
 class CentroEsportivoFilter(django_filters.FilterSet):
     nome = django_filters.CharFilter(field_name='nome', lookup_expr='icontains')
     cidade = django_filters.CharFilter(field_name='cidade', lookup_expr='icontains')
     categoria_espaco = django_filters.CharFilter(
         method='filtrar_por_categoria_do_espaco',
-        label="Filtrar por categoria do espaço (ex: futebol, vôlei)"
+        label="Filtrar por categoria do espaço (ex: futebol ou futebol,futsal)"
     )
     UF = django_filters.CharFilter(field_name='UF', lookup_expr='iexact')
+    busca = django_filters.CharFilter(
+        method='filtrar_por_busca',
+        label="Busca textual por nome, descrição, cidade e nomes dos espaços"
+    )
+    preco_min = django_filters.NumberFilter(field_name='preco_minimo_ativo', lookup_expr='gte')
+    preco_max = django_filters.NumberFilter(field_name='preco_minimo_ativo', lookup_expr='lte')
 
 
     class Meta:
@@ -16,13 +28,23 @@ class CentroEsportivoFilter(django_filters.FilterSet):
         fields = ['nome', 'cidade', 'UF']
 
     def filtrar_por_categoria_do_espaco(self, queryset, name, value): #isso vai buscar os espaços dentro do centro
-        if value:
-            return queryset.filter(espacos__categoria__iexact=value).distinct()
-        return queryset 
+        # aceita várias categorias (?categoria_espaco=futebol,futsal) e usa um EXISTS no
+        # índice (categoria, centro_esportivo) em vez de join + distinct
+        categorias = normalizar_categorias(value)
+        if categorias:
+            return queryset.filter(
+                Exists(EspacoEsportivo.objects.filter(centro_esportivo=OuterRef('pk'), categoria__in=categorias))
+            )
+        return queryset
+
+    def filtrar_por_busca(self, queryset, name, value): # usa o índice de busca textual em vez de icontains
+        return filtrar_centros(queryset, value)
 
 class EspacoEsportivoFilter(django_filters.FilterSet):
     nome = django_filters.CharFilter(field_name='nome', lookup_expr='icontains')
     categoria = django_filters.CharFilter(field_name='categoria', lookup_expr='icontains')
+    preco_min = django_filters.NumberFilter(field_name='preco_minimo_ativo', lookup_expr='gte')
+    preco_max = django_filters.NumberFilter(field_name='preco_minimo_ativo', lookup_expr='lte')
 
     class Meta:
         model = EspacoEsportivo
@@ -33,6 +55,21 @@ class AgendaFilter(django_filters.FilterSet):
         model = Agenda
         fields = ['status', 'dia', 'espacoesportivo']
 
+# busca de horários livres em todos os espaços; o dia é obrigatório para a consulta partir
+# do índice (dia, status, h_inicial) da agenda
+class BuscaHorariosFilter(django_filters.FilterSet):
+    dia = django_filters.DateFilter(field_name='dia', required=True)
+    cidade = django_filters.CharFilter(field_name='espacoesportivo__centro_esportivo__cidade', lookup_expr='iexact')
+    UF = django_filters.CharFilter(field_name='espacoesportivo__centro_esportivo__UF', lookup_expr='iexact')
+    categoria = django_filters.CharFilter(field_name='espacoesportivo__categoria', lookup_expr='iexact')
+    h_inicio = django_filters.TimeFilter(field_name='h_inicial', lookup_expr='gte')
+    h_fim = django_filters.TimeFilter(field_name='h_final', lookup_expr='lte')
+    preco_max = django_filters.NumberFilter(field_name='preco', lookup_expr='lte')
+
+    class Meta:
+        model = Agenda
+        fields = ['dia', 'cidade', 'UF', 'categoria', 'h_inicio', 'h_fim', 'preco_max']
+
 class DashboardFilter(django_filters.FilterSet):
     status = django_filters.CharFilter(field_name='status', lookup_expr='iexact')
     organizador = django_filters.CharFilter(field_name='organizador__nome_completo', lookup_expr='icontains')
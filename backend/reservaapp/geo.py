@@ -0,0 +1,156 @@
+import math
+
+from django.core.cache import cache
+
+from .models import CentroEsportivo
+
+RAIO_TERRA_KM = 6371.0088
+
+# raio da primeira tentativa da busca pelos k mais próximos sem raio informado; a cada
+# tentativa sem resultados suficientes o raio dobra até cobrir o planeta
+RAIO_INICIAL_KM = 10
+RAIO_MAXIMO_KM = math.pi * RAIO_TERRA_KM
+
+
+# distância em km entre dois pontos pela fórmula de haversine
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * RAIO_TERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# retângulo (lat_min, lat_max, lon_min, lon_max) que contém o círculo de raio_km em volta
+# do ponto. perto dos polos ou cruzando o antimeridiano a longitude não é limitada (None)
+def caixa_envolvente(lat, lon, raio_km):
+    delta_lat = math.degrees(raio_km / RAIO_TERRA_KM)
+    lat_min, lat_max = lat - delta_lat, lat + delta_lat
+    if lat_min <= -90 or lat_max >= 90:
+        return max(lat_min, -90), min(lat_max, 90), None, None
+
+    delta_lon = math.degrees(
+        math.asin(
+            min(1.0, math.sin(raio_km / RAIO_TERRA_KM) / math.cos(math.radians(lat)))
+        )
+    )
+    lon_min, lon_max = lon - delta_lon, lon + delta_lon
+    if lon_min < -180 or lon_max > 180:
+        return lat_min, lat_max, None, None
+    return lat_min, lat_max, lon_min, lon_max
+
+
+# (distância, id) dos centros dentro do raio, do mais perto para o mais longe. o retângulo
+# envolvente vira um filtro por faixa no índice (latitude, longitude) e só as linhas dentro
+# dele são ordenadas pela distância exata
+def _distancias(lat, lon, raio_km):
+    lat_min, lat_max, lon_min, lon_max = caixa_envolvente(lat, lon, raio_km)
+    candidatos = CentroEsportivo.objects.filter(
+        latitude__gte=lat_min, latitude__lte=lat_max
+    )
+    if lon_min is not None:
+        candidatos = candidatos.filter(longitude__gte=lon_min, longitude__lte=lon_max)
+
+    distancias = []
+    for centro_id, latitude, longitude in candidatos.values_list(
+        "id", "latitude", "longitude"
+    ):
+        distancia = haversine_km(lat, lon, float(latitude), float(longitude))
+        if distancia <= raio_km:
+            distancias.append((distancia, centro_id))
+    distancias.sort()
+    return distancias
+
+
+# até k centros mais próximos do ponto, como lista de (distância_km, id). sem raio, a busca
+# começa com RAIO_INICIAL_KM e dobra o raio até achar k centros ou cobrir o planeta
+def centros_proximos(lat, lon, k, raio_km=None):
+    if raio_km is not None:
+        return _distancias(lat, lon, raio_km)[:k]
+
+    raio_km = RAIO_INICIAL_KM
+    while True:
+        distancias = _distancias(lat, lon, raio_km)
+        if len(distancias) >= k or raio_km >= RAIO_MAXIMO_KM:
+            return distancias[:k]
+        raio_km *= 2
+
+
+# agrupamento dos centros no mapa: a cada zoom o mundo vira uma grade de células de
+# 360 / (2^zoom * CELULAS_POR_BLOCO) graus (cerca de 64px num mapa de blocos de 256px)
+CELULAS_POR_BLOCO = 4
+MAXIMO_ZOOM = 20
+
+
+def tamanho_celula(zoom):
+    return 360 / (2**zoom * CELULAS_POR_BLOCO)
+
+
+def celula(lat, lon, zoom):
+    tamanho = tamanho_celula(zoom)
+    return math.floor((lon + 180) / tamanho), math.floor((lat + 90) / tamanho)
+
+
+def chave_celulas(zoom):
+    return f"mapa:celulas:{zoom}"
+
+
+# descarta as células de todos os zooms; chamado pelos signals de CentroEsportivo
+def invalidar_celulas():
+    cache.delete_many([chave_celulas(zoom) for zoom in range(MAXIMO_ZOOM + 1)])
+
+
+# {(x, y): grupo} de um zoom, com total de centros, centróide e o centro mais bem avaliado
+# de cada célula. calculado numa passada sobre todos os centros e guardado em cache até
+# algum centro mudar, então mover o mapa só lê o cache
+def celulas_do_zoom(zoom):
+    celulas = cache.get(chave_celulas(zoom))
+    if celulas is not None:
+        return celulas
+
+    somas = {}
+    for centro in CentroEsportivo.objects.values(
+        "id", "nome", "latitude", "longitude", "media_avaliacao"
+    ).order_by("id"):
+        lat, lon = float(centro["latitude"]), float(centro["longitude"])
+        grupo = somas.setdefault(celula(lat, lon, zoom), [0, 0.0, 0.0, None])
+        grupo[0] += 1
+        grupo[1] += lat
+        grupo[2] += lon
+        if grupo[3] is None or centro["media_avaliacao"] > grupo[3]["media_avaliacao"]:
+            grupo[3] = centro
+
+    celulas = {
+        posicao: {
+            "total": total,
+            "latitude": round(soma_lat / total, 6),
+            "longitude": round(soma_lon / total, 6),
+            "melhor_avaliado": melhor,
+        }
+        for posicao, (total, soma_lat, soma_lon, melhor) in somas.items()
+    }
+    cache.set(chave_celulas(zoom), celulas, None)
+    return celulas
+
+
+# grupos das células que cruzam o retângulo visível. percorre as posições da grade dentro
+# do retângulo (poucas, porque a tela tem tamanho fixo) ou, se houver mais posições que
+# células ocupadas, as células ocupadas
+def agrupar_no_mapa(lat_min, lat_max, lon_min, lon_max, zoom):
+    celulas = celulas_do_zoom(zoom)
+    x_min, y_min = celula(lat_min, lon_min, zoom)
+    x_max, y_max = celula(lat_max, lon_max, zoom)
+
+    if (x_max - x_min + 1) * (y_max - y_min + 1) <= len(celulas):
+        posicoes = (
+            (x, y)
+            for x in range(x_min, x_max + 1)
+            for y in range(y_min, y_max + 1)
+            if (x, y) in celulas
+        )
+    else:
+        posicoes = (
+            (x, y) for x, y in celulas if x_min <= x <= x_max and y_min <= y <= y_max
+        )
+    return [{"celula": f"{x}:{y}", **celulas[(x, y)]} for x, y in sorted(posicoes)]
@@ -0,0 +1,104 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reservaapp.filters import CentroEsportivoFilter
+from reservaapp.models import CentroEsportivo, CustomUser, EspacoEsportivo
+
+CATEGORIAS = [categoria for categoria, _ in EspacoEsportivo.CATEGORIA_CHOICES]
+
+
+class Rollback(Exception):
+    pass
+
+
+# compara o filtro de categoria antigo (join + distinct com iexact) com o EXISTS atual numa
+# massa de dados gerada dentro de uma transação que é desfeita no final
+class Command(BaseCommand):
+    help = (
+        "Mede o filtro de centros por categoria de espaço numa massa de dados gerada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--espacos",
+            type=int,
+            default=50000,
+            help="Quantidade de espaços gerados (10 por centro).",
+        )
+        parser.add_argument(
+            "--repeticoes",
+            type=int,
+            default=5,
+            help="Execuções de cada consulta; o resultado é a mediana.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.popular(options["espacos"])
+                self.medir(options["repeticoes"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    # bulk_create não dispara os signals, então a carga não mexe no índice de busca
+    def popular(self, quantidade):
+        gerente = CustomUser.objects.create_user(
+            email="benchmark.categoria@email.com",
+            username="benchmark.categoria",
+            tipo="gerente",
+            nome_completo="Gerente Benchmark",
+            cpf="00000000000",
+        )
+        centros = CentroEsportivo.objects.bulk_create(
+            CentroEsportivo(
+                nome=f"Centro Benchmark {i}",
+                descricao="Centro gerado para o benchmark",
+                latitude=Decimal("-5.79"),
+                longitude=Decimal("-35.21"),
+                cidade="Natal",
+                UF="RN",
+                gerente=gerente,
+            )
+            for i in range(max(1, quantidade // 10))
+        )
+        EspacoEsportivo.objects.bulk_create(
+            (
+                EspacoEsportivo(
+                    nome=f"Espaço {i}",
+                    categoria=CATEGORIAS[(i * 7 + i // 10) % len(CATEGORIAS)],
+                    centro_esportivo=centros[i // 10 % len(centros)],
+                )
+                for i in range(quantidade)
+            ),
+            batch_size=5000,
+        )
+        self.stdout.write(f"{len(centros)} centros e {quantidade} espaços gerados.")
+
+    def medir(self, repeticoes):
+        consultas = {
+            "join + distinct": lambda categoria: CentroEsportivo.objects.filter(
+                espacos__categoria__iexact=categoria
+            ).distinct(),
+            "exists": lambda categoria: CentroEsportivoFilter(
+                {"categoria_espaco": categoria},
+                queryset=CentroEsportivo.objects.all(),
+            ).qs,
+        }
+        for categoria in ("futebol", "futebol,futsal"):
+            for nome, consulta in consultas.items():
+                if nome == "join + distinct" and "," in categoria:
+                    continue
+                tempos = []
+                for _ in range(repeticoes):
+                    inicio = time.perf_counter()
+                    total = len(list(consulta(categoria)))
+                    tempos.append(time.perf_counter() - inicio)
+                self.stdout.write(
+                    f"{categoria:<16} {nome:<16} {total:>6} centros "
+                    f"{statistics.median(tempos) * 1000:>10.1f} ms"
+                )
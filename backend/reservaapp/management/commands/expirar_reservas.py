@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reservaapp.expiracao import expirar_reservas_pendentes
+
+
+# cancela as reservas pendentes com prazo de pagamento vencido; com --intervalo fica
+# rodando periodicamente
+class Command(BaseCommand):
+    help = (
+        "Cancela as reservas pendentes não pagas dentro do prazo e libera os horários."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tamanho-lote",
+            type=int,
+            default=500,
+            help="Quantidade de reservas canceladas por lote.",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=int,
+            default=0,
+            help="Segundos entre execuções. Se omitido, executa uma única vez.",
+        )
+
+    def handle(self, *args, **options):
+        intervalo = options["intervalo"]
+        while True:
+            expiradas = expirar_reservas_pendentes(tamanho_lote=options["tamanho_lote"])
+            self.stdout.write(self.style.SUCCESS(f"{expiradas} reservas expiradas."))
+            if not intervalo:
+                break
+            time.sleep(intervalo)
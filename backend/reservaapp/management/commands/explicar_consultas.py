@@ -0,0 +1,197 @@
+import re
+from datetime import date, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reservaapp.disponibilidade import agendas_livres
+from reservaapp.models import (
+    Agenda,
+    BloqueioAgenda,
+    CentroEsportivo,
+    EspacoEsportivo,
+    EstatisticaDiaria,
+    Reserva,
+)
+
+# linhas do plano que indicam leitura da tabela inteira: "SCAN tabela" no SQLite (sem
+# USING INDEX) e "Seq Scan on tabela" no PostgreSQL
+VARREDURA_SQLITE = re.compile(r"\bSCAN (\w+)(?!.*\bUSING\b)")
+VARREDURA_POSTGRES = re.compile(r"Seq Scan on (\w+)")
+
+
+# consulta principal de cada endpoint, montada como a view monta, com parâmetros fictícios.
+# o terceiro item são as tabelas que a consulta pode varrer (listagens paginadas percorrem
+# a tabela pela chave primária de propósito)
+def consultas():
+    hoje = date.today()
+    agora = timezone.now()
+    return [
+        (
+            "horarios_disponiveis",
+            Agenda.objects.filter(espacoesportivo_id=1, dia=hoje, status="ativo")
+            .exclude(reserva__status="pago")
+            .exclude(bloqueio__expira_em__gt=agora),
+            set(),
+        ),
+        (
+            "sobreposicao_agenda",
+            Agenda.objects.filter(
+                espacoesportivo_id=1,
+                dia=hoje,
+                h_inicial__lt=time(9, 0),
+                h_final__gt=time(8, 0),
+            ),
+            set(),
+        ),
+        (
+            "busca_horarios",
+            agendas_livres(agora)
+            .filter(
+                dia=hoje,
+                h_inicial__gte=time(18, 0),
+                espacoesportivo__categoria__iexact="futebol",
+                espacoesportivo__centro_esportivo__cidade__iexact="Natal",
+            )
+            .select_related("espacoesportivo__centro_esportivo")
+            .order_by("h_inicial", "id")[:50],
+            set(),
+        ),
+        (
+            "minhas_reservas",
+            Reserva.objects.filter(organizador_id=1).order_by("-id")[:50],
+            set(),
+        ),
+        (
+            "dashboard_gerente",
+            Reserva.objects.filter(gerente_id=1)
+            .select_related("organizador", "agenda__espacoesportivo", "pagamento")
+            .order_by("-id")[:50],
+            set(),
+        ),
+        (
+            "estatisticas_gerente",
+            EstatisticaDiaria.objects.filter(centro_esportivo__gerente_id=1),
+            set(),
+        ),
+        (
+            "estatisticas_reservas_pagas",
+            Reserva.objects.filter(gerente_id=1, status="pago").order_by("id")[:20],
+            set(),
+        ),
+        (
+            "reservas_expiradas",
+            Reserva.objects.filter(
+                status="pendente", criado_em__lt=agora, pagamento__isnull=True
+            ).order_by("criado_em")[:500],
+            set(),
+        ),
+        (
+            "bloqueios_expirados",
+            BloqueioAgenda.objects.filter(expira_em__lte=agora),
+            set(),
+        ),
+        (
+            "centros_proximos",
+            CentroEsportivo.objects.filter(
+                latitude__gte=-6.0,
+                latitude__lte=-5.6,
+                longitude__gte=-35.4,
+                longitude__lte=-35.0,
+            ).values_list("id", "latitude", "longitude"),
+            set(),
+        ),
+        (
+            "listagem_centros",
+            CentroEsportivo.objects.order_by("id")[:50],
+            {CentroEsportivo._meta.db_table},
+        ),
+        (
+            "listagem_espacos",
+            EspacoEsportivo.objects.com_centro_resumido().order_by("id")[:50],
+            {EspacoEsportivo._meta.db_table},
+        ),
+        (
+            "avaliacoes_centro",
+            Reserva.objects.filter(centro_esportivo_id=1, avaliado_em__isnull=False)
+            .select_related("organizador")
+            .order_by("-avaliado_em", "-id")[:20],
+            set(),
+        ),
+        (
+            "avaliacoes_espaco",
+            Reserva.objects.filter(espacoesportivo_id=1, avaliado_em__isnull=False)
+            .select_related("organizador")
+            .order_by("-avaliado_em", "-id")[:20],
+            set(),
+        ),
+        (
+            "centros_por_preco",
+            CentroEsportivo.objects.filter(
+                preco_minimo_ativo__gte=50, preco_minimo_ativo__lte=100
+            ).order_by("preco_minimo_ativo", "id")[:50],
+            set(),
+        ),
+        (
+            "centros_por_avaliacao",
+            CentroEsportivo.objects.order_by("-media_avaliacao", "-id")[:50],
+            set(),
+        ),
+        (
+            "espacos_por_preco",
+            EspacoEsportivo.objects.filter(
+                preco_minimo_ativo__gte=50, preco_minimo_ativo__lte=100
+            ).order_by("preco_minimo_ativo", "id")[:50],
+            set(),
+        ),
+    ]
+
+
+def varreduras(plano):
+    encontradas = []
+    for linha in plano.splitlines():
+        for padrao in (VARREDURA_SQLITE, VARREDURA_POSTGRES):
+            encontrada = padrao.search(linha)
+            if encontrada and encontrada.group(1) not in ("CONSTANT", "SUBQUERY"):
+                encontradas.append(encontrada.group(1))
+    return encontradas
+
+
+# roda EXPLAIN na consulta principal de cada endpoint e aponta as varreduras sequenciais
+class Command(BaseCommand):
+    help = "Mostra o plano das consultas principais e aponta varreduras sequenciais."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--estrito",
+            action="store_true",
+            help="Termina com erro se alguma consulta fizer varredura sequencial.",
+        )
+        parser.add_argument(
+            "--silencioso",
+            action="store_true",
+            help="Mostra apenas as consultas com varredura sequencial.",
+        )
+
+    def handle(self, *args, **options):
+        problemas = []
+        for nome, queryset, permitidas in consultas():
+            plano = queryset.explain()
+            tabelas = [t for t in varreduras(plano) if t not in permitidas]
+            if tabelas:
+                problemas.append(nome)
+            if tabelas or not options["silencioso"]:
+                self.stdout.write(self.style.MIGRATE_HEADING(nome))
+                self.stdout.write(plano)
+            for tabela in tabelas:
+                self.stdout.write(
+                    self.style.WARNING(f"varredura sequencial em {tabela}")
+                )
+
+        if not problemas:
+            self.stdout.write(self.style.SUCCESS("Nenhuma varredura sequencial."))
+            return
+        mensagem = "Varredura sequencial em: " + ", ".join(problemas)
+        if options["estrito"]:
+            raise CommandError(mensagem)
+        self.stdout.write(self.style.ERROR(mensagem))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reservaapp.bloqueios import liberar_bloqueios_expirados
+
+
+# apaga os bloqueios temporários vencidos; com --intervalo fica rodando periodicamente
+class Command(BaseCommand):
+    help = "Libera os horários com bloqueio temporário vencido."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--intervalo",
+            type=int,
+            default=0,
+            help="Segundos entre execuções. Se omitido, executa uma única vez.",
+        )
+
+    def handle(self, *args, **options):
+        intervalo = options["intervalo"]
+        while True:
+            liberados = liberar_bloqueios_expirados()
+            self.stdout.write(self.style.SUCCESS(f"{liberados} bloqueios liberados."))
+            if not intervalo:
+                break
+            time.sleep(intervalo)
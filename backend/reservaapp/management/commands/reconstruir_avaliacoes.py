@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from reservaapp.avaliacoes import reconstruir_avaliacoes
+
+
+# recalcula do zero os resumos de avaliação dos centros e espaços a partir das reservas
+class Command(BaseCommand):
+    help = (
+        "Reconstrói as somas, contagens e médias das avaliações dos centros e espaços."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tamanho-lote",
+            type=int,
+            default=1000,
+            help="Quantidade de registros atualizados por lote.",
+        )
+
+    def handle(self, *args, **options):
+        centros, espacos = reconstruir_avaliacoes(tamanho_lote=options["tamanho_lote"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Avaliações de {centros} centros e {espacos} espaços reconstruídas."
+            )
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reservaapp.busca import criar_indice, reconstruir_indice
+
+
+# recria do zero o índice de busca textual dos centros
+class Command(BaseCommand):
+    help = "Reconstrói o índice de busca textual dos centros esportivos."
+
+    def handle(self, *args, **options):
+        criar_indice()
+        reconstruir_indice()
+        self.stdout.write(self.style.SUCCESS("Índice de busca reconstruído."))
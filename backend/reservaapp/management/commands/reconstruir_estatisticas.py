@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from reservaapp.estatisticas import reconstruir_estatisticas
+
+
+# recalcula do zero a tabela EstatisticaDiaria a partir das reservas
+class Command(BaseCommand):
+    help = "Reconstrói as estatísticas diárias pré-agregadas a partir das reservas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tamanho-lote",
+            type=int,
+            default=1000,
+            help="Quantidade de linhas inseridas por lote.",
+        )
+
+    def handle(self, *args, **options):
+        criadas = reconstruir_estatisticas(tamanho_lote=options["tamanho_lote"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{criadas} linhas de estatísticas reconstruídas.")
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from reservaapp.precos import TAMANHO_LOTE, reconstruir_precos
+
+
+# recalcula do zero o preço mínimo ativo de todos os espaços e centros
+class Command(BaseCommand):
+    help = "Recalcula o preço mínimo ativo de todos os espaços e centros esportivos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tamanho-lote",
+            type=int,
+            default=TAMANHO_LOTE,
+            help="Quantidade de registros atualizados por UPDATE.",
+        )
+
+    def handle(self, *args, **options):
+        espacos, centros = reconstruir_precos(tamanho_lote=options["tamanho_lote"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Preços de {espacos} espaços e {centros} centros recalculados."
+            )
+        )
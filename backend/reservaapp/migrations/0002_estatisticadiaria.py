@@ -0,0 +1,72 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EstatisticaDiaria",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("categoria", models.CharField(max_length=100)),
+                ("dia", models.DateField()),
+                ("hora", models.PositiveSmallIntegerField()),
+                ("pendentes", models.IntegerField(default=0)),
+                ("pagas", models.IntegerField(default=0)),
+                ("canceladas", models.IntegerField(default=0)),
+                (
+                    "arrecadacao",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "valor_recebido",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "centro_esportivo",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="estatisticas",
+                        to="reservaapp.centroesportivo",
+                    ),
+                ),
+                (
+                    "espacoesportivo",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="estatisticas",
+                        to="reservaapp.espacoesportivo",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["centro_esportivo", "dia"],
+                        name="estatistica_centro_dia_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("espacoesportivo", "dia", "hora"),
+                        name="estatistica_diaria_unica",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0002_estatisticadiaria"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BloqueioAgenda",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("criado_em", models.DateTimeField(auto_now_add=True)),
+                ("expira_em", models.DateTimeField(db_index=True)),
+                ("prorrogado", models.BooleanField(default=False)),
+                (
+                    "agenda",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bloqueio",
+                        to="reservaapp.agenda",
+                    ),
+                ),
+                (
+                    "organizador",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bloqueios",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0003_bloqueioagenda"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(
+                fields=["status", "criado_em"], name="reserva_status_criado_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0004_reserva_status_criado_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="agenda",
+            index=models.Index(
+                fields=["espacoesportivo", "dia", "status"],
+                name="agenda_espaco_dia_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="agenda",
+            index=models.Index(
+                fields=["espacoesportivo", "dia", "h_inicial", "h_final"],
+                name="agenda_espaco_dia_horario_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(
+                fields=["organizador", "criado_em"],
+                name="reserva_organizador_criado_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0005_indices_agenda_reserva"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reserva",
+            name="centro_esportivo",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reservas",
+                to="reservaapp.centroesportivo",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reserva",
+            name="gerente",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reservas_recebidas",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(
+                fields=["gerente", "status"], name="reserva_gerente_status_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+from django.db.models import Max, OuterRef, Subquery
+
+TAMANHO_LOTE = 5000
+
+
+# preenche centro_esportivo e gerente das reservas existentes em faixas de id, cada faixa
+# com um único UPDATE (e sua própria transação, para não travar a tabela inteira)
+def preencher_centro_gerente(apps, schema_editor):
+    Agenda = apps.get_model('reservaapp', 'Agenda')
+    Reserva = apps.get_model('reservaapp', 'Reserva')
+
+    agenda = Agenda.objects.filter(pk=OuterRef('agenda_id'))
+    centro = Subquery(agenda.values('espacoesportivo__centro_esportivo')[:1])
+    gerente = Subquery(agenda.values('espacoesportivo__centro_esportivo__gerente')[:1])
+
+    ultimo = Reserva.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+    for inicio in range(0, ultimo + 1, TAMANHO_LOTE):
+        Reserva.objects.filter(
+            id__gte=inicio, id__lt=inicio + TAMANHO_LOTE, centro_esportivo__isnull=True
+        ).update(centro_esportivo=centro, gerente=gerente)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('reservaapp', '0006_reserva_centro_gerente'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_centro_gerente, migrations.RunPython.noop),
+    ]
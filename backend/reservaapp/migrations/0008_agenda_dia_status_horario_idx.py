@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0007_preencher_reserva_centro_gerente"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="agenda",
+            index=models.Index(
+                fields=["dia", "status", "h_inicial"],
+                name="agenda_dia_status_horario_idx",
+            ),
+        ),
+    ]
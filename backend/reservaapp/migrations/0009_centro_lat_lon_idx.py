@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0008_agenda_dia_status_horario_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="centroesportivo",
+            index=models.Index(
+                fields=["latitude", "longitude"], name="centro_lat_lon_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.db import migrations
+
+TABELA = 'reservaapp_busca_centro'
+
+# SQL congelado da criação do índice de busca textual (cópia do reservaapp.busca de quando
+# a migração foi escrita, para mudanças futuras no módulo não alterarem o que ela faz)
+SQL_POR_BANCO = {
+    'sqlite': {
+        'criar': [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA} USING fts5("
+            "nome, descricao, cidade, espacos, tokenize = 'unicode61 remove_diacritics 2')",
+        ],
+        'apagar_tabela': [f'DROP TABLE IF EXISTS {TABELA}'],
+        'inserir': f"""
+            INSERT INTO {TABELA} (rowid, nome, descricao, cidade, espacos)
+            SELECT c.id, c.nome, c.descricao, c.cidade, COALESCE((
+                SELECT group_concat(e.nome, ' ') FROM reservaapp_espacoesportivo e
+                WHERE e.centro_esportivo_id = c.id
+            ), '')
+            FROM reservaapp_centroesportivo c
+        """,
+    },
+    'postgresql': {
+        'criar': [
+            'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+            'CREATE EXTENSION IF NOT EXISTS unaccent',
+            f"""CREATE TABLE IF NOT EXISTS {TABELA} (
+                centro_id bigint PRIMARY KEY
+                    REFERENCES reservaapp_centroesportivo (id) ON DELETE CASCADE,
+                texto text NOT NULL,
+                documento tsvector NOT NULL
+            )""",
+            f'CREATE INDEX IF NOT EXISTS {TABELA}_documento_idx ON {TABELA} USING GIN (documento)',
+            f'CREATE INDEX IF NOT EXISTS {TABELA}_texto_idx ON {TABELA} USING GIN (texto gin_trgm_ops)',
+        ],
+        'apagar_tabela': [f'DROP TABLE IF EXISTS {TABELA}'],
+        'inserir': f"""
+            INSERT INTO {TABELA} (centro_id, texto, documento)
+            SELECT c.id,
+                lower(unaccent(concat_ws(' ', c.nome, esp.nomes, c.cidade, c.descricao))),
+                setweight(to_tsvector('simple', unaccent(c.nome)), 'A')
+                || setweight(to_tsvector('simple', unaccent(coalesce(esp.nomes, ''))), 'B')
+                || setweight(to_tsvector('simple', unaccent(c.cidade)), 'C')
+                || setweight(to_tsvector('simple', unaccent(c.descricao)), 'D')
+            FROM reservaapp_centroesportivo c
+            LEFT JOIN LATERAL (
+                SELECT string_agg(e.nome, ' ') AS nomes FROM reservaapp_espacoesportivo e
+                WHERE e.centro_esportivo_id = c.id
+            ) esp ON true
+        """,
+    },
+}
+
+
+# cria a tabela de busca textual do banco em uso (FTS5 no SQLite, tsvector e trigramas no
+# PostgreSQL) e indexa os centros existentes; outros bancos ficam sem índice
+def criar_indice_busca(apps, schema_editor):
+    sql = SQL_POR_BANCO.get(schema_editor.connection.vendor)
+    if sql is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for comando in sql['criar']:
+            cursor.execute(comando)
+        cursor.execute(sql['inserir'])
+
+
+def apagar_indice_busca(apps, schema_editor):
+    sql = SQL_POR_BANCO.get(schema_editor.connection.vendor)
+    if sql is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for comando in sql['apagar_tabela']:
+            cursor.execute(comando)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservaapp', '0009_centro_lat_lon_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_busca, apagar_indice_busca),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:16
+
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+# grava as categorias já existentes em minúsculas, como o save passa a fazer
+def normalizar_categorias(apps, schema_editor):
+    EspacoEsportivo = apps.get_model("reservaapp", "EspacoEsportivo")
+    normalizada = Lower(Trim("categoria"))
+    EspacoEsportivo.objects.exclude(categoria=normalizada).update(categoria=normalizada)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0010_indice_busca_centro"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalizar_categorias, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="espacoesportivo",
+            index=models.Index(
+                fields=["categoria", "centro_esportivo"],
+                name="espaco_categoria_centro_idx",
+            ),
+        ),
+    ]
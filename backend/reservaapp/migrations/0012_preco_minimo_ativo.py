@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0011_espaco_categoria_centro_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="centroesportivo",
+            name="preco_minimo_ativo",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, editable=False, max_digits=10, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="espacoesportivo",
+            name="preco_minimo_ativo",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, editable=False, max_digits=10, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="centroesportivo",
+            index=models.Index(
+                fields=["preco_minimo_ativo", "id"], name="centro_preco_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="espacoesportivo",
+            index=models.Index(
+                fields=["preco_minimo_ativo", "id"], name="espaco_preco_idx"
+            ),
+        ),
+    ]
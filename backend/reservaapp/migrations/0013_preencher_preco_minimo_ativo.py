@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import Max, Min, OuterRef, Subquery
+
+TAMANHO_LOTE = 5000
+
+
+def _menor_preco(queryset, agrupamento, campo):
+    return Subquery(
+        queryset.values(agrupamento).annotate(menor=Min(campo)).values('menor'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+# preenche o preço mínimo ativo dos espaços (a partir das agendas) e depois dos centros (a
+# partir dos espaços) em faixas de id, cada faixa com um único UPDATE
+def preencher_preco_minimo(apps, schema_editor):
+    Agenda = apps.get_model('reservaapp', 'Agenda')
+    EspacoEsportivo = apps.get_model('reservaapp', 'EspacoEsportivo')
+    CentroEsportivo = apps.get_model('reservaapp', 'CentroEsportivo')
+
+    preco_do_espaco = _menor_preco(
+        Agenda.objects.filter(espacoesportivo=OuterRef('pk'), status='ativo'), 'espacoesportivo', 'preco'
+    )
+    preco_do_centro = _menor_preco(
+        EspacoEsportivo.objects.filter(centro_esportivo=OuterRef('pk')), 'centro_esportivo', 'preco_minimo_ativo'
+    )
+
+    for modelo, preco in ((EspacoEsportivo, preco_do_espaco), (CentroEsportivo, preco_do_centro)):
+        ultimo = modelo.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+        for inicio in range(0, ultimo + 1, TAMANHO_LOTE):
+            modelo.objects.filter(id__gte=inicio, id__lt=inicio + TAMANHO_LOTE).update(preco_minimo_ativo=preco)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('reservaapp', '0012_preco_minimo_ativo'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_preco_minimo, migrations.RunPython.noop),
+    ]
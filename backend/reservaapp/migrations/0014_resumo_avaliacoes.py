@@ -0,0 +1,107 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0013_preencher_preco_minimo_ativo"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="centroesportivo",
+            name="avaliacoes_atendimento",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="centroesportivo",
+            name="avaliacoes_espacoesportivo",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="centroesportivo",
+            name="avaliacoes_limpeza",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="centroesportivo",
+            name="soma_atendimento",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="centroesportivo",
+            name="soma_espacoesportivo",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="centroesportivo",
+            name="soma_limpeza",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="centroesportivo",
+            name="total_avaliacoes",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="espacoesportivo",
+            name="avaliacoes_atendimento",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="espacoesportivo",
+            name="avaliacoes_espacoesportivo",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="espacoesportivo",
+            name="avaliacoes_limpeza",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="espacoesportivo",
+            name="media_avaliacao",
+            field=models.DecimalField(
+                blank=True, decimal_places=1, default=0, editable=False, max_digits=2
+            ),
+        ),
+        migrations.AddField(
+            model_name="espacoesportivo",
+            name="soma_atendimento",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="espacoesportivo",
+            name="soma_espacoesportivo",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="espacoesportivo",
+            name="soma_limpeza",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="espacoesportivo",
+            name="total_avaliacoes",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="reserva",
+            name="avaliado_em",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="centroesportivo",
+            index=models.Index(
+                fields=["media_avaliacao", "id"], name="centro_avaliacao_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="espacoesportivo",
+            index=models.Index(
+                fields=["media_avaliacao", "id"], name="espaco_avaliacao_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+TAMANHO_LOTE = 1000
+NOTAS = ('nota_atendimento', 'nota_espacoesportivo', 'nota_limpeza')
+AVALIADAS = Q(nota_atendimento__isnull=False) | Q(nota_espacoesportivo__isnull=False) | Q(nota_limpeza__isnull=False)
+
+
+# a data da avaliação das reservas já avaliadas não é conhecida, usa a da criação
+def preencher_avaliado_em(apps, schema_editor):
+    Reserva = apps.get_model('reservaapp', 'Reserva')
+    Reserva.objects.filter(AVALIADAS, avaliado_em__isnull=True).update(avaliado_em=F('criado_em'))
+
+
+# soma e conta as notas das reservas por centro e por espaço, gravando em lotes
+def preencher_resumo(apps, schema_editor):
+    Reserva = apps.get_model('reservaapp', 'Reserva')
+    agregacoes = {'total_avaliacoes': Count('id')}
+    for nota in NOTAS:
+        campo = nota.removeprefix('nota_')
+        agregacoes[f'soma_{campo}'] = Coalesce(Sum(nota), 0)
+        agregacoes[f'avaliacoes_{campo}'] = Count(nota)
+
+    for modelo, agrupamento in (('CentroEsportivo', 'centro_esportivo'), ('EspacoEsportivo', 'agenda__espacoesportivo')):
+        Modelo = apps.get_model('reservaapp', modelo)
+        resumos = Reserva.objects.filter(AVALIADAS).values(agrupamento).annotate(**agregacoes).order_by()
+        lote = []
+        for resumo in resumos.iterator(chunk_size=TAMANHO_LOTE):
+            objeto = Modelo(pk=resumo[agrupamento])
+            for coluna in agregacoes:
+                setattr(objeto, coluna, resumo[coluna])
+            soma = sum(resumo[f'soma_{nota.removeprefix("nota_")}'] for nota in NOTAS)
+            avaliacoes = sum(resumo[f'avaliacoes_{nota.removeprefix("nota_")}'] for nota in NOTAS)
+            objeto.media_avaliacao = (
+                (Decimal(soma) / avaliacoes).quantize(Decimal('0.1'), ROUND_HALF_UP) if avaliacoes else 0
+            )
+            lote.append(objeto)
+        Modelo.objects.bulk_update(lote, [*agregacoes, 'media_avaliacao'], batch_size=TAMANHO_LOTE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservaapp', '0014_resumo_avaliacoes'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_avaliado_em, migrations.RunPython.noop),
+        migrations.RunPython(preencher_resumo, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservaapp", "0015_preencher_resumo_avaliacoes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reserva",
+            name="espacoesportivo",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reservas",
+                to="reservaapp.espacoesportivo",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(
+                condition=models.Q(("avaliado_em__isnull", False)),
+                fields=["centro_esportivo", "avaliado_em"],
+                name="reserva_centro_avaliado_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(
+                condition=models.Q(("avaliado_em__isnull", False)),
+                fields=["espacoesportivo", "avaliado_em"],
+                name="reserva_espaco_avaliado_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+from django.db.models import Max, OuterRef, Subquery
+
+TAMANHO_LOTE = 5000
+
+
+# preenche o espaço das reservas existentes em faixas de id, como na 0007
+def preencher_espaco(apps, schema_editor):
+    Agenda = apps.get_model('reservaapp', 'Agenda')
+    Reserva = apps.get_model('reservaapp', 'Reserva')
+
+    espaco = Subquery(Agenda.objects.filter(pk=OuterRef('agenda_id')).values('espacoesportivo')[:1])
+
+    ultimo = Reserva.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+    for inicio in range(0, ultimo + 1, TAMANHO_LOTE):
+        Reserva.objects.filter(
+            id__gte=inicio, id__lt=inicio + TAMANHO_LOTE, espacoesportivo__isnull=True
+        ).update(espacoesportivo=espaco)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('reservaapp', '0016_reserva_espaco_avaliacoes_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_espaco, migrations.RunPython.noop),
+    ]
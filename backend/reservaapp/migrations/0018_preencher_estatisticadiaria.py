@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce, ExtractHour
+
+TAMANHO_LOTE = 1000
+
+
+# recria a EstatisticaDiaria a partir das reservas existentes, com a mesma consulta agrupada
+# de estatisticas.reconstruir_estatisticas. a tabela nasceu vazia na 0002 e os contadores só
+# acompanham as reservas alteradas depois dela
+def preencher_estatisticas(apps, schema_editor):
+    Reserva = apps.get_model('reservaapp', 'Reserva')
+    EstatisticaDiaria = apps.get_model('reservaapp', 'EstatisticaDiaria')
+    valor = DecimalField(max_digits=12, decimal_places=2)
+
+    agrupado = (
+        Reserva.objects.annotate(hora=ExtractHour('agenda__h_inicial'))
+        .values('agenda__espacoesportivo', 'agenda__espacoesportivo__centro_esportivo', 'agenda__espacoesportivo__categoria', 'agenda__dia', 'hora')
+        .annotate(
+            total_pendentes=Count('id', filter=Q(status='pendente')),
+            total_pagas=Count('id', filter=Q(status='pago')),
+            total_canceladas=Count('id', filter=Q(status='cancelada')),
+            total_arrecadacao=Coalesce(Sum('agenda__preco', filter=Q(status='pago')), Value(Decimal('0')), output_field=valor),
+            total_recebido=Coalesce(Sum('pagamento__valor'), Value(Decimal('0')), output_field=valor),
+        )
+        .order_by()
+    )
+
+    EstatisticaDiaria.objects.all().delete()
+    lote = []
+    for linha in agrupado.iterator(chunk_size=TAMANHO_LOTE):
+        lote.append(EstatisticaDiaria(
+            espacoesportivo_id=linha['agenda__espacoesportivo'],
+            centro_esportivo_id=linha['agenda__espacoesportivo__centro_esportivo'],
+            categoria=linha['agenda__espacoesportivo__categoria'],
+            dia=linha['agenda__dia'],
+            hora=linha['hora'],
+            pendentes=linha['total_pendentes'],
+            pagas=linha['total_pagas'],
+            canceladas=linha['total_canceladas'],
+            arrecadacao=linha['total_arrecadacao'],
+            valor_recebido=linha['total_recebido'],
+        ))
+        if len(lote) >= TAMANHO_LOTE:
+            EstatisticaDiaria.objects.bulk_create(lote)
+            lote = []
+    EstatisticaDiaria.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservaapp', '0017_preencher_reserva_espaco'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_estatisticas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+import datetime
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+TAMANHO_LOTE = 1000
+
+
+# as linhas agrupadas só pela hora de início não se desdobram nos horários reais: a tabela é
+# esvaziada antes da troca das colunas e preenchida de novo no fim, a partir das reservas
+def apagar_estatisticas(apps, schema_editor):
+    apps.get_model('reservaapp', 'EstatisticaDiaria').objects.all().delete()
+
+
+def preencher_estatisticas(apps, schema_editor):
+    Reserva = apps.get_model('reservaapp', 'Reserva')
+    EstatisticaDiaria = apps.get_model('reservaapp', 'EstatisticaDiaria')
+    valor = DecimalField(max_digits=12, decimal_places=2)
+
+    agrupado = (
+        Reserva.objects.values('agenda__espacoesportivo', 'agenda__espacoesportivo__centro_esportivo', 'agenda__espacoesportivo__categoria', 'agenda__dia', 'agenda__h_inicial', 'agenda__h_final')
+        .annotate(
+            total_pendentes=Count('id', filter=Q(status='pendente')),
+            total_pagas=Count('id', filter=Q(status='pago')),
+            total_canceladas=Count('id', filter=Q(status='cancelada')),
+            total_arrecadacao=Coalesce(Sum('agenda__preco', filter=Q(status='pago')), Value(Decimal('0')), output_field=valor),
+            total_recebido=Coalesce(Sum('pagamento__valor'), Value(Decimal('0')), output_field=valor),
+        )
+        .order_by()
+    )
+
+    lote = []
+    for linha in agrupado.iterator(chunk_size=TAMANHO_LOTE):
+        lote.append(EstatisticaDiaria(
+            espacoesportivo_id=linha['agenda__espacoesportivo'],
+            centro_esportivo_id=linha['agenda__espacoesportivo__centro_esportivo'],
+            categoria=linha['agenda__espacoesportivo__categoria'],
+            dia=linha['agenda__dia'],
+            h_inicial=linha['agenda__h_inicial'],
+            h_final=linha['agenda__h_final'],
+            pendentes=linha['total_pendentes'],
+            pagas=linha['total_pagas'],
+            canceladas=linha['total_canceladas'],
+            arrecadacao=linha['total_arrecadacao'],
+            valor_recebido=linha['total_recebido'],
+        ))
+        if len(lote) >= TAMANHO_LOTE:
+            EstatisticaDiaria.objects.bulk_create(lote)
+            lote = []
+    EstatisticaDiaria.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservaapp', '0018_preencher_estatisticadiaria'),
+    ]
+
+    operations = [
+        migrations.RunPython(apagar_estatisticas, apagar_estatisticas),
+        migrations.RemoveConstraint(
+            model_name='estatisticadiaria',
+            name='estatistica_diaria_unica',
+        ),
+        migrations.RemoveField(
+            model_name='estatisticadiaria',
+            name='hora',
+        ),
+        migrations.AddField(
+            model_name='estatisticadiaria',
+            name='h_inicial',
+            field=models.TimeField(default=datetime.time(0, 0)),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='estatisticadiaria',
+            name='h_final',
+            field=models.TimeField(default=datetime.time(0, 0)),
+            preserve_default=False,
+        ),
+        migrations.AddConstraint(
+            model_name='estatisticadiaria',
+            constraint=models.UniqueConstraint(fields=('espacoesportivo', 'dia', 'h_inicial', 'h_final'), name='estatistica_diaria_unica'),
+        ),
+        migrations.RunPython(preencher_estatisticas, apagar_estatisticas),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 
@@ -19,7 +20,32 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.email
 
-class CentroEsportivo(models.Model):
+# notas da reserva, na ordem usada pelos resumos de avaliação
+NOTAS = ('nota_atendimento', 'nota_espacoesportivo', 'nota_limpeza')
+
+# reservas que receberam pelo menos uma nota
+RESERVAS_AVALIADAS = (
+    Q(nota_atendimento__isnull=False)
+    | Q(nota_espacoesportivo__isnull=False)
+    | Q(nota_limpeza__isnull=False)
+)
+
+# somas e contagens de cada nota das reservas avaliadas, mantidas por avaliacoes.py a cada
+# avaliação para as listagens lerem a média e o total sem agregar as reservas
+class ResumoAvaliacoes(models.Model):
+    soma_atendimento = models.IntegerField(default=0, editable=False)
+    avaliacoes_atendimento = models.IntegerField(default=0, editable=False)
+    soma_espacoesportivo = models.IntegerField(default=0, editable=False)
+    avaliacoes_espacoesportivo = models.IntegerField(default=0, editable=False)
+    soma_limpeza = models.IntegerField(default=0, editable=False)
+    avaliacoes_limpeza = models.IntegerField(default=0, editable=False)
+    # reservas com pelo menos uma nota
+    total_avaliacoes = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+class CentroEsportivo(ResumoAvaliacoes):
     TIPOS_UF=(
         ('AC', 'Acre'),
         ('AL', 'Alagoas'),
@@ -58,14 +84,31 @@ class CentroEsportivo(models.Model):
     cidade = models.CharField(max_length=64)
     UF = models.CharField(max_length=2, choices=TIPOS_UF)
     media_avaliacao = models.DecimalField(max_digits=2, decimal_places=1, blank=True, default=0)
+    # menor preço entre as agendas ativas dos espaços do centro, mantido por precos.py
+    preco_minimo_ativo = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
     #recursos_adicionais = models.TextField(blank=True, null=True) //Decidir se irá virar uma tabela ou um dicionario 
     #perguntas_respostas = models.TextField(blank=True, null=True)// Precisa explorar
     gerente = models.ForeignKey(CustomUser, on_delete=models.CASCADE, limit_choices_to={'tipo': 'gerente'}, related_name="centros_esportivos")
 
+    class Meta:
+        indexes = [
+            # pré-filtro por retângulo da busca de centros próximos
+            models.Index(fields=['latitude', 'longitude'], name='centro_lat_lon_idx'),
+            # filtro e ordenação da listagem por preço
+            models.Index(fields=['preco_minimo_ativo', 'id'], name='centro_preco_idx'),
+            # ordenação da listagem por avaliação
+            models.Index(fields=['media_avaliacao', 'id'], name='centro_avaliacao_idx'),
+        ]
+
     def __str__(self):
         return self.nome
 
-class EspacoEsportivo(models.Model):
+class EspacoEsportivoQuerySet(models.QuerySet):
+    # traz o centro de cada espaço no mesmo SELECT
+    def com_centro_resumido(self):
+        return self.select_related('centro_esportivo')
+
+class EspacoEsportivo(ResumoAvaliacoes):
     CATEGORIA_CHOICES = (
         ('futebol', 'Futebol'),
         ('volei', 'Vôlei'),
@@ -86,6 +129,26 @@ class EspacoEsportivo(models.Model):
     foto4= models.ImageField(upload_to='espacos_foto4/', blank=True, null=True)
     categoria = models.CharField(max_length=100, choices=CATEGORIA_CHOICES)
     centro_esportivo = models.ForeignKey(CentroEsportivo, on_delete=models.CASCADE, related_name="espacos")
+    # menor preço entre as agendas ativas do espaço, mantido por precos.py
+    preco_minimo_ativo = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
+    media_avaliacao = models.DecimalField(max_digits=2, decimal_places=1, blank=True, default=0, editable=False)
+
+    objects = EspacoEsportivoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # filtro de centros por categoria de espaço (EXISTS por categoria e centro)
+            models.Index(fields=['categoria', 'centro_esportivo'], name='espaco_categoria_centro_idx'),
+            # filtro e ordenação da listagem por preço
+            models.Index(fields=['preco_minimo_ativo', 'id'], name='espaco_preco_idx'),
+            # ordenação da listagem por avaliação
+            models.Index(fields=['media_avaliacao', 'id'], name='espaco_avaliacao_idx'),
+        ]
+
+    # a categoria é gravada sempre em minúsculas para os filtros usarem igualdade no índice
+    def save(self, *args, **kwargs):
+        self.categoria = self.categoria.strip().lower()
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"EspacoEsportivo {self.nome}"
@@ -102,6 +165,16 @@ class Agenda(models.Model):
     espacoesportivo = models.ForeignKey(EspacoEsportivo, on_delete=models.CASCADE, related_name="agenda")
     status = models.CharField(max_length=12, choices=STATUS_CHOICES, default="ativo")
 
+    class Meta:
+        indexes = [
+            # horários disponíveis de um espaço no dia
+            models.Index(fields=['espacoesportivo', 'dia', 'status'], name='agenda_espaco_dia_status_idx'),
+            # verificação de sobreposição de horários ao cadastrar agenda
+            models.Index(fields=['espacoesportivo', 'dia', 'h_inicial', 'h_final'], name='agenda_espaco_dia_horario_idx'),
+            # busca de horários livres em todos os espaços no dia
+            models.Index(fields=['dia', 'status', 'h_inicial'], name='agenda_dia_status_horario_idx'),
+        ]
+
     def __str__(self):
         return f"{self.espacoesportivo.centro_esportivo.nome} | {self.espacoesportivo.nome} - {self.dia} ({self.h_inicial}-{self.h_final}) - {self.status}"
 
@@ -117,13 +190,88 @@ class Reserva(models.Model):
     nota_espacoesportivo = models.IntegerField(null=True, blank=True)
     nota_limpeza = models.IntegerField(null=True, blank=True)
     comentario_avaliacao = models.TextField(null=True, blank=True)
+    avaliado_em = models.DateTimeField(null=True, blank=True, editable=False)
     criado_em = models.DateTimeField(auto_now_add=True) 
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pendente")
     cancelar_reserva=models.DateTimeField(null=True, blank=True)
+    # cópias do espaço, do centro e do gerente da agenda, preenchidas no save, para as
+    # consultas filtrarem direto na reserva sem o join agenda > espaço > centro
+    espacoesportivo = models.ForeignKey(EspacoEsportivo, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='reservas')
+    centro_esportivo = models.ForeignKey(CentroEsportivo, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='reservas')
+    gerente = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='reservas_recebidas')
+
+    class Meta:
+        indexes = [
+            # reservas do gerente por status (estatísticas e dashboard)
+            models.Index(fields=['gerente', 'status'], name='reserva_gerente_status_idx'),
+            # reservas do organizador por data de criação
+            models.Index(fields=['organizador', 'criado_em'], name='reserva_organizador_criado_idx'),
+            # usado pela expiração das reservas pendentes não pagas
+            models.Index(fields=['status', 'criado_em'], name='reserva_status_criado_idx'),
+            # avaliações do centro e do espaço, das mais recentes para as mais antigas. parciais:
+            # só as reservas avaliadas entram no índice
+            models.Index(
+                fields=['centro_esportivo', 'avaliado_em'],
+                name='reserva_centro_avaliado_idx',
+                condition=Q(avaliado_em__isnull=False),
+            ),
+            models.Index(
+                fields=['espacoesportivo', 'avaliado_em'],
+                name='reserva_espaco_avaliado_idx',
+                condition=Q(avaliado_em__isnull=False),
+            ),
+        ]
+
+    # notas como estavam no banco quando a reserva foi carregada, para o resumo de
+    # avaliações aplicar só a diferença ao salvar (ver signals.py), e a agenda carregada, para
+    # o save saber quando refazer as cópias do espaço, centro e gerente
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        reserva = super().from_db(db, field_names, values)
+        reserva._notas_salvas = None
+        if not set(NOTAS) & reserva.get_deferred_fields():
+            reserva._notas_salvas = reserva.notas()
+        if 'agenda_id' in reserva.__dict__:
+            reserva._agenda_salva = reserva.agenda_id
+        return reserva
+
+    def notas(self):
+        return tuple(getattr(self, campo) for campo in NOTAS)
+
+    def save(self, *args, **kwargs):
+        # a listagem de avaliações usa avaliado_em; notas gravadas por qualquer caminho (admin,
+        # scripts, save direto) também recebem a data para não ficarem contadas e invisíveis
+        if self.avaliado_em is None and any(nota is not None for nota in self.notas()):
+            self.avaliado_em = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'avaliado_em'}
+        self._copias_salvas = (self.centro_esportivo_id, self.espacoesportivo_id)
+        agenda_mudou = self.agenda_id != getattr(self, '_agenda_salva', self.agenda_id)
+        if self.agenda_id and (self._state.adding or agenda_mudou or None in self._copias_salvas):
+            self.espacoesportivo_id, self.centro_esportivo_id, self.gerente_id = Agenda.objects.filter(
+                pk=self.agenda_id
+            ).values_list(
+                'espacoesportivo', 'espacoesportivo__centro_esportivo', 'espacoesportivo__centro_esportivo__gerente'
+            ).get()
+        super().save(*args, **kwargs)
+        self._agenda_salva = self.agenda_id
 
     def __str__(self):
         return f"Reserva de {self.organizador.nome_completo} - {self.agenda.dia} ({self.status})"
 
+# bloqueio temporário de um horário enquanto o organizador conclui a reserva. vale até
+# expira_em e pode ser prorrogado uma vez; bloqueios vencidos são ignorados pelas consultas
+# e apagados em lote pelo comando liberar_bloqueios
+class BloqueioAgenda(models.Model):
+    agenda = models.OneToOneField(Agenda, on_delete=models.CASCADE, related_name="bloqueio")
+    organizador = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="bloqueios")
+    criado_em = models.DateTimeField(auto_now_add=True)
+    expira_em = models.DateTimeField(db_index=True)
+    prorrogado = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"Bloqueio da agenda {self.agenda_id} até {self.expira_em}"
+
 class Pagamento(models.Model):
     reserva = models.OneToOneField(Reserva, on_delete=models.CASCADE, related_name="pagamento")
     valor = models.DecimalField(max_digits=10, decimal_places=2)
@@ -134,3 +282,30 @@ class Pagamento(models.Model):
     def __str__(self):
         return f"Pagamento de {self.valor} para {self.reserva}"
 
+
+# estatísticas pré-agregadas por espaço, dia e horário (início e fim) das reservas, mantidas
+# incrementalmente pelas views (ver estatisticas.py) e reconstruídas pelo comando
+# reconstruir_estatisticas. centro e categoria são copiados do espaço para agrupar sem join
+class EstatisticaDiaria(models.Model):
+    centro_esportivo = models.ForeignKey(CentroEsportivo, on_delete=models.CASCADE, related_name="estatisticas")
+    espacoesportivo = models.ForeignKey(EspacoEsportivo, on_delete=models.CASCADE, related_name="estatisticas")
+    categoria = models.CharField(max_length=100)
+    dia = models.DateField()
+    h_inicial = models.TimeField()
+    h_final = models.TimeField()
+    pendentes = models.IntegerField(default=0)
+    pagas = models.IntegerField(default=0)
+    canceladas = models.IntegerField(default=0)
+    arrecadacao = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    valor_recebido = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['espacoesportivo', 'dia', 'h_inicial', 'h_final'], name='estatistica_diaria_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['centro_esportivo', 'dia'], name='estatistica_centro_dia_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.espacoesportivo_id} - {self.dia} {self.h_inicial}-{self.h_final}"
@@ -0,0 +1,166 @@
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+    _reverse_ordering,
+)
+
+
+# paginação por cursor (keyset) usada por padrão nas listagens. a ordenação pela chave
+# primária é estável e usa o índice da pk, então o custo de cada página não depende da
+# profundidade, ao contrário de ?page=/offset
+class PaginacaoPadrao(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = "id"
+
+
+# listagens de reservas e pagamentos, das mais recentes para as mais antigas
+class PaginacaoRecentes(PaginacaoPadrao):
+    ordering = "-id"
+
+
+# seção de reservas pagas das estatísticas do gerente
+class PaginacaoReservasPagas(PaginacaoRecentes):
+    page_size = 20
+    max_page_size = 100
+
+
+# cursor (keyset) sobre todos os campos da ordenação, que sempre termina no id. o cursor
+# padrão do DRF guarda só o primeiro campo e resolve empates com um offset limitado a
+# offset_cutoff, então grupos grandes de valores iguais (mesmo horário, mesmo preço)
+# repetiam linhas e nunca terminavam. aqui a posição é a tupla inteira e a página seguinte
+# filtra (a > x) OR (a = x AND id > k), que segue o índice composto sem offset
+class PaginacaoChaveComposta(PaginacaoPadrao):
+    def _posicao(self, instancia):
+        return json.dumps(
+            [str(getattr(instancia, campo.lstrip("-"))) for campo in self.ordering]
+        )
+
+    # valores do cursor convertidos para o tipo de cada campo; cursor adulterado é 404
+    def _ler_posicao(self, queryset):
+        if self.cursor is None or self.cursor.position is None:
+            return None
+        try:
+            valores = json.loads(self.cursor.position)
+            if not isinstance(valores, list) or len(valores) != len(self.ordering):
+                raise ValueError
+            return [
+                queryset.model._meta.get_field(campo.lstrip("-")).to_python(valor)
+                for campo, valor in zip(self.ordering, valores)
+            ]
+        except (ValueError, TypeError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _depois_de(ordenacao, valores):
+        condicao = Q()
+        iguais = Q()
+        for campo, valor in zip(ordenacao, valores):
+            nome = campo.lstrip("-")
+            operador = "lt" if campo.startswith("-") else "gt"
+            condicao |= iguais & Q(**{f"{nome}__{operador}": valor})
+            iguais &= Q(**{nome: valor})
+        return condicao
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        posicao = self._ler_posicao(queryset)
+        reverso = self.cursor is not None and self.cursor.reverse
+
+        ordenacao = _reverse_ordering(self.ordering) if reverso else self.ordering
+        queryset = queryset.order_by(*ordenacao)
+        if posicao is not None:
+            queryset = queryset.filter(self._depois_de(ordenacao, posicao))
+
+        resultados = list(queryset[: self.page_size + 1])
+        self.page = resultados[: self.page_size]
+        tem_mais = len(resultados) > self.page_size
+        if reverso:
+            self.page.reverse()
+            self.has_next, self.has_previous = posicao is not None, tem_mais
+        else:
+            self.has_next, self.has_previous = tem_mais, posicao is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        posicao = self._posicao(self.page[-1]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=posicao))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        posicao = self._posicao(self.page[0]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=posicao))
+
+
+# busca de horários livres: ?ordenar=horario (padrão) ou ?ordenar=preco
+class PaginacaoBuscaHorarios(PaginacaoChaveComposta):
+    ordenacoes = {
+        "horario": ("h_inicial", "id"),
+        "preco": ("preco", "id"),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordenacoes.get(
+            request.query_params.get("ordenar"), self.ordenacoes["horario"]
+        )
+
+
+# listagens de centros e espaços: ?ordenar=preco|-preco usam o preco_minimo_ativo e
+# ?ordenar=avaliacao|-avaliacao a media_avaliacao mantidos no próprio registro. quem não
+# tem horário ativo não tem preço e fica de fora da ordenação por preço (NULL não serve
+# de posição para o cursor). preços ou médias iguais são desempatados pelo id dentro do
+# cursor
+class PaginacaoOrdenavel(PaginacaoChaveComposta):
+    ordenacoes = {
+        "preco": ("preco_minimo_ativo", "id"),
+        "-preco": ("-preco_minimo_ativo", "-id"),
+        "avaliacao": ("media_avaliacao", "id"),
+        "-avaliacao": ("-media_avaliacao", "-id"),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordenacoes.get(
+            request.query_params.get("ordenar"), (self.ordering,)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get("ordenar") in ("preco", "-preco"):
+            queryset = queryset.filter(preco_minimo_ativo__isnull=False)
+        return super().paginate_queryset(queryset, request, view)
+
+
+# avaliações de um centro ou espaço, das mais recentes para as mais antigas, seguindo o
+# índice parcial (centro/espaço, avaliado_em) das reservas avaliadas. avaliações com a
+# mesma data (a 0015 copiou criado_em para as antigas) são desempatadas pelo id no cursor
+class PaginacaoAvaliacoes(PaginacaoChaveComposta):
+    page_size = 20
+    max_page_size = 100
+    ordering = ("-avaliado_em", "-id")
+
+
+# resultados da busca textual: a ordem é a relevância, que não serve de cursor, então a
+# paginação é por página sobre a lista (limitada) de ids ranqueados
+class PaginacaoBusca(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
@@ -0,0 +1,86 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import DecimalField, Min, OuterRef, Subquery
+
+from .models import Agenda, CentroEsportivo, EspacoEsportivo
+
+TAMANHO_LOTE = 500
+
+# espaços e centros marcados dentro de um adiar_recalculo_de_precos, por thread
+_adiados = threading.local()
+
+
+def _menor_preco(queryset, agrupamento, campo):
+    return Subquery(
+        queryset.values(agrupamento).annotate(menor=Min(campo)).values("menor"),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+# recalcula preco_minimo_ativo dos espaços e dos centros informados (e dos centros desses
+# espaços). cada lote é um UPDATE nos espaços a partir das agendas ativas e outro nos
+# centros a partir dos espaços, em vez de um aggregate por agenda salva
+def recalcular_precos(espacos=(), centros=(), tamanho_lote=TAMANHO_LOTE):
+    espacos = sorted(set(espacos))
+    centros = set(centros)
+    preco_do_espaco = _menor_preco(
+        Agenda.objects.filter(espacoesportivo=OuterRef("pk"), status="ativo"),
+        "espacoesportivo",
+        "preco",
+    )
+    preco_do_centro = _menor_preco(
+        EspacoEsportivo.objects.filter(centro_esportivo=OuterRef("pk")),
+        "centro_esportivo",
+        "preco_minimo_ativo",
+    )
+
+    with transaction.atomic():
+        for inicio in range(0, len(espacos), tamanho_lote):
+            lote = EspacoEsportivo.objects.filter(
+                id__in=espacos[inicio : inicio + tamanho_lote]
+            )
+            lote.update(preco_minimo_ativo=preco_do_espaco)
+            centros.update(lote.values_list("centro_esportivo_id", flat=True))
+
+        centros = sorted(centros)
+        for inicio in range(0, len(centros), tamanho_lote):
+            CentroEsportivo.objects.filter(
+                id__in=centros[inicio : inicio + tamanho_lote]
+            ).update(preco_minimo_ativo=preco_do_centro)
+
+
+# marca espaços/centros com preço desatualizado: dentro de adiar_recalculo_de_precos o
+# recálculo fica para a saída do bloco, fora dele é feito na hora
+def marcar_precos(espacos=(), centros=()):
+    if getattr(_adiados, "espacos", None) is not None:
+        _adiados.espacos.update(espacos)
+        _adiados.centros.update(centros)
+        return
+    recalcular_precos(espacos, centros)
+
+
+# junta as marcações feitas no bloco (por signals ou caminhos em lote) e recalcula tudo de
+# uma vez na saída. blocos aninhados recalculam só na saída do mais externo
+@contextmanager
+def adiar_recalculo_de_precos():
+    if getattr(_adiados, "espacos", None) is not None:
+        yield
+        return
+
+    _adiados.espacos, _adiados.centros = set(), set()
+    try:
+        yield
+        espacos, centros = _adiados.espacos, _adiados.centros
+    finally:
+        _adiados.espacos = _adiados.centros = None
+    recalcular_precos(espacos, centros)
+
+
+# recalcula os preços de todos os espaços e centros
+def reconstruir_precos(tamanho_lote=TAMANHO_LOTE):
+    espacos = list(EspacoEsportivo.objects.values_list("id", flat=True))
+    centros = list(CentroEsportivo.objects.values_list("id", flat=True))
+    recalcular_precos(espacos, centros, tamanho_lote=tamanho_lote)
+    return len(espacos), len(centros)
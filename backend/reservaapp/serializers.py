@@ -1,9 +1,66 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from django.contrib.auth import get_user_model
 from rest_framework.validators import UniqueValidator
-from django.db.models import Min
 
-from .models import CentroEsportivo, EspacoEsportivo, Agenda, Reserva, Pagamento
+from .models import (
+    CentroEsportivo,
+    EspacoEsportivo,
+    Agenda,
+    Reserva,
+    Pagamento,
+    BloqueioAgenda,
+    NOTAS,
+)
+
+
+# lê um parâmetro separado por vírgula (?fields=id,nome) da requisição, retorna None se não foi enviado
+def _lista_parametro(request, nome):
+    params = getattr(request, "query_params", request.GET)
+    if nome not in params:
+        return None
+    return {campo.strip() for campo in params[nome].split(",") if campo.strip()}
+
+
+# mixin para respostas parciais nas leituras: ?fields=id,nome devolve só esses campos e
+# ?expand=centro_esportivo_details inclui os campos aninhados listados em Meta.campos_expansiveis.
+# sem nenhum dos dois parâmetros a resposta continua completa. campos removidos não são
+# calculados, então os getters e as consultas deles não rodam
+class CamposDinamicosMixin:
+    @classmethod
+    def campo_solicitado(cls, request, nome):
+        if request is None or request.method not in SAFE_METHODS:
+            return True
+
+        campos = _lista_parametro(request, "fields")
+        expandidos = _lista_parametro(request, "expand")
+
+        if nome in getattr(cls.Meta, "campos_expansiveis", []):
+            if campos is None and expandidos is None:
+                return True
+            return nome in (campos or set()) or nome in (expandidos or set())
+
+        return campos is None or nome in campos
+
+    # só o serializer principal da resposta é filtrado, os aninhados ficam completos
+    def _eh_serializer_principal(self):
+        if self.parent is None:
+            return True
+        return (
+            isinstance(self.parent, serializers.ListSerializer)
+            and self.parent.parent is None
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or not self._eh_serializer_principal():
+            return fields
+
+        for nome in list(fields):
+            if not self.campo_solicitado(request, nome):
+                fields.pop(nome)
+        return fields
 
 
 # serializer para o usuario
@@ -22,11 +79,10 @@ class CustomUserSerializer(serializers.ModelSerializer):
 
 
 # serializer para o centro esportivo
-class CentroEsportivoSerializer(serializers.ModelSerializer):
+class CentroEsportivoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     foto_perfil_url = serializers.SerializerMethodField()
     foto_capa_url = serializers.SerializerMethodField()
-    menor_preco = serializers.SerializerMethodField()
-    total_avaliacoes = serializers.SerializerMethodField()
+    menor_preco = serializers.ReadOnlyField(source="preco_minimo_ativo")
 
     class Meta:
         model = CentroEsportivo
@@ -79,30 +135,18 @@ class CentroEsportivoSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.foto_capa.url)
         return None
 
-    def get_menor_preco(self, obj):
-        menor = Agenda.objects.filter(
-            espacoesportivo__centro_esportivo=obj, status="ativo"
-        ).aggregate(Min("preco"))["preco__min"]
 
-        return menor
+# serializer para a busca de centros próximos, com a distância até o ponto informado
+class CentroProximoSerializer(CentroEsportivoSerializer):
+    distancia_km = serializers.FloatField(read_only=True)
 
-    def get_total_avaliacoes(self, obj):
-        from django.db.models import Q
-
-        total = (
-            Reserva.objects.filter(
-                Q(nota_atendimento__isnull=False)
-                | Q(nota_espacoesportivo__isnull=False)
-                | Q(nota_limpeza__isnull=False)
-            )
-            .filter(agenda__espacoesportivo__centro_esportivo=obj)
-            .count()
-        )
-        return total
+    class Meta(CentroEsportivoSerializer.Meta):
+        fields = CentroEsportivoSerializer.Meta.fields + ["distancia_km"]
+        validators = []
 
 
 # serializer para o espaço esportivo
-class EspacoEsportivoSerializer(serializers.ModelSerializer):
+class EspacoEsportivoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     centro_esportivo_details = CentroEsportivoSerializer(
         source="centro_esportivo", read_only=True
     )
@@ -113,8 +157,7 @@ class EspacoEsportivoSerializer(serializers.ModelSerializer):
     foto2_url = serializers.SerializerMethodField()
     foto3_url = serializers.SerializerMethodField()
     foto4_url = serializers.SerializerMethodField()
-    preco = serializers.SerializerMethodField()
-    total_avaliacoes = serializers.SerializerMethodField()
+    preco = serializers.ReadOnlyField(source="preco_minimo_ativo")
 
     class Meta:
         model = EspacoEsportivo
@@ -134,7 +177,9 @@ class EspacoEsportivoSerializer(serializers.ModelSerializer):
             "centro_esportivo_details",
             "preco",
             "total_avaliacoes",
+            "media_avaliacao",
         ]
+        campos_expansiveis = ["centro_esportivo_details"]
         extra_kwargs = {}
         # validators para garantir que o nome do espaço esportivo seja único dentro do centro esportivo
         validators = [
@@ -181,29 +226,8 @@ class EspacoEsportivoSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.foto4.url)
         return None
 
-    def get_preco(self, obj):
-        menor = Agenda.objects.filter(espacoesportivo=obj, status="ativo").aggregate(
-            Min("preco")
-        )["preco__min"]
-
-        return menor
-
-    def get_total_avaliacoes(self, obj):
-        from django.db.models import Q
-
-        total = (
-            Reserva.objects.filter(
-                Q(nota_atendimento__isnull=False)
-                | Q(nota_espacoesportivo__isnull=False)
-                | Q(nota_limpeza__isnull=False)
-            )
-            .filter(agenda__espacoesportivo=obj)
-            .count()
-        )
-        return total
-
 
-class AgendaSerializer(serializers.ModelSerializer):
+class AgendaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Agenda
         fields = "__all__"
@@ -231,22 +255,53 @@ class AgendaSerializer(serializers.ModelSerializer):
 class ReservaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reserva
-        exclude = ["organizador"]
+        exclude = [
+            "organizador",
+            "centro_esportivo",
+            "espacoesportivo",
+            "gerente",
+        ]
         validators = [
+            # reservas canceladas liberam o horário, então não contam como duplicadas
             serializers.UniqueTogetherValidator(
-                queryset=Reserva.objects.all(),
+                queryset=Reserva.objects.exclude(status="cancelada"),
                 fields=["agenda"],
                 message="Já existe uma reserva para este organizador neste horário.",
             )
         ]
 
 
+# notas e comentário enviados pelo organizador ao avaliar uma reserva. as notas vão de 1 a
+# 5 e podem ser enviadas aos poucos, mas a reserva precisa ficar com pelo menos uma
+class AvaliacaoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Reserva
+        fields = [*NOTAS, "comentario_avaliacao", "avaliado_em"]
+        extra_kwargs = {nota: {"min_value": 1, "max_value": 5} for nota in NOTAS}
+
+    def validate(self, attrs):
+        notas = [attrs.get(nota, getattr(self.instance, nota, None)) for nota in NOTAS]
+        if all(nota is None for nota in notas):
+            raise serializers.ValidationError("Informe pelo menos uma nota.")
+        return attrs
+
+
+# avaliação na listagem pública de um centro ou espaço: só o nome de quem avaliou, as
+# notas, o comentário e a data
+class AvaliacaoPublicaSerializer(serializers.ModelSerializer):
+    nome_completo = serializers.CharField(source="organizador.nome_completo")
+
+    class Meta:
+        model = Reserva
+        fields = ["nome_completo", *NOTAS, "comentario_avaliacao", "avaliado_em"]
+        read_only_fields = fields
+
+
 # serializer para o centro esportivo com seus espaços esportivos
-class Centro_com_espacosSerializer(serializers.ModelSerializer):
+class Centro_com_espacosSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     foto_perfil_url = serializers.SerializerMethodField()
     foto_capa_url = serializers.SerializerMethodField()
-    menor_preco = serializers.SerializerMethodField()
-    total_avaliacoes = serializers.SerializerMethodField()
+    menor_preco = serializers.ReadOnlyField(source="preco_minimo_ativo")
     espacos = EspacoEsportivoSerializer(many=True, read_only=True)
 
     class Meta:
@@ -264,6 +319,7 @@ class Centro_com_espacosSerializer(serializers.ModelSerializer):
             "total_avaliacoes",
             "media_avaliacao",
         ]
+        campos_expansiveis = ["espacos"]
 
     def get_foto_perfil_url(self, obj):
         request = self.context.get("request")
@@ -277,27 +333,6 @@ class Centro_com_espacosSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.foto_capa.url)
         return None
 
-    def get_menor_preco(self, obj):
-        menor = Agenda.objects.filter(
-            espacoesportivo__centro_esportivo=obj, status="ativo"
-        ).aggregate(Min("preco"))["preco__min"]
-
-        return menor
-
-    def get_total_avaliacoes(self, obj):
-        from django.db.models import Q
-
-        total = (
-            Reserva.objects.filter(
-                Q(nota_atendimento__isnull=False)
-                | Q(nota_espacoesportivo__isnull=False)
-                | Q(nota_limpeza__isnull=False)
-            )
-            .filter(agenda__espacoesportivo__centro_esportivo=obj)
-            .count()
-        )
-        return total
-
 
 # serializer para a agenda detalhada (não usado por enquanto)
 class AgendaDetalhadaSerializer(serializers.ModelSerializer):
@@ -309,12 +344,13 @@ class AgendaDetalhadaSerializer(serializers.ModelSerializer):
 
 
 # serializer para a reserva detalhada, serve para o minhas reservas, porque mostra a reserva junto com detalhes da agenda
-class ReservaDetalhadaSerializer(serializers.ModelSerializer):
+class ReservaDetalhadaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     agenda = AgendaDetalhadaSerializer(read_only=True)
 
     class Meta:
         model = Reserva
-        fields = "__all__"
+        exclude = ["centro_esportivo", "espacoesportivo", "gerente"]
+        campos_expansiveis = ["agenda"]
 
 
 # serializer para os horários disponíveis
@@ -324,8 +360,38 @@ class HorarioDisponivelSerializer(serializers.ModelSerializer):
         fields = ["id", "dia", "h_inicial", "h_final", "preco"]
 
 
+# serializer para a busca de horários livres em todos os espaços, com o espaço e o centro
+class HorarioBuscaSerializer(serializers.ModelSerializer):
+    espaco_nome = serializers.CharField(source="espacoesportivo.nome")
+    categoria = serializers.CharField(source="espacoesportivo.categoria")
+    centro_esportivo = serializers.IntegerField(
+        source="espacoesportivo.centro_esportivo_id"
+    )
+    centro_nome = serializers.CharField(source="espacoesportivo.centro_esportivo.nome")
+    cidade = serializers.CharField(source="espacoesportivo.centro_esportivo.cidade")
+    UF = serializers.CharField(source="espacoesportivo.centro_esportivo.UF")
+
+    class Meta:
+        model = Agenda
+        fields = [
+            "id",
+            "dia",
+            "h_inicial",
+            "h_final",
+            "preco",
+            "espacoesportivo",
+            "espaco_nome",
+            "categoria",
+            "centro_esportivo",
+            "centro_nome",
+            "cidade",
+            "UF",
+        ]
+        read_only_fields = fields
+
+
 # serializer para o dashboard do gerente, vai colocar informações resumidas das reservas (nao usado por enquanto)
-class DashboardGerenteSerializer(serializers.ModelSerializer):
+class DashboardGerenteSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     status = serializers.CharField(source="get_status_display")
     organizador = serializers.SerializerMethodField()
     espaco = serializers.SerializerMethodField()
@@ -393,3 +459,11 @@ class PagamentoSerializer(serializers.ModelSerializer):
         model = Pagamento
         fields = "__all__"
         read_only_fields = ["data_pagamento", "confirmado"]
+
+
+# serializer para o bloqueio temporário de horário
+class BloqueioAgendaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BloqueioAgenda
+        fields = ["id", "agenda", "criado_em", "expira_em", "prorrogado"]
+        read_only_fields = fields
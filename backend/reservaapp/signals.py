@@ -0,0 +1,219 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .avaliacoes import SEM_NOTAS, mover_resumo_do_espaco, registrar_avaliacao
+from .estatisticas import mover_agenda, remover_pagamento, remover_reserva
+from .disponibilidade import (
+    invalidar_disponibilidade,
+    invalidar_disponibilidade_em_lote,
+)
+from .busca import indexar_centro, remover_centro
+from .geo import invalidar_celulas
+from .precos import marcar_precos
+from .models import (
+    NOTAS,
+    Agenda,
+    CentroEsportivo,
+    EspacoEsportivo,
+    EstatisticaDiaria,
+    Pagamento,
+    Reserva,
+)
+
+
+# guarda o espaço/dia anteriores para invalidar também o snapshot antigo quando a agenda
+# é movida para outro dia ou espaço, o preço/status anteriores para saber se o preço
+# mínimo do espaço pode ter mudado e o horário anterior para mover as estatísticas
+@receiver(pre_save, sender=Agenda)
+def guardar_dia_anterior_da_agenda(sender, instance, **kwargs):
+    instance._disponibilidade_anterior = None
+    instance._preco_anterior = None
+    instance._horario_anterior = None
+    if instance.pk is not None:
+        anterior = (
+            Agenda.objects.filter(pk=instance.pk)
+            .values_list(
+                "espacoesportivo_id", "dia", "preco", "status", "h_inicial", "h_final"
+            )
+            .first()
+        )
+        if anterior is not None:
+            instance._disponibilidade_anterior = anterior[:2]
+            instance._preco_anterior = (anterior[0], anterior[2], anterior[3])
+            instance._horario_anterior = Agenda(
+                espacoesportivo_id=anterior[0],
+                dia=anterior[1],
+                preco=anterior[2],
+                h_inicial=anterior[4],
+                h_final=anterior[5],
+            )
+
+
+@receiver(post_save, sender=Agenda)
+def invalidar_ao_salvar_agenda(sender, instance, **kwargs):
+    pares = {(instance.espacoesportivo_id, instance.dia)}
+    anterior = getattr(instance, "_disponibilidade_anterior", None)
+    if anterior is not None:
+        pares.add(anterior)
+    invalidar_disponibilidade_em_lote(pares)
+
+
+# agenda com reservas movida para outro espaço, dia ou horário: os contadores dela passam
+# da linha antiga da EstatisticaDiaria para a nova
+@receiver(post_save, sender=Agenda)
+def mover_estatisticas_ao_mover_agenda(sender, instance, **kwargs):
+    anterior = getattr(instance, "_horario_anterior", None)
+    if anterior is not None:
+        mover_agenda(instance, anterior)
+
+
+@receiver(post_delete, sender=Agenda)
+def invalidar_ao_apagar_agenda(sender, instance, **kwargs):
+    invalidar_disponibilidade(instance.espacoesportivo_id, instance.dia)
+
+
+# o preço mínimo só muda se a agenda era ou passou a ser ativa, ou mudou de preço/espaço
+@receiver(post_save, sender=Agenda)
+def atualizar_preco_ao_salvar_agenda(sender, instance, **kwargs):
+    atual = (instance.espacoesportivo_id, instance.preco, instance.status)
+    anterior = getattr(instance, "_preco_anterior", None)
+    if anterior is None:
+        if instance.status == "ativo":
+            marcar_precos(espacos=[instance.espacoesportivo_id])
+        return
+    if anterior != atual and "ativo" in (anterior[2], atual[2]):
+        marcar_precos(espacos={anterior[0], atual[0]})
+
+
+@receiver(post_delete, sender=Agenda)
+def atualizar_preco_ao_apagar_agenda(sender, instance, **kwargs):
+    if instance.status == "ativo":
+        marcar_precos(espacos=[instance.espacoesportivo_id])
+
+
+# reservar, cancelar ou concluir muda o que aparece como disponível no dia da agenda
+@receiver(post_save, sender=Reserva)
+@receiver(post_delete, sender=Reserva)
+def invalidar_ao_mudar_reserva(sender, instance, **kwargs):
+    agenda = instance.agenda
+    invalidar_disponibilidade(agenda.espacoesportivo_id, agenda.dia)
+
+
+# notas anteriores da reserva: vazias na criação e, se a reserva não veio do banco com as
+# notas carregadas (Reserva.from_db), lidas antes do UPDATE
+@receiver(pre_save, sender=Reserva)
+def guardar_notas_anteriores(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._notas_salvas = SEM_NOTAS
+    elif getattr(instance, "_notas_salvas", None) is None:
+        instance._notas_salvas = (
+            Reserva.objects.filter(pk=instance.pk).values_list(*NOTAS).first()
+            or SEM_NOTAS
+        )
+
+
+# aplica a diferença das notas ao resumo de avaliações do centro e do espaço. se a reserva
+# mudou de agenda para outro espaço, as notas anteriores saem do centro/espaço antigos
+# (Reserva.save guarda as cópias de antes em _copias_salvas) e entram inteiras nos novos
+@receiver(post_save, sender=Reserva)
+def atualizar_resumo_ao_salvar_reserva(sender, instance, created, **kwargs):
+    anteriores = instance._notas_salvas
+    copias = (instance.centro_esportivo_id, instance.espacoesportivo_id)
+    copias_salvas = getattr(instance, "_copias_salvas", copias)
+    if not created and copias_salvas != copias:
+        registrar_avaliacao(*copias_salvas, anteriores, SEM_NOTAS)
+        anteriores = SEM_NOTAS
+    registrar_avaliacao(*copias, anteriores, instance.notas())
+    instance._notas_salvas = instance.notas()
+
+
+@receiver(post_delete, sender=Reserva)
+def atualizar_resumo_ao_apagar_reserva(sender, instance, **kwargs):
+    anteriores = getattr(instance, "_notas_salvas", None) or instance.notas()
+    registrar_avaliacao(
+        instance.centro_esportivo_id, instance.espacoesportivo_id, anteriores, SEM_NOTAS
+    )
+
+
+# reservas e pagamentos apagados (inclusive em cascata com a agenda ou a reserva) saem da
+# EstatisticaDiaria; criação e mudanças de status são registradas pelas views
+@receiver(post_delete, sender=Reserva)
+def atualizar_estatisticas_ao_apagar_reserva(sender, instance, **kwargs):
+    remover_reserva(instance)
+
+
+@receiver(post_delete, sender=Pagamento)
+def atualizar_estatisticas_ao_apagar_pagamento(sender, instance, **kwargs):
+    remover_pagamento(instance.reserva.agenda, instance.valor)
+
+
+# qualquer centro criado, movido, reavaliado ou apagado muda as células do mapa
+@receiver(post_save, sender=CentroEsportivo)
+@receiver(post_delete, sender=CentroEsportivo)
+def invalidar_mapa_ao_mudar_centro(sender, instance, **kwargs):
+    invalidar_celulas()
+
+
+# mantém o documento do centro no índice de busca textual
+@receiver(post_save, sender=CentroEsportivo)
+def indexar_centro_ao_salvar(sender, instance, **kwargs):
+    indexar_centro(instance.pk)
+
+
+@receiver(post_delete, sender=CentroEsportivo)
+def remover_centro_da_busca(sender, instance, **kwargs):
+    remover_centro(instance.pk)
+
+
+# guarda o centro anterior do espaço para recalcular o preço dos dois centros se ele mudar
+@receiver(pre_save, sender=EspacoEsportivo)
+def guardar_centro_anterior_do_espaco(sender, instance, **kwargs):
+    instance._centro_anterior = None
+    if instance.pk is not None:
+        instance._centro_anterior = (
+            EspacoEsportivo.objects.filter(pk=instance.pk)
+            .values_list("centro_esportivo_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=EspacoEsportivo)
+def atualizar_preco_ao_mover_espaco(sender, instance, **kwargs):
+    anterior = getattr(instance, "_centro_anterior", None)
+    if anterior is not None and anterior != instance.centro_esportivo_id:
+        marcar_precos(espacos=[instance.pk], centros=[anterior])
+
+
+# o centro e o gerente copiados nas reservas e na EstatisticaDiaria acompanham o espaço
+# movido, em UPDATEs por espaço, e o resumo das avaliações dele muda de centro
+@receiver(post_save, sender=EspacoEsportivo)
+def mover_copias_ao_mover_espaco(sender, instance, **kwargs):
+    anterior = getattr(instance, "_centro_anterior", None)
+    if anterior is None or anterior == instance.centro_esportivo_id:
+        return
+    with transaction.atomic():
+        Reserva.objects.filter(espacoesportivo=instance).update(
+            centro_esportivo=instance.centro_esportivo_id,
+            gerente=instance.centro_esportivo.gerente_id,
+        )
+        EstatisticaDiaria.objects.filter(espacoesportivo=instance).update(
+            centro_esportivo=instance.centro_esportivo_id
+        )
+        mover_resumo_do_espaco(instance.pk, anterior, instance.centro_esportivo_id)
+
+
+@receiver(post_delete, sender=EspacoEsportivo)
+def atualizar_preco_ao_apagar_espaco(sender, instance, **kwargs):
+    marcar_precos(centros=[instance.centro_esportivo_id])
+
+
+# os nomes dos espaços fazem parte do documento do centro; o espaço movido sai também do
+# documento do centro anterior
+@receiver(post_save, sender=EspacoEsportivo)
+@receiver(post_delete, sender=EspacoEsportivo)
+def indexar_centro_ao_mudar_espaco(sender, instance, **kwargs):
+    indexar_centro(instance.centro_esportivo_id)
+    anterior = getattr(instance, "_centro_anterior", None)
+    if anterior is not None and anterior != instance.centro_esportivo_id:
+        indexar_centro(anterior)
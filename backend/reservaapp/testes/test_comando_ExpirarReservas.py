@@ -0,0 +1,107 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva, EstatisticaDiaria, Pagamento
+
+
+class ExpirarReservasTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.expiracao@email.com",
+            username="gerente.expiracao",
+            tipo="gerente",
+            nome_completo="Gerente Expiração",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.expiracao@email.com",
+            username="organizador.expiracao",
+            tipo="organizador",
+            nome_completo="Organizador Expiração",
+            cpf="98765432100"
+        )
+        centro = CentroEsportivo.objects.create(
+            nome="Centro Expiração",
+            descricao="Centro para testar a expiração de reservas",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=cls.gerente
+        )
+        cls.espaco = EspacoEsportivo.objects.create(
+            nome="Quadra Expiração", categoria="futsal", centro_esportivo=centro
+        )
+
+    def criar_reserva(self, status, minutos_atras):
+        agenda = Agenda.objects.create(
+            preco=Decimal('90.00'),
+            dia=date.today() + timedelta(days=1),
+            h_inicial=time(7 + Agenda.objects.count(), 0),
+            h_final=time(8 + Agenda.objects.count(), 0),
+            espacoesportivo=self.espaco,
+            status="indisponível"
+        )
+        reserva = Reserva.objects.create(organizador=self.organizador, agenda=agenda, status=status)
+        Reserva.objects.filter(pk=reserva.pk).update(
+            criado_em=timezone.now() - timedelta(minutes=minutos_atras)
+        )
+        return reserva
+
+    def expirar(self, tamanho_lote=500):
+        call_command('expirar_reservas', tamanho_lote=tamanho_lote, stdout=StringIO())
+
+    def test_cancela_pendentes_vencidas_e_libera_agendas(self):
+        """verifica se só as pendentes fora do prazo são canceladas, em vários lotes"""
+        vencidas = [self.criar_reserva("pendente", 60) for _ in range(3)]
+        recente = self.criar_reserva("pendente", 5)
+        paga = self.criar_reserva("pago", 60)
+
+        self.expirar(tamanho_lote=2)
+
+        for reserva in vencidas:
+            reserva.refresh_from_db()
+            reserva.agenda.refresh_from_db()
+            self.assertEqual(reserva.status, "cancelada")
+            self.assertIsNotNone(reserva.cancelar_reserva)
+            self.assertEqual(reserva.agenda.status, "ativo")
+        for reserva, status in ((recente, "pendente"), (paga, "pago")):
+            reserva.refresh_from_db()
+            reserva.agenda.refresh_from_db()
+            self.assertEqual(reserva.status, status)
+            self.assertEqual(reserva.agenda.status, "indisponível")
+
+    def test_nao_expira_reserva_com_pagamento_enviado(self):
+        """verifica se a pendente com pagamento aguardando confirmação continua reservada"""
+        com_pagamento = self.criar_reserva("pendente", 60)
+        Pagamento.objects.create(reserva=com_pagamento, valor=Decimal('90.00'))
+        sem_pagamento = self.criar_reserva("pendente", 60)
+
+        self.expirar()
+
+        for reserva, status, status_agenda in (
+            (com_pagamento, "pendente", "indisponível"),
+            (sem_pagamento, "cancelada", "ativo"),
+        ):
+            reserva.refresh_from_db()
+            reserva.agenda.refresh_from_db()
+            self.assertEqual(reserva.status, status)
+            self.assertEqual(reserva.agenda.status, status_agenda)
+
+    def test_atualiza_estatisticas(self):
+        """verifica se as estatísticas pré-agregadas acompanham a expiração"""
+        self.criar_reserva("pendente", 60)
+        self.criar_reserva("pendente", 60)
+        call_command('reconstruir_estatisticas', stdout=StringIO())
+
+        self.expirar()
+
+        totais = {
+            'pendentes': sum(EstatisticaDiaria.objects.values_list('pendentes', flat=True)),
+            'canceladas': sum(EstatisticaDiaria.objects.values_list('canceladas', flat=True)),
+        }
+        self.assertEqual(totais, {'pendentes': 0, 'canceladas': 2})
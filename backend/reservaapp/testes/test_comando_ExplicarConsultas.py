@@ -0,0 +1,22 @@
+from django.test import TestCase
+from django.core.management import call_command
+from io import StringIO
+from ..management.commands.explicar_consultas import varreduras
+
+
+class ExplicarConsultasTest(TestCase):
+    def test_consultas_principais_usam_indices(self):
+        """verifica se nenhuma consulta principal faz varredura sequencial"""
+        saida = StringIO()
+        call_command('explicar_consultas', estrito=True, silencioso=True, stdout=saida)
+        self.assertIn('Nenhuma varredura sequencial', saida.getvalue())
+
+    def test_detecta_varreduras_no_plano(self):
+        """verifica se as varreduras do SQLite e do PostgreSQL são reconhecidas"""
+        plano = "\n".join([
+            "4 0 0 SCAN reservaapp_agenda",
+            "5 0 0 SCAN reservaapp_reserva USING INDEX reserva_status_criado_idx",
+            "6 0 0 SCAN CONSTANT ROW",
+            "->  Seq Scan on reservaapp_centroesportivo  (cost=0.00..1.01 rows=1 width=4)",
+        ])
+        self.assertEqual(varreduras(plano), ['reservaapp_agenda', 'reservaapp_centroesportivo'])
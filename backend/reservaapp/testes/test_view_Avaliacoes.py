@@ -0,0 +1,163 @@
+from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest import mock
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva
+from ..pagination import PaginacaoAvaliacoes
+
+
+class AvaliacoesListagemTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        gerente = CustomUser.objects.create_user(
+            email="gerente.avaliacoes@email.com",
+            username="gerente.avaliacoes",
+            tipo="gerente",
+            nome_completo="Gerente Avaliações",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.avaliacoes@email.com",
+            username="organizador.avaliacoes",
+            tipo="organizador",
+            nome_completo="Organizador Avaliações",
+            cpf="98765432100"
+        )
+        cls.centro = CentroEsportivo.objects.create(
+            nome="Centro Avaliações",
+            descricao="Centro para teste da listagem de avaliações",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=gerente
+        )
+        cls.quadra = EspacoEsportivo.objects.create(nome="Quadra", categoria="futebol", centro_esportivo=cls.centro)
+        cls.piscina = EspacoEsportivo.objects.create(nome="Piscina", categoria="natação", centro_esportivo=cls.centro)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def criar_reserva(self, espaco, dias_atras=None, nota=4, comentario=""):
+        """cria uma reserva paga, avaliada há dias_atras dias (ou sem avaliação se None)"""
+        agenda = Agenda.objects.create(
+            preco=Decimal('80.00'),
+            dia=date.today() + timedelta(days=Agenda.objects.count() + 1),
+            h_inicial=time(8, 0),
+            h_final=time(9, 0),
+            espacoesportivo=espaco,
+            status="indisponível"
+        )
+        avaliacao = {}
+        if dias_atras is not None:
+            avaliacao = {
+                'nota_atendimento': nota,
+                'comentario_avaliacao': comentario,
+                'avaliado_em': timezone.now() - timedelta(days=dias_atras),
+            }
+        return Reserva.objects.create(organizador=self.organizador, agenda=agenda, status="pago", **avaliacao)
+
+    def test_lista_somente_avaliadas_das_mais_recentes(self):
+        """verifica se só as reservas avaliadas aparecem, das mais recentes para as mais antigas"""
+        self.criar_reserva(self.quadra, 3, comentario="Antiga")
+        self.criar_reserva(self.quadra)
+        self.criar_reserva(self.piscina, 1, comentario="Recente")
+
+        response = self.client.get(f'/api/centros/{self.centro.id}/avaliacoes')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a['comentario_avaliacao'] for a in response.data['results']], ["Recente", "Antiga"])
+        self.assertEqual(
+            set(response.data['results'][0]),
+            {'nome_completo', 'nota_atendimento', 'nota_espacoesportivo', 'nota_limpeza',
+             'comentario_avaliacao', 'avaliado_em'}
+        )
+        self.assertEqual(response.data['results'][0]['nome_completo'], "Organizador Avaliações")
+
+    def test_avaliacoes_do_espaco(self):
+        """verifica se a listagem do espaço traz só as avaliações das reservas dele"""
+        self.criar_reserva(self.quadra, 2, comentario="Quadra")
+        self.criar_reserva(self.piscina, 1, comentario="Piscina")
+
+        response = self.client.get(f'/api/espacos/{self.quadra.id}/avaliacoes')
+
+        self.assertEqual([a['comentario_avaliacao'] for a in response.data['results']], ["Quadra"])
+
+    def test_paginacao_por_cursor_percorre_todas(self):
+        """verifica se as páginas seguem pelo cursor sem repetir nem pular avaliações"""
+        for dias in range(7):
+            self.criar_reserva(self.quadra, dias, comentario=f"{dias}")
+
+        comentarios = []
+        response = self.client.get(f'/api/centros/{self.centro.id}/avaliacoes', {'page_size': 3})
+        while True:
+            comentarios += [a['comentario_avaliacao'] for a in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(comentarios, [str(dias) for dias in range(7)])
+
+    def test_paginacao_com_datas_iguais(self):
+        """verifica se avaliações com o mesmo avaliado_em são percorridas pelo id, sem repetir"""
+        for i in range(7):
+            self.criar_reserva(self.quadra, 2, comentario=f"{i}")
+        Reserva.objects.update(avaliado_em=timezone.now() - timedelta(days=2))
+
+        comentarios = []
+        with mock.patch.object(PaginacaoAvaliacoes, 'offset_cutoff', 1):
+            response = self.client.get(f'/api/centros/{self.centro.id}/avaliacoes', {'page_size': 2})
+            while True:
+                comentarios += [a['comentario_avaliacao'] for a in response.data['results']]
+                if not response.data['next']:
+                    break
+                response = self.client.get(response.data['next'])
+
+        self.assertEqual(comentarios, [str(i) for i in reversed(range(7))])
+
+    def test_notas_gravadas_fora_da_view_aparecem_na_listagem(self):
+        """verifica se notas salvas direto no model recebem avaliado_em e entram na listagem"""
+        criada = self.criar_reserva(self.quadra)
+        criada.nota_limpeza = 3
+        criada.comentario_avaliacao = "Pelo admin"
+        criada.save()
+        agenda = Agenda.objects.create(
+            preco=Decimal('80.00'),
+            dia=date.today() + timedelta(days=30),
+            h_inicial=time(8, 0),
+            h_final=time(9, 0),
+            espacoesportivo=self.piscina,
+            status="indisponível"
+        )
+        Reserva.objects.create(
+            organizador=self.organizador, agenda=agenda, status="pago", nota_atendimento=5, comentario_avaliacao="Script"
+        )
+
+        response = self.client.get(f'/api/centros/{self.centro.id}/avaliacoes')
+
+        self.assertEqual(sorted(a['comentario_avaliacao'] for a in response.data['results']), ["Pelo admin", "Script"])
+        self.centro.refresh_from_db()
+        self.assertEqual(self.centro.total_avaliacoes, len(response.data['results']))
+
+    def test_usa_numero_constante_de_consultas(self):
+        """verifica se o nome de quem avaliou vem no mesmo SELECT das avaliações"""
+        self.criar_reserva(self.quadra, 1)
+        with CaptureQueriesContext(connection) as poucas:
+            self.client.get(f'/api/centros/{self.centro.id}/avaliacoes')
+
+        for dias in range(2, 10):
+            self.criar_reserva(self.quadra, dias)
+        with CaptureQueriesContext(connection) as muitas:
+            response = self.client.get(f'/api/centros/{self.centro.id}/avaliacoes')
+
+        self.assertEqual(len(response.data['results']), 9)
+        self.assertEqual(len(poucas), len(muitas))
+
+    def test_centro_ou_espaco_inexistente(self):
+        """verifica se um centro ou espaço inexistente retorna 404"""
+        self.assertEqual(self.client.get('/api/centros/999999/avaliacoes').status_code, 404)
+        self.assertEqual(self.client.get('/api/espacos/999999/avaliacoes').status_code, 404)
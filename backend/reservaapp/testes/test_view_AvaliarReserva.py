@@ -0,0 +1,216 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva
+from ..pagination import PaginacaoOrdenavel
+
+
+class BaseTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.avaliacao@email.com",
+            username="gerente.avaliacao",
+            tipo="gerente",
+            nome_completo="Gerente Avaliação",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.avaliacao@email.com",
+            username="organizador.avaliacao",
+            tipo="organizador",
+            nome_completo="Organizador Avaliação",
+            cpf="98765432100"
+        )
+        cls.outro_organizador = CustomUser.objects.create_user(
+            email="outro.avaliacao@email.com",
+            username="outro.avaliacao",
+            tipo="organizador",
+            nome_completo="Outro Organizador",
+            cpf="11122233344"
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.organizador)
+
+    def criar_espaco(self, nome):
+        centro = CentroEsportivo.objects.create(
+            nome=nome,
+            descricao="Centro para teste de avaliações",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=self.gerente
+        )
+        return EspacoEsportivo.objects.create(nome=f"Quadra {nome}", categoria="futebol", centro_esportivo=centro)
+
+    def criar_reserva(self, espaco, status="pago", **notas):
+        agenda = Agenda.objects.create(
+            preco=Decimal('80.00'),
+            dia=date.today() + timedelta(days=1),
+            h_inicial=time(6 + Agenda.objects.filter(espacoesportivo=espaco).count(), 0),
+            h_final=time(7 + Agenda.objects.filter(espacoesportivo=espaco).count(), 0),
+            espacoesportivo=espaco,
+            status="indisponível"
+        )
+        return Reserva.objects.create(organizador=self.organizador, agenda=agenda, status=status, **notas)
+
+    def avaliar(self, reserva, **dados):
+        return self.client.post(f'/api/reservas/{reserva.id}/avaliar', dados, format='json')
+
+    def resumo(self, objeto):
+        objeto.refresh_from_db()
+        return (
+            objeto.total_avaliacoes,
+            objeto.media_avaliacao,
+            (objeto.soma_atendimento, objeto.avaliacoes_atendimento),
+            (objeto.soma_espacoesportivo, objeto.avaliacoes_espacoesportivo),
+            (objeto.soma_limpeza, objeto.avaliacoes_limpeza),
+        )
+
+
+class AvaliarReservaTest(BaseTestCase):
+    def test_avaliacao_atualiza_resumo_do_centro_e_do_espaco(self):
+        """verifica se avaliar grava as notas, a data e soma no resumo do centro e do espaço"""
+        espaco = self.criar_espaco("Centro A")
+        self.criar_reserva(espaco, nota_atendimento=3)
+        reserva = self.criar_reserva(espaco)
+
+        response = self.avaliar(reserva, nota_atendimento=5, nota_limpeza=4, comentario_avaliacao="Muito bom")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data['avaliado_em'])
+        esperado = (2, Decimal('4.0'), (8, 2), (0, 0), (4, 1))
+        self.assertEqual(self.resumo(espaco), esperado)
+        self.assertEqual(self.resumo(espaco.centro_esportivo), esperado)
+
+    def test_reavaliar_aplica_so_a_diferenca(self):
+        """verifica se mudar ou acrescentar notas não conta a reserva de novo"""
+        espaco = self.criar_espaco("Centro A")
+        reserva = self.criar_reserva(espaco)
+        self.avaliar(reserva, nota_atendimento=2)
+
+        response = self.avaliar(reserva, nota_atendimento=4, nota_espacoesportivo=5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.resumo(espaco), (1, Decimal('4.5'), (4, 1), (5, 1), (0, 0)))
+
+    def test_avaliacao_usa_numero_constante_de_consultas(self):
+        """verifica se o custo de avaliar não depende de quantas avaliações o centro já tem"""
+        espaco = self.criar_espaco("Centro A")
+        primeira = self.criar_reserva(espaco)
+        with CaptureQueriesContext(connection) as poucas:
+            self.avaliar(primeira, nota_atendimento=5)
+
+        for _ in range(10):
+            self.criar_reserva(espaco, nota_atendimento=4)
+        ultima = self.criar_reserva(espaco)
+        with CaptureQueriesContext(connection) as muitas:
+            self.avaliar(ultima, nota_atendimento=5)
+
+        self.assertEqual(len(poucas), len(muitas))
+        self.assertEqual(self.resumo(espaco)[:2], (12, Decimal('4.2')))
+
+    def test_apagar_reserva_remove_do_resumo(self):
+        """verifica se a reserva apagada sai das somas e da média"""
+        espaco = self.criar_espaco("Centro A")
+        self.criar_reserva(espaco, nota_atendimento=5)
+        self.criar_reserva(espaco, nota_atendimento=1).delete()
+
+        self.assertEqual(self.resumo(espaco.centro_esportivo)[:3], (1, Decimal('5.0'), (5, 1)))
+
+    def test_somente_organizador_da_reserva_concluida_avalia(self):
+        """verifica se outro organizador, reserva não concluída e nota inválida são recusados"""
+        espaco = self.criar_espaco("Centro A")
+        paga = self.criar_reserva(espaco)
+        pendente = self.criar_reserva(espaco, status="pendente")
+
+        self.assertEqual(self.avaliar(pendente, nota_atendimento=5).status_code, 400)
+        self.assertEqual(self.avaliar(paga, nota_atendimento=6).status_code, 400)
+        self.assertEqual(self.avaliar(paga, comentario_avaliacao="Sem nota").status_code, 400)
+        self.client.force_authenticate(user=self.outro_organizador)
+        self.assertEqual(self.avaliar(paga, nota_atendimento=5).status_code, 403)
+        self.assertEqual(self.client.post('/api/reservas/999999/avaliar', {}, format='json').status_code, 404)
+
+        self.assertEqual(self.resumo(espaco)[0], 0)
+
+    def test_reconstruir_avaliacoes_bate_com_o_incremental(self):
+        """verifica se o comando recalcula o mesmo resumo mantido pelas avaliações"""
+        espaco = self.criar_espaco("Centro A")
+        self.criar_reserva(espaco, nota_atendimento=5, nota_limpeza=2)
+        self.criar_reserva(espaco, nota_espacoesportivo=4)
+        self.criar_reserva(espaco)
+        esperado = self.resumo(espaco.centro_esportivo)
+        CentroEsportivo.objects.update(total_avaliacoes=0, soma_atendimento=0, media_avaliacao=0)
+        EspacoEsportivo.objects.update(total_avaliacoes=7)
+
+        call_command('reconstruir_avaliacoes', stdout=StringIO())
+
+        self.assertEqual(self.resumo(espaco.centro_esportivo), esperado)
+        self.assertEqual(self.resumo(espaco), esperado)
+
+    def test_trocar_agenda_leva_copias_e_notas_para_o_novo_espaco(self):
+        """verifica se mudar a agenda da reserva refaz espaço, centro e gerente e move as notas no resumo"""
+        origem = self.criar_espaco("Centro A")
+        destino = self.criar_espaco("Centro B")
+        reserva = Reserva.objects.get(pk=self.criar_reserva(origem, nota_atendimento=4).pk)
+        nova_agenda = self.criar_reserva(destino).agenda
+        Reserva.objects.filter(agenda=nova_agenda).delete()
+
+        reserva.agenda = nova_agenda
+        reserva.save()
+
+        self.assertEqual(
+            (reserva.espacoesportivo_id, reserva.centro_esportivo_id, reserva.gerente_id),
+            (destino.id, destino.centro_esportivo_id, self.gerente.id)
+        )
+        self.assertEqual(self.resumo(origem)[0], 0)
+        self.assertEqual(self.resumo(origem.centro_esportivo)[0], 0)
+        self.assertEqual(self.resumo(destino)[:3], (1, Decimal('4.0'), (4, 1)))
+        self.assertEqual(self.resumo(destino.centro_esportivo)[:3], (1, Decimal('4.0'), (4, 1)))
+
+
+class OrdenacaoPorAvaliacaoTest(BaseTestCase):
+    def test_listagens_ordenam_por_avaliacao(self):
+        """verifica se centros e espaços podem ser ordenados pela média das avaliações"""
+        for nome, nota in (("Centro Medio", 3), ("Centro Bom", 5), ("Centro Ruim", 1)):
+            self.criar_reserva(self.criar_espaco(nome), nota_atendimento=nota)
+        self.client.force_authenticate(user=self.gerente)
+
+        response = self.client.get('/api/centros-esportivos', {'ordenar': '-avaliacao'})
+        self.assertEqual(
+            [centro['nome'] for centro in response.data['results']],
+            ['Centro Bom', 'Centro Medio', 'Centro Ruim']
+        )
+        response = self.client.get('/api/espacos', {'ordenar': 'avaliacao'})
+        self.assertEqual(
+            [espaco['media_avaliacao'] for espaco in response.data['results']],
+            ['1.0', '3.0', '5.0']
+        )
+
+    def test_paginacao_com_medias_iguais(self):
+        """verifica se muitos centros com a mesma média são percorridos sem repetir, mesmo além do offset_cutoff"""
+        for i in range(7):
+            self.criar_espaco(f"Centro Sem Nota {i}")
+        self.criar_reserva(self.criar_espaco("Centro Avaliado"), nota_atendimento=4)
+        self.client.force_authenticate(user=self.gerente)
+        esperado = list(CentroEsportivo.objects.order_by('-media_avaliacao', '-id').values_list('id', flat=True))
+
+        ids = []
+        with mock.patch.object(PaginacaoOrdenavel, 'offset_cutoff', 1):
+            response = self.client.get('/api/centros-esportivos', {'ordenar': '-avaliacao', 'page_size': 2})
+            while True:
+                ids += [centro['id'] for centro in response.data['results']]
+                if not response.data['next']:
+                    break
+                response = self.client.get(response.data['next'])
+
+        self.assertEqual(ids, esperado)
@@ -0,0 +1,142 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva, BloqueioAgenda
+
+
+class BloqueioAgendaTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.bloqueio@email.com",
+            username="gerente.bloqueio",
+            tipo="gerente",
+            nome_completo="Gerente Bloqueio",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.bloqueio@email.com",
+            username="organizador.bloqueio",
+            tipo="organizador",
+            nome_completo="Organizador Bloqueio",
+            cpf="98765432100"
+        )
+        cls.outro_organizador = CustomUser.objects.create_user(
+            email="outro.bloqueio@email.com",
+            username="outro.bloqueio",
+            tipo="organizador",
+            nome_completo="Outro Organizador",
+            cpf="11122233344"
+        )
+        centro = CentroEsportivo.objects.create(
+            nome="Centro Bloqueio",
+            descricao="Centro para teste de bloqueio",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=cls.gerente
+        )
+        cls.espaco = EspacoEsportivo.objects.create(
+            nome="Quadra Bloqueio",
+            categoria="futebol",
+            centro_esportivo=centro
+        )
+        cls.dia = date.today() + timedelta(days=1)
+        cls.agenda = Agenda.objects.create(
+            preco=Decimal('100.00'),
+            dia=cls.dia,
+            h_inicial=time(10, 0),
+            h_final=time(11, 0),
+            espacoesportivo=cls.espaco
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.organizador)
+
+    def bloquear(self, usuario):
+        self.client.force_authenticate(user=usuario)
+        return self.client.post(f'/api/agendas/{self.agenda.id}/bloquear')
+
+    def reservar(self, usuario):
+        self.client.force_authenticate(user=usuario)
+        return self.client.post('/api/reservar', {'agenda': self.agenda.id}, format='json')
+
+    def test_bloqueio_criado_e_repetido_pelo_mesmo_organizador(self):
+        """verifica se o bloqueio é criado uma vez e devolvido nas chamadas seguintes"""
+        primeira = self.bloquear(self.organizador)
+        segunda = self.bloquear(self.organizador)
+
+        self.assertEqual(primeira.status_code, 201)
+        self.assertEqual(segunda.status_code, 200)
+        self.assertEqual(primeira.data['id'], segunda.data['id'])
+
+    def test_bloqueio_de_outro_organizador_retorna_409(self):
+        """verifica se um horário bloqueado não pode ser bloqueado nem reservado por outro"""
+        self.bloquear(self.organizador)
+
+        self.assertEqual(self.bloquear(self.outro_organizador).status_code, 409)
+        self.assertEqual(self.reservar(self.outro_organizador).status_code, 409)
+        self.assertFalse(Reserva.objects.exists())
+
+    def test_reserva_consome_o_proprio_bloqueio(self):
+        """verifica se o dono do bloqueio consegue reservar e o bloqueio é removido"""
+        self.bloquear(self.organizador)
+
+        response = self.reservar(self.organizador)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(BloqueioAgenda.objects.exists())
+
+    def test_bloqueio_expirado_libera_o_horario(self):
+        """verifica se um bloqueio vencido não impede outro organizador"""
+        self.bloquear(self.organizador)
+        BloqueioAgenda.objects.update(expira_em=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(self.reservar(self.outro_organizador).status_code, 201)
+
+    def test_horarios_disponiveis_omitem_bloqueio_valido(self):
+        """verifica se o horário bloqueado some da disponibilidade até expirar"""
+        url = f'/api/espacos/{self.espaco.id}/horarios_disponiveis?dia={self.dia}'
+        self.bloquear(self.organizador)
+
+        response = self.client.get(url)
+        self.assertEqual(sum(len(horarios) for horarios in response.data.values()), 0)
+
+        # o snapshot em cache venceria junto com o bloqueio; aqui o vencimento é simulado
+        BloqueioAgenda.objects.update(expira_em=timezone.now() - timedelta(seconds=1))
+        cache.clear()
+        response = self.client.get(url)
+        self.assertEqual(sum(len(horarios) for horarios in response.data.values()), 1)
+
+    def test_prorrogacao_permitida_uma_unica_vez(self):
+        """verifica se o bloqueio pode ser prorrogado só uma vez e só pelo dono"""
+        bloqueio_id = self.bloquear(self.organizador).data['id']
+
+        self.client.force_authenticate(user=self.outro_organizador)
+        self.assertEqual(self.client.post(f'/api/bloqueios/{bloqueio_id}/prorrogar').status_code, 400)
+
+        self.client.force_authenticate(user=self.organizador)
+        primeira = self.client.post(f'/api/bloqueios/{bloqueio_id}/prorrogar')
+        segunda = self.client.post(f'/api/bloqueios/{bloqueio_id}/prorrogar')
+
+        self.assertEqual(primeira.status_code, 200)
+        self.assertTrue(primeira.data['prorrogado'])
+        self.assertEqual(segunda.status_code, 400)
+
+    def test_comando_libera_somente_bloqueios_vencidos(self):
+        """verifica se o comando apaga apenas os bloqueios expirados"""
+        self.bloquear(self.organizador)
+        call_command('liberar_bloqueios', stdout=StringIO())
+        self.assertEqual(BloqueioAgenda.objects.count(), 1)
+
+        BloqueioAgenda.objects.update(expira_em=timezone.now() - timedelta(seconds=1))
+        call_command('liberar_bloqueios', stdout=StringIO())
+        self.assertFalse(BloqueioAgenda.objects.exists())
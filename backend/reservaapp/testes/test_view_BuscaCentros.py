@@ -0,0 +1,88 @@
+from django.test import TestCase
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from io import StringIO
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo
+
+
+class BuscaCentrosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.buscatexto@email.com",
+            username="gerente.buscatexto",
+            tipo="gerente",
+            nome_completo="Gerente Busca Texto",
+            cpf="12345678900"
+        )
+        cls.arena = cls.criar_centro("Arena São João", "Quadras cobertas", "Natal")
+        cls.clube = cls.criar_centro("Clube do Bairro", "Perto da Arena das Dunas", "Parnamirim")
+        cls.complexo = cls.criar_centro("Complexo Esportivo", "Piscina olímpica", "Recife")
+        EspacoEsportivo.objects.create(nome="Quadra de Areia", categoria="volei", centro_esportivo=cls.complexo)
+
+    @classmethod
+    def criar_centro(cls, nome, descricao, cidade):
+        return CentroEsportivo.objects.create(
+            nome=nome,
+            descricao=descricao,
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade=cidade,
+            UF="RN",
+            gerente=cls.gerente
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def buscar(self, termo):
+        response = self.client.get('/api/centros/busca', {'q': termo})
+        self.assertEqual(response.status_code, 200)
+        return [centro['nome'] for centro in response.data['results']]
+
+    def test_ranqueia_nome_acima_da_descricao(self):
+        """verifica se o termo no nome vem antes do termo só na descrição"""
+        self.assertEqual(self.buscar('arena'), ['Arena São João', 'Clube do Bairro'])
+
+    def test_prefixo_e_acentos(self):
+        """verifica se palavras incompletas e sem acento encontram o centro"""
+        self.assertEqual(self.buscar('sao jo'), ['Arena São João'])
+        self.assertEqual(self.buscar('olimp'), ['Complexo Esportivo'])
+
+    def test_indice_acompanha_espacos_e_edicoes(self):
+        """verifica se salvar centros e espaços atualiza o índice"""
+        self.assertEqual(self.buscar('areia'), ['Complexo Esportivo'])
+
+        EspacoEsportivo.objects.create(nome="Campo de Areia", categoria="futebol", centro_esportivo=self.clube)
+        self.assertEqual(sorted(self.buscar('areia')), ['Clube do Bairro', 'Complexo Esportivo'])
+
+        self.arena.nome = "Ginásio Central"
+        self.arena.save()
+        self.assertEqual(self.buscar('central'), ['Ginásio Central'])
+        self.assertEqual(self.buscar('joao'), [])
+
+        self.complexo.delete()
+        self.assertEqual(self.buscar('areia'), ['Clube do Bairro'])
+
+    def test_espaco_movido_sai_do_centro_anterior(self):
+        """verifica se o espaço movido de centro só é encontrado no centro novo"""
+        espaco = EspacoEsportivo.objects.create(nome="Zebraquadra", categoria="futsal", centro_esportivo=self.arena)
+        espaco.centro_esportivo = self.clube
+        espaco.save()
+
+        self.assertEqual(self.buscar('zebraquadra'), ['Clube do Bairro'])
+
+    def test_filtro_busca_na_listagem(self):
+        """verifica se ?busca= na listagem usa o índice combinado com os outros filtros"""
+        self.client.force_authenticate(user=self.gerente)
+        response = self.client.get('/api/centros-esportivos', {'busca': 'arena', 'cidade': 'natal'})
+        self.assertEqual([c['nome'] for c in response.data['results']], ['Arena São João'])
+
+    def test_comando_reconstroi_indice(self):
+        """verifica se o comando recria os documentos a partir das tabelas"""
+        call_command('reconstruir_busca', stdout=StringIO())
+        self.assertEqual(self.buscar('recife'), ['Complexo Esportivo'])
+
+    def test_termo_obrigatorio(self):
+        """verifica se a busca sem termo é recusada"""
+        self.assertEqual(self.client.get('/api/centros/busca').status_code, 400)
@@ -0,0 +1,110 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva
+
+
+class BuscaHorariosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.busca@email.com",
+            username="gerente.busca",
+            tipo="gerente",
+            nome_completo="Gerente Busca",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.busca@email.com",
+            username="organizador.busca",
+            tipo="organizador",
+            nome_completo="Organizador Busca",
+            cpf="98765432100"
+        )
+        cls.dia = date.today() + timedelta(days=4)
+        for cidade, UF in (("Natal", "RN"), ("Recife", "PE")):
+            centro = CentroEsportivo.objects.create(
+                nome=f"Centro {cidade}",
+                descricao="Centro para testar a busca de horários",
+                latitude=-5.7945,
+                longitude=-35.211,
+                cidade=cidade,
+                UF=UF,
+                gerente=cls.gerente
+            )
+            for categoria in ("futebol", "volei"):
+                espaco = EspacoEsportivo.objects.create(
+                    nome=f"{categoria} {cidade}", categoria=categoria, centro_esportivo=centro
+                )
+                for hora, preco in ((8, '50.00'), (19, '120.00'), (20, '90.00')):
+                    Agenda.objects.create(
+                        preco=Decimal(preco),
+                        dia=cls.dia,
+                        h_inicial=time(hora, 0),
+                        h_final=time(hora + 1, 0),
+                        espacoesportivo=espaco
+                    )
+        ocupada = Agenda.objects.get(
+            dia=cls.dia, h_inicial=time(20, 0),
+            espacoesportivo__categoria="futebol", espacoesportivo__centro_esportivo__cidade="Natal"
+        )
+        Reserva.objects.create(organizador=cls.organizador, agenda=ocupada, status="pago")
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def buscar(self, parametros):
+        return self.client.get('/api/horarios/busca', {'dia': self.dia.isoformat(), **parametros})
+
+    def test_filtra_cidade_categoria_janela_e_preco(self):
+        """verifica se só voltam horários livres dentro de todos os filtros"""
+        with self.assertNumQueries(1):
+            response = self.buscar({'cidade': 'natal', 'categoria': 'futebol', 'h_inicio': '18:00'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([h['h_inicial'] for h in response.data['results']], ['19:00:00'])
+        self.assertEqual(response.data['results'][0]['centro_nome'], 'Centro Natal')
+
+        response = self.buscar({'UF': 'PE', 'h_inicio': '18:00', 'preco_max': '100'})
+        self.assertEqual(
+            [(h['categoria'], h['h_inicial']) for h in response.data['results']],
+            [('futebol', '20:00:00'), ('volei', '20:00:00')]
+        )
+
+    def test_ordenacao_por_preco_e_paginacao(self):
+        """verifica se ?ordenar=preco ordena pelo preço e a paginação percorre tudo"""
+        response = self.buscar({'ordenar': 'preco', 'page_size': 5})
+        precos = [h['preco'] for h in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            precos += [h['preco'] for h in response.data['results']]
+
+        self.assertEqual(len(precos), 11)
+        self.assertEqual(precos, sorted(precos, key=Decimal))
+
+    def test_paginacao_com_empates_usa_horario_e_id(self):
+        """verifica se o cursor percorre horários iguais sem repetir e volta pelo previous"""
+        paginas = []
+        response = self.buscar({'page_size': 1})
+        while True:
+            paginas.append([(h['h_inicial'], h['id']) for h in response.data['results']])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        horarios = [item for pagina in paginas for item in pagina]
+        self.assertEqual(len(horarios), 11)
+        self.assertEqual(horarios, sorted(set(horarios)))
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([(h['h_inicial'], h['id']) for h in response.data['results']], paginas[-2])
+
+    def test_cursor_adulterado(self):
+        """verifica se um cursor com posição inválida retorna 404"""
+        response = self.buscar({'cursor': 'cD0lNUIlMjJ4JTIyJTJDKyUyMjElMjIlNUQ='})
+        self.assertEqual(response.status_code, 404)
+
+    def test_dia_obrigatorio(self):
+        """verifica se a busca sem dia é recusada"""
+        self.assertEqual(self.client.get('/api/horarios/busca?cidade=Natal').status_code, 400)
@@ -0,0 +1,150 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva
+
+
+class BaseTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.listagem@email.com",
+            username="gerente.listagem",
+            tipo="gerente",
+            nome_completo="Gerente Listagem",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.listagem@email.com",
+            username="organizador.listagem",
+            tipo="organizador",
+            nome_completo="Organizador Listagem",
+            cpf="98765432100"
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.gerente)
+
+    def criar_centros(self, quantidade):
+        """cria centros com um espaço, duas agendas e uma reserva avaliada cada"""
+        inicio = CentroEsportivo.objects.count()
+        for i in range(inicio, inicio + quantidade):
+            centro = CentroEsportivo.objects.create(
+                nome=f"Centro {i}",
+                descricao="Centro para teste de listagem",
+                latitude=-5.7945,
+                longitude=-35.211,
+                cidade="Natal",
+                UF="RN",
+                gerente=self.gerente
+            )
+            espaco = EspacoEsportivo.objects.create(
+                nome=f"Quadra {i}",
+                categoria="futebol",
+                centro_esportivo=centro
+            )
+            agenda = Agenda.objects.create(
+                preco=Decimal('80.00') + i,
+                dia=date.today() + timedelta(days=1),
+                h_inicial=time(8, 0),
+                h_final=time(9, 0),
+                espacoesportivo=espaco
+            )
+            Agenda.objects.create(
+                preco=Decimal('200.00'),
+                dia=date.today() + timedelta(days=1),
+                h_inicial=time(9, 0),
+                h_final=time(10, 0),
+                espacoesportivo=espaco
+            )
+            Reserva.objects.create(
+                organizador=self.organizador,
+                agenda=agenda,
+                nota_atendimento=5
+            )
+
+
+class CentroEsportivoListagemTest(BaseTestCase):
+    def contar_consultas_listagem(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/api/centros-esportivos')
+        self.assertEqual(response.status_code, 200)
+        return len(consultas), response
+
+    def test_listagem_retorna_menor_preco_e_total_avaliacoes(self):
+        """verifica se os valores anotados são os mesmos calculados pelo serializer"""
+        self.criar_centros(1)
+        _, response = self.contar_consultas_listagem()
+
+        centro = response.data['results'][0]
+        self.assertEqual(centro['menor_preco'], Decimal('80.00'))
+        self.assertEqual(centro['total_avaliacoes'], 1)
+
+    def test_listagem_usa_numero_constante_de_consultas(self):
+        """verifica se o número de consultas não cresce com a quantidade de centros"""
+        self.criar_centros(2)
+        consultas_poucos, _ = self.contar_consultas_listagem()
+
+        self.criar_centros(10)
+        consultas_muitos, response = self.contar_consultas_listagem()
+
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(consultas_poucos, consultas_muitos)
+
+    def test_meus_centros_usa_numero_constante_de_consultas(self):
+        """verifica se a listagem dos centros do gerente não cresce com a quantidade de centros"""
+        self.criar_centros(2)
+        with CaptureQueriesContext(connection) as poucos:
+            self.client.get('/api/me/centros')
+
+        self.criar_centros(10)
+        with CaptureQueriesContext(connection) as muitos:
+            response = self.client.get('/api/me/centros')
+
+        self.assertEqual(len(response.data), 12)
+        self.assertEqual(len(poucos), len(muitos))
+
+
+class CentroEsportivoFiltroCategoriaTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.criar_centros(2)
+        self.futsal = CentroEsportivo.objects.get(nome="Centro 1")
+        EspacoEsportivo.objects.filter(centro_esportivo=self.futsal).update(categoria="futsal")
+        # um segundo espaço da mesma categoria não pode duplicar o centro no resultado
+        EspacoEsportivo.objects.create(nome="Quadra extra", categoria=" Futebol ", centro_esportivo=self.futsal)
+
+    def nomes(self, categoria):
+        response = self.client.get('/api/centros-esportivos', {'categoria_espaco': categoria})
+        self.assertEqual(response.status_code, 200)
+        return sorted(centro['nome'] for centro in response.data['results'])
+
+    def test_categoria_e_gravada_normalizada(self):
+        """verifica se a categoria do espaço é gravada em minúsculas e sem espaços"""
+        self.assertTrue(EspacoEsportivo.objects.filter(nome="Quadra extra", categoria="futebol").exists())
+
+    def test_filtro_por_categoria_ignora_maiusculas(self):
+        """verifica se o filtro por categoria não diferencia maiúsculas e não duplica centros"""
+        self.assertEqual(self.nomes('FUTEBOL'), ['Centro 0', 'Centro 1'])
+        self.assertEqual(self.nomes('futsal'), ['Centro 1'])
+
+    def test_filtro_por_varias_categorias(self):
+        """verifica se várias categorias separadas por vírgula devolvem cada centro uma vez"""
+        self.assertEqual(self.nomes('futsal, futebol'), ['Centro 0', 'Centro 1'])
+        self.assertEqual(self.nomes('volei,futsal'), ['Centro 1'])
+        self.assertEqual(self.nomes(','), ['Centro 0', 'Centro 1'])
+
+    def test_benchmark_desfaz_dados_gerados(self):
+        """verifica se o comando de benchmark mede as consultas sem deixar dados no banco"""
+        espacos = EspacoEsportivo.objects.count()
+        saida = StringIO()
+        call_command('benchmark_categoria', espacos=40, repeticoes=1, stdout=saida)
+
+        self.assertIn('exists', saida.getvalue())
+        self.assertEqual(EspacoEsportivo.objects.count(), espacos)
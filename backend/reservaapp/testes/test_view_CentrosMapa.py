@@ -0,0 +1,83 @@
+from django.test import TestCase
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from decimal import Decimal
+from ..models import CustomUser, CentroEsportivo
+
+# (nome, latitude, longitude, media_avaliacao)
+CENTROS = [
+    ("Ponta Negra", -5.8800, -35.1800, Decimal('4.5')),
+    ("Centro Natal", -5.7945, -35.2110, Decimal('3.0')),
+    ("Parnamirim", -5.9156, -35.2628, Decimal('4.9')),
+    ("Recife", -8.0476, -34.8770, Decimal('4.0')),
+]
+
+NORDESTE = {'lat_min': -10, 'lat_max': -4, 'lon_min': -37, 'lon_max': -34}
+
+
+class CentrosMapaTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.mapa@email.com",
+            username="gerente.mapa",
+            tipo="gerente",
+            nome_completo="Gerente Mapa",
+            cpf="12345678900"
+        )
+        for nome, latitude, longitude, media in CENTROS:
+            CentroEsportivo.objects.create(
+                nome=nome,
+                descricao="Centro para testar o mapa",
+                latitude=latitude,
+                longitude=longitude,
+                cidade=nome,
+                UF="RN",
+                media_avaliacao=media,
+                gerente=cls.gerente
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def buscar(self, zoom, **retangulo):
+        return self.client.get('/api/centros/mapa', {**NORDESTE, **retangulo, 'zoom': zoom})
+
+    def test_zoom_baixo_agrupa_a_regiao(self):
+        """verifica se no zoom baixo os centros próximos viram uma célula com o mais bem avaliado"""
+        response = self.buscar(3)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        grupo = response.data[0]
+        self.assertEqual(grupo['total'], 4)
+        self.assertEqual(grupo['melhor_avaliado']['nome'], 'Parnamirim')
+        self.assertAlmostEqual(grupo['latitude'], sum(c[1] for c in CENTROS) / 4, places=4)
+
+    def test_zoom_alto_separa_e_respeita_o_retangulo(self):
+        """verifica se no zoom alto cada centro fica na sua célula e o retângulo filtra"""
+        self.assertEqual(len(self.buscar(12).data), 4)
+        response = self.buscar(12, lat_min=-6.5, lat_max=-5.5, lon_min=-35.5, lon_max=-35)
+        self.assertEqual(sorted(g['melhor_avaliado']['nome'] for g in response.data),
+                         ['Centro Natal', 'Parnamirim', 'Ponta Negra'])
+
+    def test_celulas_em_cache_ate_um_centro_mudar(self):
+        """verifica se mover o mapa não consulta o banco e mudar um centro invalida"""
+        self.buscar(8)
+        with self.assertNumQueries(0):
+            self.buscar(8, lat_min=-9)
+
+        CentroEsportivo.objects.filter(nome='Recife').get().delete()
+        self.assertEqual(sum(g['total'] for g in self.buscar(8).data), 3)
+
+    def test_parametros_invalidos(self):
+        """verifica se zoom fora do intervalo ou retângulo invertido retornam 400"""
+        self.assertEqual(self.buscar(25).status_code, 400)
+        self.assertEqual(self.buscar(5, lat_min=0, lat_max=-1).status_code, 400)
+        self.assertEqual(self.client.get('/api/centros/mapa?zoom=3').status_code, 400)
+
+    def test_coordenadas_nao_finitas(self):
+        """verifica se nan e inf nas coordenadas retornam 400 em vez de erro interno"""
+        self.assertEqual(self.buscar(5, lat_min='nan').status_code, 400)
+        self.assertEqual(self.buscar(5, lon_max='inf').status_code, 400)
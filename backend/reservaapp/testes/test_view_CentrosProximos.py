@@ -0,0 +1,71 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..geo import caixa_envolvente, haversine_km
+from ..models import CustomUser, CentroEsportivo
+
+# (nome, latitude, longitude)
+CIDADES = [
+    ("Ponta Negra", -5.8800, -35.1800),
+    ("Centro Natal", -5.7945, -35.2110),
+    ("Parnamirim", -5.9156, -35.2628),
+    ("Recife", -8.0476, -34.8770),
+    ("São Paulo", -23.5505, -46.6333),
+]
+
+
+class CentrosProximosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.proximos@email.com",
+            username="gerente.proximos",
+            tipo="gerente",
+            nome_completo="Gerente Próximos",
+            cpf="12345678900"
+        )
+        for nome, latitude, longitude in CIDADES:
+            CentroEsportivo.objects.create(
+                nome=nome,
+                descricao="Centro para testar a busca por proximidade",
+                latitude=latitude,
+                longitude=longitude,
+                cidade=nome,
+                UF="RN",
+                gerente=cls.gerente
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def buscar(self, **parametros):
+        return self.client.get('/api/centros/proximos', {'lat': -5.7945, 'lon': -35.2110, **parametros})
+
+    def test_ordenados_por_distancia_dentro_do_raio(self):
+        """verifica se só os centros dentro do raio voltam, do mais perto para o mais longe"""
+        response = self.buscar(raio=30)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['nome'] for c in response.data], ['Centro Natal', 'Ponta Negra', 'Parnamirim'])
+        self.assertEqual(response.data[0]['distancia_km'], 0)
+        self.assertIn('menor_preco', response.data[0])
+
+    def test_k_mais_proximos_sem_raio(self):
+        """verifica se sem raio a busca amplia a área até achar k centros"""
+        response = self.buscar(k=4)
+
+        self.assertEqual([c['nome'] for c in response.data][-1], 'Recife')
+        self.assertAlmostEqual(response.data[-1]['distancia_km'], 253, delta=5)
+
+    def test_parametros_invalidos(self):
+        """verifica se coordenadas ausentes ou fora do intervalo retornam 400"""
+        self.assertEqual(self.client.get('/api/centros/proximos?lat=-5.79').status_code, 400)
+        self.assertEqual(self.buscar(lat=95).status_code, 400)
+        self.assertEqual(self.buscar(k=0).status_code, 400)
+
+    def test_caixa_envolvente_contem_o_circulo(self):
+        """verifica se os pontos a até raio km ficam dentro do retângulo"""
+        lat_min, lat_max, lon_min, lon_max = caixa_envolvente(-5.7945, -35.2110, 30)
+        for _, latitude, longitude in CIDADES[:3]:
+            self.assertLessEqual(haversine_km(-5.7945, -35.2110, latitude, longitude), 30)
+            self.assertTrue(lat_min <= latitude <= lat_max)
+            self.assertTrue(lon_min <= longitude <= lon_max)
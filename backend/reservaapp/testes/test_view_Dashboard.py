@@ -0,0 +1,112 @@
+from django.test import TestCase
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from importlib import import_module
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva, Pagamento
+
+
+class GerenteDashboardViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.dashboard.view@email.com",
+            username="gerente.dashboard.view",
+            tipo="gerente",
+            nome_completo="Gerente Dashboard",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.dashboard.view@email.com",
+            username="organizador.dashboard.view",
+            tipo="organizador",
+            nome_completo="Organizador Dashboard",
+            cpf="98765432100"
+        )
+        centro = CentroEsportivo.objects.create(
+            nome="Centro Dashboard",
+            descricao="Centro para testar o dashboard",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=cls.gerente
+        )
+        espacos = [
+            EspacoEsportivo.objects.create(nome=f"Quadra {i}", categoria="futebol", centro_esportivo=centro)
+            for i in range(5)
+        ]
+        agendas = Agenda.objects.bulk_create([
+            Agenda(
+                preco=Decimal('100.00'),
+                dia=date.today() + timedelta(days=i // 10),
+                h_inicial=time(8 + i % 10, 0),
+                h_final=time(9 + i % 10, 0),
+                espacoesportivo=espacos[i % 5],
+                status="indisponível"
+            )
+            for i in range(500)
+        ])
+        # bulk_create não passa pelo save, então o centro e o gerente vão explícitos
+        reservas = Reserva.objects.bulk_create([
+            Reserva(organizador=cls.organizador, agenda=agenda, centro_esportivo=centro, gerente=cls.gerente)
+            for agenda in agendas
+        ])
+        Pagamento.objects.bulk_create([
+            Pagamento(reserva=reserva, valor=Decimal('50.00')) for reserva in reservas[::2]
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.gerente)
+
+    def test_pagina_de_500_reservas_usa_uma_consulta(self):
+        """verifica se a página inteira do dashboard sai de uma única consulta com joins"""
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/dashboard-gerente?page_size=500')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 500)
+
+    def test_reservas_com_e_sem_pagamento(self):
+        """verifica se reservas sem pagamento são serializadas sem consultas extras"""
+        response = self.client.get('/api/dashboard-gerente?page_size=500')
+
+        valores = [item['valor_pagamento'] for item in response.data['results']]
+        self.assertEqual(valores.count('50.00'), 250)
+        self.assertEqual(valores.count(None), 250)
+        self.assertEqual(response.data['results'][0]['organizador'], 'Organizador Dashboard')
+
+    def test_filtro_do_gerente_nao_passa_pelo_centro(self):
+        """verifica se o dashboard filtra pelo gerente copiado na reserva, sem join até o centro"""
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get('/api/dashboard-gerente')
+
+        self.assertNotIn('reservaapp_centroesportivo', consultas[0]['sql'])
+
+    def test_save_preenche_centro_e_gerente(self):
+        """verifica se a reserva criada pelo save recebe o centro e o gerente da agenda"""
+        agenda = Agenda.objects.create(
+            preco=Decimal('100.00'),
+            dia=date.today() + timedelta(days=90),
+            h_inicial=time(8, 0),
+            h_final=time(9, 0),
+            espacoesportivo=EspacoEsportivo.objects.first()
+        )
+        reserva = Reserva.objects.create(organizador=self.organizador, agenda=agenda)
+
+        self.assertEqual(reserva.centro_esportivo_id, agenda.espacoesportivo.centro_esportivo_id)
+        self.assertEqual(reserva.gerente_id, self.gerente.id)
+
+    def test_migracao_preenche_reservas_antigas(self):
+        """verifica se a migração de dados preenche o centro e o gerente das reservas sem eles"""
+        Reserva.objects.update(centro_esportivo=None, gerente=None)
+        migracao = import_module('reservaapp.migrations.0007_preencher_reserva_centro_gerente')
+
+        migracao.preencher_centro_gerente(apps, None)
+
+        self.assertFalse(Reserva.objects.filter(gerente__isnull=True).exists())
+        self.assertEqual(Reserva.objects.filter(gerente=self.gerente).count(), 500)
@@ -0,0 +1,191 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva, EstatisticaDiaria
+
+
+class BaseTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.espacos@email.com",
+            username="gerente.espacos",
+            tipo="gerente",
+            nome_completo="Gerente Espaços",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.espacos@email.com",
+            username="organizador.espacos",
+            tipo="organizador",
+            nome_completo="Organizador Espaços",
+            cpf="98765432100"
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.gerente)
+
+    def criar_centro_com_espacos(self, quantidade_espacos):
+        """cria um centro com espaços que têm agenda e uma reserva avaliada"""
+        indice = CentroEsportivo.objects.count()
+        centro = CentroEsportivo.objects.create(
+            nome=f"Centro {indice}",
+            descricao="Centro para teste de listagem de espaços",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=self.gerente
+        )
+        for i in range(quantidade_espacos):
+            espaco = EspacoEsportivo.objects.create(
+                nome=f"Quadra {i}",
+                categoria="futsal",
+                centro_esportivo=centro
+            )
+            agenda = Agenda.objects.create(
+                preco=Decimal('60.00') + i,
+                dia=date.today() + timedelta(days=2),
+                h_inicial=time(18, 0),
+                h_final=time(19, 0),
+                espacoesportivo=espaco
+            )
+            Reserva.objects.create(
+                organizador=self.organizador,
+                agenda=agenda,
+                nota_limpeza=4
+            )
+        return centro
+
+    def listar(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/api/espacos')
+        self.assertEqual(response.status_code, 200)
+        return len(consultas), response
+
+
+class EspacoEsportivoListagemTest(BaseTestCase):
+    def test_listagem_retorna_preco_avaliacoes_e_centro(self):
+        """verifica se os valores carregados em lote batem com os dados"""
+        centro = self.criar_centro_com_espacos(2)
+        _, response = self.listar()
+
+        espaco = response.data['results'][0]
+        self.assertEqual(espaco['preco'], Decimal('60.00'))
+        self.assertEqual(espaco['total_avaliacoes'], 1)
+        self.assertEqual(espaco['centro_esportivo_details']['id'], centro.id)
+        self.assertEqual(espaco['centro_esportivo_details']['menor_preco'], Decimal('60.00'))
+        self.assertEqual(espaco['centro_esportivo_details']['total_avaliacoes'], 2)
+
+    def test_listagem_usa_numero_constante_de_consultas(self):
+        """verifica se o número de consultas não cresce com espaços nem com centros"""
+        self.criar_centro_com_espacos(2)
+        consultas_poucos, _ = self.listar()
+
+        self.criar_centro_com_espacos(5)
+        self.criar_centro_com_espacos(5)
+        consultas_muitos, response = self.listar()
+
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(consultas_poucos, consultas_muitos)
+
+    def test_centro_com_espacos_usa_numero_constante_de_consultas(self):
+        """verifica se o detalhe do centro não faz consultas por espaço"""
+        poucos = self.criar_centro_com_espacos(1)
+        muitos = self.criar_centro_com_espacos(8)
+
+        with CaptureQueriesContext(connection) as consultas_poucos:
+            self.client.get(f'/api/centros/{poucos.id}')
+        with CaptureQueriesContext(connection) as consultas_muitos:
+            response = self.client.get(f'/api/centros/{muitos.id}')
+
+        self.assertEqual(len(response.data['espacos']), 8)
+        self.assertEqual(len(consultas_poucos), len(consultas_muitos))
+
+
+class EspacoEsportivoCamposDinamicosTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.criar_centro_com_espacos(3)
+
+    def test_fields_retorna_somente_campos_pedidos(self):
+        """verifica se ?fields= limita os campos da resposta"""
+        response = self.client.get('/api/espacos?fields=id,nome,categoria,preco')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'nome', 'categoria', 'preco'})
+        self.assertEqual(response.data['results'][0]['preco'], Decimal('60.00'))
+
+    def test_fields_sem_campos_calculados_nao_faz_consultas_extras(self):
+        """verifica se campos não pedidos não geram consultas nem subconsultas"""
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/api/espacos?fields=id,nome')
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'nome'})
+        self.assertEqual(len(consultas), 1)
+        self.assertNotIn('agenda', consultas[0]['sql'])
+
+    def test_expand_inclui_campo_aninhado(self):
+        """verifica se ?expand= adiciona o centro aninhado aos campos escolhidos"""
+        response = self.client.get('/api/espacos?fields=id&expand=centro_esportivo_details')
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'centro_esportivo_details'})
+        self.assertIn('menor_preco', response.data['results'][0]['centro_esportivo_details'])
+
+    def test_expand_vazio_remove_campos_aninhados(self):
+        """verifica se ?expand= sem valores devolve a versão sem o centro aninhado"""
+        response = self.client.get('/api/espacos?expand=')
+
+        self.assertNotIn('centro_esportivo_details', response.data['results'][0])
+        self.assertIn('foto1_url', response.data['results'][0])
+
+    def test_sem_parametros_resposta_completa(self):
+        """verifica se a resposta padrão continua com todos os campos"""
+        response = self.client.get('/api/espacos')
+
+        self.assertIn('centro_esportivo_details', response.data['results'][0])
+        self.assertIn('total_avaliacoes', response.data['results'][0])
+
+
+class EspacoEsportivoMoverCentroTest(BaseTestCase):
+    def test_mover_espaco_leva_reservas_estatisticas_e_avaliacoes(self):
+        """verifica se mover o espaço de centro atualiza as cópias nas reservas, na estatística e o resumo dos centros"""
+        origem = self.criar_centro_com_espacos(2)
+        outro_gerente = CustomUser.objects.create_user(
+            email="outro.gerente.espacos@email.com",
+            username="outro.gerente.espacos",
+            tipo="gerente",
+            nome_completo="Outro Gerente",
+            cpf="11122233344"
+        )
+        destino = CentroEsportivo.objects.create(
+            nome="Centro Destino",
+            descricao="Centro que recebe o espaço",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=outro_gerente
+        )
+        espaco = origem.espacos.order_by('id').first()
+        call_command('reconstruir_estatisticas', stdout=StringIO())
+
+        response = self.client.patch(f'/api/espacos/{espaco.id}', {'centro_esportivo': destino.id}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        reserva = Reserva.objects.get(espacoesportivo=espaco)
+        self.assertEqual((reserva.centro_esportivo_id, reserva.gerente_id), (destino.id, outro_gerente.id))
+        self.assertEqual(
+            list(EstatisticaDiaria.objects.filter(espacoesportivo=espaco).values_list('centro_esportivo', flat=True)),
+            [destino.id]
+        )
+        origem.refresh_from_db()
+        destino.refresh_from_db()
+        self.assertEqual((origem.total_avaliacoes, origem.soma_limpeza, origem.media_avaliacao), (1, 4, Decimal('4.0')))
+        self.assertEqual((destino.total_avaliacoes, destino.soma_limpeza, destino.media_avaliacao), (1, 4, Decimal('4.0')))
@@ -0,0 +1,335 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva, EstatisticaDiaria
+
+
+class BaseTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.estatisticas@email.com",
+            username="gerente.estatisticas",
+            tipo="gerente",
+            nome_completo="Gerente Estatísticas",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.estatisticas@email.com",
+            username="organizador.estatisticas",
+            tipo="organizador",
+            nome_completo="Organizador Estatísticas",
+            cpf="98765432100"
+        )
+        cls.centro = CentroEsportivo.objects.create(
+            nome="Centro Estatísticas",
+            descricao="Centro para testar as estatísticas",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=cls.gerente
+        )
+        cls.futebol = EspacoEsportivo.objects.create(
+            nome="Campo", categoria="futebol", centro_esportivo=cls.centro
+        )
+        cls.volei = EspacoEsportivo.objects.create(
+            nome="Quadra", categoria="volei", centro_esportivo=cls.centro
+        )
+
+    def criar_reservas(self, espaco, status, quantidade, preco=Decimal('100.00')):
+        inicio = Agenda.objects.count()
+        for i in range(inicio, inicio + quantidade):
+            agenda = Agenda.objects.create(
+                preco=preco,
+                dia=date.today() + timedelta(days=i),
+                h_inicial=time(19, 0),
+                h_final=time(20, 0),
+                espacoesportivo=espaco,
+                status="indisponível"
+            )
+            Reserva.objects.create(organizador=self.organizador, agenda=agenda, status=status)
+
+    def reconstruir(self):
+        call_command('reconstruir_estatisticas', stdout=StringIO())
+
+    def buscar(self, url='/api/estatisticas-gerente'):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(consultas), response
+
+
+class EstatisticasGerenteViewTest(BaseTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.gerente)
+        self.criar_reservas(self.futebol, "pago", 3, Decimal('150.00'))
+        self.criar_reservas(self.futebol, "pendente", 2)
+        self.criar_reservas(self.volei, "cancelada", 1)
+        self.criar_reservas(self.volei, "pago", 1, Decimal('80.00'))
+        self.reconstruir()
+
+    def test_totais_e_arrecadacao(self):
+        """verifica os totais calculados no banco"""
+        _, response = self.buscar()
+
+        self.assertEqual(response.data['total_reservas'], 7)
+        self.assertEqual(response.data['reservas_canceladas'], 1)
+        self.assertEqual(response.data['arrecadacao_total'], Decimal('530.00'))
+        self.assertEqual(
+            response.data['resumo_status'],
+            [
+                {'status': 'pago', 'total': 4},
+                {'status': 'pendente', 'total': 2},
+                {'status': 'cancelada', 'total': 1},
+            ]
+        )
+
+    def test_agrupamentos(self):
+        """verifica os rankings de espaços e categorias"""
+        _, response = self.buscar()
+
+        self.assertEqual(response.data['espacos_mais_reservados'][0]['agenda__espacoesportivo__nome'], 'Campo')
+        self.assertEqual(response.data['espacos_mais_reservados'][0]['total_reservas'], 5)
+        self.assertEqual(response.data['categorias_mais_populares'][1]['total_reservas'], 2)
+        self.assertEqual(
+            response.data['horarios_mais_reservados'],
+            [{'agenda__h_inicial': time(19, 0), 'agenda__h_final': time(20, 0), 'total_reservas': 7}]
+        )
+
+    def test_horarios_fora_da_hora_cheia(self):
+        """verifica se horários de meia hora e fora da hora cheia aparecem com o início e o fim reais"""
+        for h_inicial, h_final in ((time(8, 30), time(10, 0)), (time(8, 0), time(8, 30))):
+            agenda = Agenda.objects.create(
+                preco=Decimal('100.00'),
+                dia=date.today() + timedelta(days=60),
+                h_inicial=h_inicial,
+                h_final=h_final,
+                espacoesportivo=self.futebol,
+                status="indisponível"
+            )
+            Reserva.objects.create(organizador=self.organizador, agenda=agenda, status="pago")
+        self.reconstruir()
+
+        _, response = self.buscar()
+
+        self.assertEqual(
+            sorted(response.data['horarios_mais_reservados'][1:], key=lambda item: item['agenda__h_inicial']),
+            [
+                {'agenda__h_inicial': time(8, 0), 'agenda__h_final': time(8, 30), 'total_reservas': 1},
+                {'agenda__h_inicial': time(8, 30), 'agenda__h_final': time(10, 0), 'total_reservas': 1},
+            ]
+        )
+
+    def test_reservas_pagas_paginadas(self):
+        """verifica se a lista de reservas pagas é limitada e tem link para a próxima página"""
+        _, response = self.buscar('/api/estatisticas-gerente?page_size=3')
+
+        self.assertEqual(len(response.data['reservas_pagas']), 3)
+        self.assertIsNotNone(response.data['reservas_pagas_proximo'])
+
+        response = self.client.get(response.data['reservas_pagas_proximo'])
+        self.assertEqual(len(response.data['reservas_pagas']), 1)
+        self.assertIsNone(response.data['reservas_pagas_proximo'])
+
+    def test_numero_de_consultas_nao_cresce_com_as_reservas(self):
+        """verifica se o número de consultas é fixo"""
+        consultas_poucas, _ = self.buscar()
+        self.criar_reservas(self.futebol, "pago", 30)
+        self.reconstruir()
+        consultas_muitas, response = self.buscar()
+
+        self.assertEqual(response.data['total_reservas'], 37)
+        self.assertEqual(consultas_poucas, consultas_muitas)
+
+
+class EstatisticaDiariaIncrementalTest(BaseTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.agendas = [
+            Agenda.objects.create(
+                preco=Decimal('120.00'),
+                dia=date.today() + timedelta(days=1),
+                h_inicial=time(hora, 0),
+                h_final=time(hora + 1, 0),
+                espacoesportivo=self.futebol
+            )
+            for hora in (8, 9)
+        ]
+
+    def reservar(self, agenda):
+        self.client.force_authenticate(user=self.organizador)
+        response = self.client.post('/api/reservar', {'agenda': agenda.id}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def linhas(self):
+        return list(
+            EstatisticaDiaria.objects.order_by('h_inicial').values(
+                'h_inicial', 'pendentes', 'pagas', 'canceladas', 'arrecadacao', 'valor_recebido'
+            )
+        )
+
+    def test_views_atualizam_e_reconstrucao_confere(self):
+        """verifica se as mudanças de status pelas views batem com a reconstrução completa"""
+        primeira = self.reservar(self.agendas[0])
+        segunda = self.reservar(self.agendas[1])
+
+        response = self.client.post(
+            '/api/pagamentos', {'reserva': primeira, 'valor': '60.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+
+        self.client.force_authenticate(user=self.gerente)
+        self.assertEqual(self.client.put(f'/api/reservas/{primeira}/concluir').status_code, 200)
+        self.assertEqual(self.client.put(f'/api/reservas/{segunda}/cancelar').status_code, 200)
+
+        incrementais = self.linhas()
+        self.assertEqual(incrementais[0]['pagas'], 1)
+        self.assertEqual(incrementais[0]['pendentes'], 0)
+        self.assertEqual(incrementais[0]['arrecadacao'], Decimal('120.00'))
+        self.assertEqual(incrementais[0]['valor_recebido'], Decimal('60.00'))
+        self.assertEqual(incrementais[1]['canceladas'], 1)
+
+        self.reconstruir()
+        self.assertEqual(self.linhas(), incrementais)
+
+
+    def test_exclusoes_e_pagamento_alterado_batem_com_a_reconstrucao(self):
+        """verifica se apagar reservas, agendas e pagamentos e alterar o valor pago não deixam a estatística divergir"""
+        primeira = self.reservar(self.agendas[0])
+        segunda = self.reservar(self.agendas[1])
+        response = self.client.post('/api/pagamentos', {'reserva': primeira, 'valor': '60.00'}, format='json')
+        pagamento = response.data['id']
+        self.reservar(Agenda.objects.create(
+            preco=Decimal('90.00'), dia=self.agendas[0].dia, h_inicial=time(10, 0), h_final=time(11, 0),
+            espacoesportivo=self.futebol
+        ))
+
+        response = self.client.patch(f'/api/pagamentos/{pagamento}', {'valor': '120.00'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.linhas()[0]['valor_recebido'], Decimal('120.00'))
+
+        Reserva.objects.get(pk=segunda).delete()
+        self.agendas[0].delete()
+        incrementais = self.linhas()
+        self.assertEqual([linha['pendentes'] for linha in incrementais], [0, 0, 1])
+        self.assertEqual(incrementais[0]['valor_recebido'], Decimal('0'))
+
+        self.reconstruir()
+        self.assertEqual(
+            [linha for linha in incrementais if any(linha[campo] for campo in ('pendentes', 'pagas', 'canceladas'))],
+            self.linhas()
+        )
+
+    def test_mover_agenda_leva_os_contadores_para_o_novo_horario(self):
+        """verifica se mudar o dia e o horário de uma agenda reservada move a reserva na estatística"""
+        reserva = self.reservar(self.agendas[0])
+        self.client.post('/api/pagamentos', {'reserva': reserva, 'valor': '60.00'}, format='json')
+
+        self.client.force_authenticate(user=self.gerente)
+        response = self.client.patch(
+            f'/api/agendas/{self.agendas[0].id}',
+            {
+                'espacoesportivo': self.futebol.id,
+                'dia': (date.today() + timedelta(days=2)).isoformat(),
+                'h_inicial': '14:30:00',
+                'h_final': '16:00:00',
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.put(f'/api/reservas/{reserva}/cancelar').status_code, 200)
+
+        incrementais = self.linhas()
+        self.assertEqual(
+            [(linha['h_inicial'], linha['pendentes'], linha['canceladas'], linha['valor_recebido']) for linha in incrementais],
+            [(time(8, 0), 0, 0, Decimal('0')), (time(14, 30), 0, 1, Decimal('60.00'))]
+        )
+        self.reconstruir()
+        self.assertEqual(self.linhas(), incrementais[1:])
+
+
+class EstatisticasSerieViewTest(BaseTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.gerente)
+        # segunda-feira, 2 de março de 2026
+        self.inicio = date(2026, 3, 2)
+        for dia, status, espaco in [
+            (date(2026, 3, 2), "pago", self.futebol),
+            (date(2026, 3, 2), "pendente", self.volei),
+            (date(2026, 3, 4), "cancelada", self.futebol),
+            (date(2026, 3, 10), "pago", self.futebol),
+            (date(2026, 4, 1), "pago", self.volei),
+        ]:
+            agenda = Agenda.objects.create(
+                preco=Decimal('100.00'),
+                dia=dia,
+                h_inicial=time(19, 0),
+                h_final=time(20, 0),
+                espacoesportivo=espaco,
+                status="indisponível"
+            )
+            Reserva.objects.create(organizador=self.organizador, agenda=agenda, status=status)
+        Agenda.objects.create(
+            preco=Decimal('100.00'),
+            dia=date(2026, 3, 3),
+            h_inicial=time(19, 0),
+            h_final=time(20, 0),
+            espacoesportivo=self.futebol
+        )
+        self.reconstruir()
+
+    def test_serie_diaria(self):
+        """verifica a série diária em listas paralelas"""
+        _, response = self.buscar('/api/estatisticas-gerente/serie?inicio=2026-03-02&fim=2026-03-04')
+
+        self.assertEqual(response.data['periodos'], ['2026-03-02', '2026-03-03', '2026-03-04'])
+        self.assertEqual(response.data['reservas'], [2, 0, 1])
+        self.assertEqual(response.data['pagas'], [1, 0, 0])
+        self.assertEqual(response.data['arrecadacao'], [Decimal('100.00'), Decimal('0'), Decimal('0')])
+        self.assertEqual(response.data['horarios_ofertados'], [2, 1, 1])
+        self.assertEqual(response.data['ocupacao'], [1.0, 0.0, 0.0])
+
+    def test_serie_semanal_e_mensal(self):
+        """verifica o agrupamento por semana e por mês"""
+        _, semanal = self.buscar('/api/estatisticas-gerente/serie?inicio=2026-03-02&fim=2026-03-15&granularidade=semana')
+        self.assertEqual(semanal.data['periodos'], ['2026-03-02', '2026-03-09'])
+        self.assertEqual(semanal.data['reservas'], [3, 1])
+
+        _, mensal = self.buscar('/api/estatisticas-gerente/serie?inicio=2026-03-01&fim=2026-04-30&granularidade=mes')
+        self.assertEqual(mensal.data['periodos'], ['2026-03-01', '2026-04-01'])
+        self.assertEqual(mensal.data['pagas'], [2, 1])
+
+    def test_filtro_por_espaco(self):
+        """verifica o filtro opcional por espaço"""
+        _, response = self.buscar(
+            f'/api/estatisticas-gerente/serie?inicio=2026-03-01&fim=2026-04-30&granularidade=mes&espaco={self.volei.id}'
+        )
+        self.assertEqual(response.data['reservas'], [1, 1])
+
+    def test_parametros_invalidos(self):
+        """verifica as respostas 400 para parâmetros inválidos"""
+        for url in [
+            '/api/estatisticas-gerente/serie?inicio=2026-03-01',
+            '/api/estatisticas-gerente/serie?inicio=2026-03-05&fim=2026-03-01',
+            '/api/estatisticas-gerente/serie?inicio=2026-03-01&fim=2026-03-05&granularidade=ano',
+            '/api/estatisticas-gerente/serie?inicio=2025-01-01&fim=2026-03-01',
+            '/api/estatisticas-gerente/serie?inicio=0001-01-01&fim=9999-12-31&granularidade=semana',
+        ]:
+            self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_serie_ate_o_ultimo_dia_aceito(self):
+        """verifica se uma série que termina em 9999-12-31 para no último período sem erro"""
+        for granularidade, periodo in (('dia', '9999-12-31'), ('semana', '9999-12-27'), ('mes', '9999-12-01')):
+            _, response = self.buscar(
+                f'/api/estatisticas-gerente/serie?inicio=9999-12-01&fim=9999-12-31&granularidade={granularidade}'
+            )
+            self.assertEqual(response.data['periodos'][-1], periodo)
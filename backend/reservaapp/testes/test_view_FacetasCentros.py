@@ -0,0 +1,68 @@
+from django.test import TestCase
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo
+
+
+class FacetasCentrosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.facetas@email.com",
+            username="gerente.facetas",
+            tipo="gerente",
+            nome_completo="Gerente Facetas",
+            cpf="12345678900"
+        )
+        # (cidade, UF, categorias dos espaços)
+        for i, (cidade, UF, categorias) in enumerate([
+            ("Natal", "RN", ["futebol", "volei"]),
+            ("Natal", "RN", ["futebol", "futebol"]),
+            ("Mossoró", "RN", ["tenis"]),
+            ("Recife", "PE", ["futebol"]),
+        ]):
+            centro = CentroEsportivo.objects.create(
+                nome=f"Centro Facetas {i}",
+                descricao="Centro para testar as facetas",
+                latitude=-5.7945,
+                longitude=-35.211,
+                cidade=cidade,
+                UF=UF,
+                gerente=cls.gerente
+            )
+            for j, categoria in enumerate(categorias):
+                EspacoEsportivo.objects.create(
+                    nome=f"Espaço {j}", categoria=categoria, centro_esportivo=centro
+                )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_contagens_em_uma_consulta(self):
+        """verifica se as três facetas saem de uma única consulta e contam centros"""
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/centros/facetas')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['UF'], [{'valor': 'RN', 'total': 3}, {'valor': 'PE', 'total': 1}])
+        self.assertEqual(response.data['cidade'][0], {'valor': 'Natal', 'total': 2})
+        self.assertEqual(response.data['categoria'], [
+            {'valor': 'futebol', 'total': 3},
+            {'valor': 'tenis', 'total': 1},
+            {'valor': 'volei', 'total': 1},
+        ])
+
+    def test_aplica_os_filtros_da_listagem(self):
+        """verifica se os parâmetros do CentroEsportivoFilter restringem as contagens"""
+        response = self.client.get('/api/centros/facetas', {'UF': 'rn', 'categoria_espaco': 'futebol'})
+
+        self.assertEqual(response.data['UF'], [{'valor': 'RN', 'total': 2}])
+        self.assertEqual(response.data['cidade'], [{'valor': 'Natal', 'total': 2}])
+
+    def test_combinacao_repetida_vem_do_cache(self):
+        """verifica se a mesma combinação de filtros não consulta o banco de novo"""
+        self.client.get('/api/centros/facetas', {'UF': 'RN', 'cidade': 'natal'})
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/centros/facetas', {'cidade': 'natal', 'UF': 'RN'})
+        self.assertEqual(response.data['UF'], [{'valor': 'RN', 'total': 2}])
@@ -0,0 +1,283 @@
+from django.test import TestCase
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva
+
+
+class HorariosDisponiveisCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.horarios@email.com",
+            username="gerente.horarios",
+            tipo="gerente",
+            nome_completo="Gerente Horários",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.horarios@email.com",
+            username="organizador.horarios",
+            tipo="organizador",
+            nome_completo="Organizador Horários",
+            cpf="98765432100"
+        )
+        centro = CentroEsportivo.objects.create(
+            nome="Centro Horários",
+            descricao="Centro para testar o cache de horários",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=cls.gerente
+        )
+        cls.espaco = EspacoEsportivo.objects.create(
+            nome="Quadra Horários", categoria="tenis", centro_esportivo=centro
+        )
+        cls.dia = date.today() + timedelta(days=3)
+        cls.agendas = [
+            Agenda.objects.create(
+                preco=Decimal('70.00'),
+                dia=cls.dia,
+                h_inicial=time(hora, 0),
+                h_final=time(hora + 1, 0),
+                espacoesportivo=cls.espaco
+            )
+            for hora in (9, 14, 20)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.organizador)
+        self.url = f'/api/espacos/{self.espaco.id}/horarios_disponiveis?dia={self.dia}'
+
+    def total_horarios(self, response):
+        return sum(len(horarios) for horarios in response.data.values())
+
+    def test_segunda_chamada_nao_consulta_o_banco(self):
+        """verifica se a disponibilidade do espaço/dia é servida do cache"""
+        primeira = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            segunda = self.client.get(self.url)
+
+        self.assertEqual(primeira.data, segunda.data)
+        self.assertEqual(
+            {periodo: len(horarios) for periodo, horarios in segunda.data.items()},
+            {'manha': 1, 'tarde': 1, 'noite': 1}
+        )
+
+    def test_etag_retorna_304(self):
+        """verifica se o cliente com o ETag atual recebe 304 sem corpo"""
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_if_none_match_compara_etags_inteiros(self):
+        """verifica se o If-None-Match é lido como lista de ETags e não como texto"""
+        etag = self.client.get(self.url)['ETag']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"outro", W/{etag}').status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='*').status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"a{etag}').status_code, 200)
+
+    def test_nova_agenda_invalida_o_dia(self):
+        """verifica se criar uma agenda no dia muda a resposta e o ETag"""
+        etag = self.client.get(self.url)['ETag']
+        Agenda.objects.create(
+            preco=Decimal('70.00'),
+            dia=self.dia,
+            h_inicial=time(16, 0),
+            h_final=time(17, 0),
+            espacoesportivo=self.espaco
+        )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['tarde']), 2)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_reserva_e_cancelamento_invalidam_o_dia(self):
+        """verifica se reservar e cancelar o horário refletem na disponibilidade"""
+        self.client.get(self.url)
+        reserva = self.client.post('/api/reservar', {'agenda': self.agendas[0].id}, format='json')
+        self.assertEqual(self.total_horarios(self.client.get(self.url)), 2)
+
+        self.client.put(f'/api/reservas/{reserva.data["id"]}/cancelar')
+        self.assertEqual(self.total_horarios(self.client.get(self.url)), 3)
+
+    def test_reserva_concluida_invalida_o_dia(self):
+        """verifica se a reserva paga tira o horário mesmo com a agenda ativa"""
+        reserva = Reserva.objects.create(organizador=self.organizador, agenda=self.agendas[1])
+        self.client.get(self.url)
+
+        reserva.status = "pago"
+        reserva.save()
+
+        self.assertEqual(len(self.client.get(self.url).data['tarde']), 0)
+
+    def test_outro_dia_nao_e_invalidado(self):
+        """verifica se mudanças em outro dia mantêm o cache deste dia"""
+        self.client.get(self.url)
+        Agenda.objects.create(
+            preco=Decimal('70.00'),
+            dia=self.dia + timedelta(days=1),
+            h_inicial=time(9, 0),
+            h_final=time(10, 0),
+            espacoesportivo=self.espaco
+        )
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+
+class HorariosDisponiveisIntervaloTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.intervalo@email.com",
+            username="gerente.intervalo",
+            tipo="gerente",
+            nome_completo="Gerente Intervalo",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.intervalo@email.com",
+            username="organizador.intervalo",
+            tipo="organizador",
+            nome_completo="Organizador Intervalo",
+            cpf="98765432100"
+        )
+        centro = CentroEsportivo.objects.create(
+            nome="Centro Intervalo",
+            descricao="Centro para testar a disponibilidade por período",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=cls.gerente
+        )
+        cls.espaco = EspacoEsportivo.objects.create(
+            nome="Quadra Intervalo", categoria="volei", centro_esportivo=centro
+        )
+        cls.inicio = date.today() + timedelta(days=1)
+        for dia in range(7):
+            for hora in (8, 19):
+                Agenda.objects.create(
+                    preco=Decimal('55.00'),
+                    dia=cls.inicio + timedelta(days=dia),
+                    h_inicial=time(hora, 0),
+                    h_final=time(hora + 1, 0),
+                    espacoesportivo=cls.espaco
+                )
+        pago = Agenda.objects.get(dia=cls.inicio, h_inicial=time(8, 0))
+        Reserva.objects.create(organizador=cls.organizador, agenda=pago, status="pago")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.organizador)
+
+    def buscar(self, inicio, fim):
+        return self.client.get(
+            f'/api/espacos/{self.espaco.id}/horarios_disponiveis/intervalo?inicio={inicio}&fim={fim}'
+        )
+
+    def test_semana_agrupada_por_dia_e_periodo(self):
+        """verifica se a semana vem agrupada como no endpoint de um dia só"""
+        fim = self.inicio + timedelta(days=7)
+        with self.assertNumQueries(2):
+            response = self.buscar(self.inicio, fim)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 8)
+        self.assertEqual(len(response.data[self.inicio.isoformat()]['manha']), 0)
+        self.assertEqual(len(response.data[self.inicio.isoformat()]['noite']), 1)
+        self.assertEqual(response.data[fim.isoformat()], {'manha': [], 'tarde': [], 'noite': []})
+
+    def test_mesmo_formato_do_endpoint_de_um_dia(self):
+        """verifica se cada dia tem o mesmo conteúdo de horarios_disponiveis?dia="""
+        cache.clear()
+        dia = self.inicio + timedelta(days=2)
+        um_dia = self.client.get(f'/api/espacos/{self.espaco.id}/horarios_disponiveis?dia={dia}')
+
+        self.assertEqual(self.buscar(dia, dia).data[dia.isoformat()], um_dia.data)
+
+    def test_intervalo_invalido(self):
+        """verifica se intervalos invertidos ou maiores que um mês são recusados"""
+        self.assertEqual(self.buscar(self.inicio, self.inicio - timedelta(days=1)).status_code, 400)
+        self.assertEqual(self.buscar(self.inicio, self.inicio + timedelta(days=31)).status_code, 400)
+        self.assertEqual(self.client.get(
+            f'/api/espacos/{self.espaco.id}/horarios_disponiveis/intervalo?inicio={self.inicio}'
+        ).status_code, 400)
+
+
+class HorariosDisponiveisLoteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.lote@email.com",
+            username="gerente.lote",
+            tipo="gerente",
+            nome_completo="Gerente Lote",
+            cpf="12345678900"
+        )
+        cls.centro = CentroEsportivo.objects.create(
+            nome="Centro Lote",
+            descricao="Centro para testar a disponibilidade em lote",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=cls.gerente
+        )
+        cls.dia = date.today() + timedelta(days=5)
+        cls.espacos = []
+        for i in range(10):
+            espaco = EspacoEsportivo.objects.create(
+                nome=f"Quadra Lote {i}", categoria="futsal", centro_esportivo=cls.centro
+            )
+            cls.espacos.append(espaco)
+            for hora in range(8, 8 + i % 3 + 1):
+                Agenda.objects.create(
+                    preco=Decimal('40.00'),
+                    dia=cls.dia,
+                    h_inicial=time(hora, 0),
+                    h_final=time(hora + 1, 0),
+                    espacoesportivo=espaco
+                )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_centro_inteiro_com_consultas_constantes(self):
+        """verifica se os dez espaços do centro saem de um número fixo de consultas"""
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/horarios_disponiveis/lote?dia={self.dia}&centro={self.centro.id}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data), [espaco.id for espaco in self.espacos])
+        self.assertEqual([len(h['manha']) for h in response.data.values()], [1, 2, 3, 1, 2, 3, 1, 2, 3, 1])
+
+    def test_reaproveita_o_cache_do_endpoint_de_um_dia(self):
+        """verifica se o lote e o endpoint de um dia compartilham os snapshots"""
+        espaco = self.espacos[2]
+        um_dia = self.client.get(f'/api/espacos/{espaco.id}/horarios_disponiveis?dia={self.dia}')
+        ids = ','.join(str(e.id) for e in self.espacos[:3])
+        self.client.get(f'/api/horarios_disponiveis/lote?dia={self.dia}&espacos={ids}')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/horarios_disponiveis/lote?dia={self.dia}&espacos={ids}')
+        self.assertEqual(response.data[espaco.id], um_dia.data)
+
+    def test_parametros_invalidos(self):
+        """verifica se faltar espaços/centro ou mandar ids inválidos retorna 400"""
+        self.assertEqual(self.client.get(f'/api/horarios_disponiveis/lote?dia={self.dia}').status_code, 400)
+        self.assertEqual(
+            self.client.get(f'/api/horarios_disponiveis/lote?dia={self.dia}&espacos=1,abc').status_code, 400
+        )
@@ -0,0 +1,110 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva
+
+
+class BaseTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.paginacao@email.com",
+            username="gerente.paginacao",
+            tipo="gerente",
+            nome_completo="Gerente Paginação",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.paginacao@email.com",
+            username="organizador.paginacao",
+            tipo="organizador",
+            nome_completo="Organizador Paginação",
+            cpf="98765432100"
+        )
+        cls.centro = CentroEsportivo.objects.create(
+            nome="Centro Paginação",
+            descricao="Centro para testar a paginação",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=cls.gerente
+        )
+        cls.espaco = EspacoEsportivo.objects.create(
+            nome="Quadra Paginação",
+            categoria="volei",
+            centro_esportivo=cls.centro
+        )
+        cls.agendas = [
+            Agenda.objects.create(
+                preco=Decimal('50.00'),
+                dia=date.today() + timedelta(days=i),
+                h_inicial=time(10, 0),
+                h_final=time(11, 0),
+                espacoesportivo=cls.espaco
+            )
+            for i in range(7)
+        ]
+        cls.reservas = [
+            Reserva.objects.create(organizador=cls.organizador, agenda=agenda)
+            for agenda in cls.agendas
+        ]
+
+    def percorrer_paginas(self, url):
+        """segue os links next até o fim e devolve os ids na ordem recebida"""
+        ids = []
+        paginas = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+            paginas += 1
+        return ids, paginas
+
+
+class PaginacaoTest(BaseTestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_agendas_paginadas_por_cursor(self):
+        """verifica se as agendas são devolvidas em páginas, sem repetir nem pular itens"""
+        self.client.force_authenticate(user=self.gerente)
+        ids, paginas = self.percorrer_paginas('/api/agendas?page_size=3')
+
+        self.assertEqual(paginas, 3)
+        self.assertEqual(ids, [agenda.id for agenda in self.agendas])
+
+    def test_resposta_paginada_tem_links(self):
+        """verifica o formato da resposta paginada"""
+        self.client.force_authenticate(user=self.gerente)
+        response = self.client.get('/api/agendas?page_size=2')
+
+        self.assertIn('next', response.data)
+        self.assertIn('previous', response.data)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['previous'])
+
+    def test_dashboard_paginado_das_mais_recentes(self):
+        """verifica se o dashboard do gerente é paginado das reservas mais recentes para as mais antigas"""
+        self.client.force_authenticate(user=self.gerente)
+        ids, paginas = self.percorrer_paginas('/api/dashboard-gerente?page_size=4')
+
+        self.assertEqual(paginas, 2)
+        self.assertEqual(ids, [reserva.id for reserva in reversed(self.reservas)])
+
+    def test_minhas_reservas_paginadas(self):
+        """verifica se as reservas do organizador são paginadas"""
+        self.client.force_authenticate(user=self.organizador)
+        ids, _ = self.percorrer_paginas('/api/minhas-reservas?page_size=5')
+
+        self.assertEqual(ids, [reserva.id for reserva in reversed(self.reservas)])
+
+    def test_page_size_limitado(self):
+        """verifica se o page_size não passa do máximo configurado"""
+        self.client.force_authenticate(user=self.gerente)
+        response = self.client.get('/api/agendas?page_size=100000')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 7)
@@ -0,0 +1,198 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda
+from ..precos import adiar_recalculo_de_precos
+
+
+class BaseTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerente = CustomUser.objects.create_user(
+            email="gerente.preco@email.com",
+            username="gerente.preco",
+            tipo="gerente",
+            nome_completo="Gerente Preço",
+            cpf="12345678900"
+        )
+        cls.organizador = CustomUser.objects.create_user(
+            email="organizador.preco@email.com",
+            username="organizador.preco",
+            tipo="organizador",
+            nome_completo="Organizador Preço",
+            cpf="98765432100"
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.gerente)
+
+    def criar_centro(self, nome, *precos):
+        """cria um centro com um espaço e uma agenda ativa para cada preço"""
+        centro = CentroEsportivo.objects.create(
+            nome=nome,
+            descricao="Centro para teste de preço mínimo",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=self.gerente
+        )
+        espaco = EspacoEsportivo.objects.create(nome=f"Quadra {nome}", categoria="futebol", centro_esportivo=centro)
+        for i, preco in enumerate(precos):
+            self.criar_agenda(espaco, preco, i)
+        return centro, espaco
+
+    def criar_agenda(self, espaco, preco, hora=0):
+        return Agenda.objects.create(
+            preco=Decimal(preco),
+            dia=date.today() + timedelta(days=1),
+            h_inicial=time(8 + hora, 0),
+            h_final=time(9 + hora, 0),
+            espacoesportivo=espaco
+        )
+
+    def precos(self, centro, espaco):
+        centro.refresh_from_db()
+        espaco.refresh_from_db()
+        return centro.preco_minimo_ativo, espaco.preco_minimo_ativo
+
+
+class PrecoMinimoManutencaoTest(BaseTestCase):
+    def test_agenda_criada_editada_e_apagada_atualiza_preco(self):
+        """verifica se criar, editar, desativar e apagar agendas mantém o preço mínimo"""
+        centro, espaco = self.criar_centro("Centro A", '80.00', '120.00')
+        self.assertEqual(self.precos(centro, espaco), (Decimal('80.00'), Decimal('80.00')))
+
+        barata = Agenda.objects.get(espacoesportivo=espaco, preco=Decimal('80.00'))
+        barata.preco = Decimal('150.00')
+        barata.save()
+        self.assertEqual(self.precos(centro, espaco), (Decimal('120.00'), Decimal('120.00')))
+
+        cara = Agenda.objects.get(espacoesportivo=espaco, preco=Decimal('120.00'))
+        cara.status = "indisponível"
+        cara.save()
+        self.assertEqual(self.precos(centro, espaco), (Decimal('150.00'), Decimal('150.00')))
+
+        barata.delete()
+        self.assertEqual(self.precos(centro, espaco), (None, None))
+
+    def test_centro_usa_menor_preco_entre_espacos(self):
+        """verifica se o centro fica com o menor preço entre os espaços e perde o do espaço apagado"""
+        centro, espaco = self.criar_centro("Centro A", '80.00')
+        outro = EspacoEsportivo.objects.create(nome="Quadra 2", categoria="volei", centro_esportivo=centro)
+        self.criar_agenda(outro, '60.00')
+        self.assertEqual(self.precos(centro, espaco), (Decimal('60.00'), Decimal('80.00')))
+
+        outro.delete()
+        self.assertEqual(self.precos(centro, espaco), (Decimal('80.00'), Decimal('80.00')))
+
+    def test_reserva_e_cancelamento_atualizam_preco(self):
+        """verifica se reservar tira o horário do preço mínimo e cancelar devolve"""
+        centro, espaco = self.criar_centro("Centro A", '80.00', '120.00')
+        agenda = Agenda.objects.get(espacoesportivo=espaco, preco=Decimal('80.00'))
+
+        self.client.force_authenticate(user=self.organizador)
+        response = self.client.post('/api/reservar', {'agenda': agenda.id}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.precos(centro, espaco), (Decimal('120.00'), Decimal('120.00')))
+
+        response = self.client.put(f"/api/reservas/{response.data['id']}/cancelar")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.precos(centro, espaco), (Decimal('80.00'), Decimal('80.00')))
+
+    def test_adiar_recalculo_agrupa_atualizacoes(self):
+        """verifica se dentro do bloco as agendas não recalculam o preço uma a uma"""
+        centro, espaco = self.criar_centro("Centro A")
+        with CaptureQueriesContext(connection) as consultas:
+            with adiar_recalculo_de_precos():
+                for i in range(5):
+                    self.criar_agenda(espaco, f'{90 - i}.00', i)
+                self.assertEqual(self.precos(centro, espaco), (None, None))
+
+        atualizacoes = [c for c in consultas if c['sql'].startswith('UPDATE "reservaapp_')]
+        self.assertEqual(len(atualizacoes), 2)
+        self.assertEqual(self.precos(centro, espaco), (Decimal('86.00'), Decimal('86.00')))
+
+    def test_reconstruir_precos_corrige_valores(self):
+        """verifica se o comando recalcula preços desatualizados"""
+        centro, espaco = self.criar_centro("Centro A", '80.00')
+        CentroEsportivo.objects.update(preco_minimo_ativo=None)
+        EspacoEsportivo.objects.update(preco_minimo_ativo=Decimal('1.00'))
+
+        call_command('reconstruir_precos', stdout=StringIO())
+
+        self.assertEqual(self.precos(centro, espaco), (Decimal('80.00'), Decimal('80.00')))
+
+
+class PrecoMinimoFiltroTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.criar_centro("Centro Caro", '200.00')
+        self.criar_centro("Centro Barato", '50.00')
+        self.criar_centro("Centro Medio", '100.00', '90.00')
+        self.criar_centro("Centro Sem Horario")
+
+    def nomes(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [item['nome'] for item in response.data['results']]
+
+    def test_filtra_centros_por_faixa_de_preco(self):
+        """verifica se preco_min e preco_max filtram pelo preço mínimo do centro"""
+        nomes = self.nomes('/api/centros-esportivos', {'preco_min': 60, 'preco_max': 200, 'ordenar': 'preco'})
+        self.assertEqual(nomes, ['Centro Medio', 'Centro Caro'])
+
+    def test_ordena_centros_por_preco(self):
+        """verifica se ?ordenar=preco e ?ordenar=-preco ordenam e deixam de fora centros sem preço"""
+        self.assertEqual(
+            self.nomes('/api/centros-esportivos', {'ordenar': 'preco'}),
+            ['Centro Barato', 'Centro Medio', 'Centro Caro']
+        )
+        self.assertEqual(
+            self.nomes('/api/centros-esportivos', {'ordenar': '-preco'}),
+            ['Centro Caro', 'Centro Medio', 'Centro Barato']
+        )
+        self.assertEqual(len(self.nomes('/api/centros-esportivos', {})), 4)
+
+    def test_filtra_e_ordena_espacos_por_preco(self):
+        """verifica se a listagem de espaços filtra e ordena pelo preço mínimo do espaço"""
+        nomes = self.nomes('/api/espacos', {'preco_max': 100, 'ordenar': '-preco'})
+        self.assertEqual(nomes, ['Quadra Centro Medio', 'Quadra Centro Barato'])
+
+    def test_paginacao_por_preco_percorre_todos(self):
+        """verifica se o cursor ordenado por preço percorre todas as páginas sem repetir"""
+        nomes = []
+        response = self.client.get('/api/centros-esportivos', {'ordenar': 'preco', 'page_size': 1})
+        while True:
+            nomes += [centro['nome'] for centro in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(nomes, ['Centro Barato', 'Centro Medio', 'Centro Caro'])
+
+    def test_paginacao_com_precos_iguais(self):
+        """verifica se centros com o mesmo preço são percorridos pelo id, nos dois sentidos"""
+        for i in range(6):
+            self.criar_centro(f"Centro Empate {i}", '70.00')
+        esperado = list(
+            CentroEsportivo.objects.filter(preco_minimo_ativo__isnull=False)
+            .order_by('-preco_minimo_ativo', '-id').values_list('id', flat=True)
+        )
+
+        ids = []
+        response = self.client.get('/api/centros-esportivos', {'ordenar': '-preco', 'page_size': 2})
+        while True:
+            ids += [centro['id'] for centro in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(ids, esperado)
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([centro['id'] for centro in response.data['results']], esperado[6:8])
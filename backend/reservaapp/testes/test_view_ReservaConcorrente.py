@@ -0,0 +1,95 @@
+import threading
+from collections import Counter
+from django.db import connection
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from decimal import Decimal
+from ..models import CustomUser, CentroEsportivo, EspacoEsportivo, Agenda, Reserva
+
+
+class ReservaConcorrenteTest(TransactionTestCase):
+    RESERVAS_SIMULTANEAS = 200
+
+    def setUp(self):
+        gerente = CustomUser.objects.create_user(
+            email="gerente.concorrencia@email.com",
+            username="gerente.concorrencia",
+            tipo="gerente",
+            nome_completo="Gerente Concorrência",
+            cpf="12345678900"
+        )
+        self.organizadores = [
+            CustomUser.objects.create_user(
+                email=f"organizador{i}.concorrencia@email.com",
+                username=f"organizador{i}.concorrencia",
+                tipo="organizador",
+                nome_completo=f"Organizador {i}",
+                cpf=f"{i:011d}"
+            )
+            for i in range(1, 11)
+        ]
+        centro = CentroEsportivo.objects.create(
+            nome="Centro Concorrência",
+            descricao="Centro para testar reservas simultâneas",
+            latitude=-5.7945,
+            longitude=-35.211,
+            cidade="Natal",
+            UF="RN",
+            gerente=gerente
+        )
+        espaco = EspacoEsportivo.objects.create(
+            nome="Quadra Disputada", categoria="futebol", centro_esportivo=centro
+        )
+        self.agenda = Agenda.objects.create(
+            preco=Decimal('150.00'),
+            dia=date.today() + timedelta(days=6),
+            h_inicial=time(9, 0),
+            h_final=time(10, 0),
+            espacoesportivo=espaco
+        )
+
+    def test_apenas_uma_reserva_vence_a_disputa(self):
+        """dispara centenas de reservas simultâneas no mesmo horário e verifica que só uma é criada"""
+        largada = threading.Barrier(self.RESERVAS_SIMULTANEAS)
+        respostas = []
+        trava = threading.Lock()
+
+        def reservar(organizador):
+            client = APIClient()
+            client.force_authenticate(user=organizador)
+            try:
+                largada.wait()
+                response = client.post('/api/reservar', {'agenda': self.agenda.id}, format='json')
+                with trava:
+                    respostas.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=reservar, args=(self.organizadores[i % len(self.organizadores)],))
+            for i in range(self.RESERVAS_SIMULTANEAS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        contagem = Counter(respostas)
+        self.assertEqual(len(respostas), self.RESERVAS_SIMULTANEAS)
+        self.assertEqual(contagem[201], 1)
+        self.assertEqual(contagem[409], self.RESERVAS_SIMULTANEAS - 1)
+        self.assertEqual(Reserva.objects.filter(agenda=self.agenda).count(), 1)
+        self.agenda.refresh_from_db()
+        self.assertEqual(self.agenda.status, "indisponível")
+
+    def test_reserva_em_horario_indisponivel_retorna_409(self):
+        """verifica se um horário já tomado devolve conflito"""
+        Agenda.objects.filter(pk=self.agenda.pk).update(status="indisponível")
+        client = APIClient()
+        client.force_authenticate(user=self.organizadores[0])
+
+        response = client.post('/api/reservar', {'agenda': self.agenda.id}, format='json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Reserva.objects.exists())
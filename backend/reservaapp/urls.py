@@ -1,21 +1,34 @@
 from django.urls import path, include
 from .views import (
     AgendaViewSet,
+    AvaliacoesCentroView,
+    AvaliacoesEspacoView,
+    AvaliarReservaView,
+    BloquearAgendaView,
+    BuscaCentrosView,
+    BuscaHorariosView,
     CancelarReservaView,
     Centro_com_espacosRetrieveView,
     CentroEsportivoViewSet,
+    CentrosMapaView,
+    CentrosProximosView,
     ConcluirReservaView,
     CustomUserCreateView,
     EspacoEsportivoViewSet,
+    FacetasCentrosView,
     GerenteDashboardViewSet,
     HorariosDisponiveisView,
+    HorariosDisponiveisIntervaloView,
+    HorariosDisponiveisLoteView,
     MeView,
     MinhasReservasListView,
     ReservaCreateview,
     VerificarEmailView,
     MeuCentroEsportivoView,
     EstatisticasGerenteView,
-    PagamentoViewSet
+    EstatisticasSerieView,
+    PagamentoViewSet,
+    ProrrogarBloqueioView,
 )
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
@@ -61,13 +74,26 @@ urlpatterns = [
     path('api/token/refresh', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/', include(router.urls)),
     path('api/centros/<int:pk>', Centro_com_espacosRetrieveView.as_view(), name='centro-com-espacos'),
+    path('api/centros/<int:pk>/avaliacoes', AvaliacoesCentroView.as_view(), name='avaliacoes-centro'),
+    path('api/centros/busca', BuscaCentrosView.as_view(), name='busca-centros'),
+    path('api/centros/facetas', FacetasCentrosView.as_view(), name='facetas-centros'),
+    path('api/centros/mapa', CentrosMapaView.as_view(), name='centros-mapa'),
+    path('api/centros/proximos', CentrosProximosView.as_view(), name='centros-proximos'),
     path('api/check-email', VerificarEmailView.as_view(), name='verificar-email'),
     path('api/reservar', ReservaCreateview.as_view(), name='reservar'),
     path('api/me/centros', MeuCentroEsportivoView.as_view(), name='meu-centro-esportivo'),
     path('api/reservas/<int:pk>/cancelar', CancelarReservaView.as_view(), name='cancelar-reserva'),
+    path('api/reservas/<int:pk>/avaliar', AvaliarReservaView.as_view(), name='avaliar-reserva'),
     path('api/reservas/<int:pk>/concluir', ConcluirReservaView.as_view(), name='concluir-reserva'),
+    path('api/horarios_disponiveis/lote', HorariosDisponiveisLoteView.as_view(), name='horarios_disponiveis_lote'),
+    path('api/horarios/busca', BuscaHorariosView.as_view(), name='busca-horarios'),
+    path('api/agendas/<int:pk>/bloquear', BloquearAgendaView.as_view(), name='bloquear-agenda'),
+    path('api/bloqueios/<int:pk>/prorrogar', ProrrogarBloqueioView.as_view(), name='prorrogar-bloqueio'),
+    path('api/espacos/<int:pk>/avaliacoes', AvaliacoesEspacoView.as_view(), name='avaliacoes-espaco'),
     path('api/espacos/<int:espaco_id>/horarios_disponiveis', HorariosDisponiveisView.as_view(), name='horarios_disponiveis'),
+    path('api/espacos/<int:espaco_id>/horarios_disponiveis/intervalo', HorariosDisponiveisIntervaloView.as_view(), name='horarios_disponiveis_intervalo'),
     path('api/estatisticas-gerente', EstatisticasGerenteView.as_view(), name='estatisticas-gerente'),
+    path('api/estatisticas-gerente/serie', EstatisticasSerieView.as_view(), name='estatisticas-gerente-serie'),
 ]
 
 if settings.DEBUG:
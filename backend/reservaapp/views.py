@@ -1,20 +1,24 @@
 from reservaapp.serializers import (
     AgendaSerializer,
+    AvaliacaoSerializer,
+    AvaliacaoPublicaSerializer,
     Centro_com_espacosSerializer,
     CentroEsportivoSerializer,
+    CentroProximoSerializer,
     CustomUserSerializer,
     DashboardGerenteSerializer,
     EspacoEsportivoSerializer,
-    HorarioDisponivelSerializer,
     ReservaDetalhadaSerializer,
     ReservaSerializer,
     PagamentoSerializer,
     AgendaDetalhadaSerializer,
+    BloqueioAgendaSerializer,
+    HorarioBuscaSerializer,
 )
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from rest_framework.generics import CreateAPIView, RetrieveAPIView
+from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveAPIView
 from .models import (
     CustomUser,
     CentroEsportivo,
@@ -22,9 +26,43 @@ from .models import (
     Agenda,
     Reserva,
     Pagamento,
+    EstatisticaDiaria,
+    BloqueioAgenda,
 )
 from rest_framework import viewsets, generics
 from .permissions import IsGerente, IsOrganizador
+from .exceptions import HorarioIndisponivel
+from .bloqueios import bloqueios_de_terceiros, bloquear_agenda, prorrogar_bloqueio
+from .disponibilidade import (
+    MAXIMO_DIAS_INTERVALO,
+    MAXIMO_ESPACOS_LOTE,
+    agendas_livres,
+    horarios_disponiveis,
+    horarios_disponiveis_em_lote,
+    horarios_disponiveis_intervalo,
+)
+from .geo import MAXIMO_ZOOM, agrupar_no_mapa, centros_proximos
+from .busca import buscar_centros
+from .facetas import contar_facetas_em_cache
+from .precos import adiar_recalculo_de_precos, marcar_precos
+from .estatisticas import (
+    CAMPO_POR_STATUS,
+    MAXIMO_DIAS_SERIE,
+    TRUNCAMENTOS,
+    registrar_mudanca_status,
+    registrar_pagamento,
+    remover_pagamento,
+    serie_temporal,
+)
+from .pagination import (
+    PaginacaoAvaliacoes,
+    PaginacaoBusca,
+    PaginacaoBuscaHorarios,
+    PaginacaoPadrao,
+    PaginacaoOrdenavel,
+    PaginacaoRecentes,
+    PaginacaoReservasPagas,
+)
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.exceptions import ValidationError, PermissionDenied
@@ -34,10 +72,17 @@ from .filters import (
     EspacoEsportivoFilter,
     AgendaFilter,
     DashboardFilter,
+    BuscaHorariosFilter,
 )
-from datetime import datetime, time
-from django.db.models import Count, Q
+import math
+from datetime import datetime
+from django.db.models import DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from decimal import Decimal
 from collections import defaultdict
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import parse_etags
 
 
 # view para criação de usuário
@@ -66,6 +111,7 @@ class CentroEsportivoViewSet(viewsets.ModelViewSet):
     queryset = CentroEsportivo.objects.all()
     serializer_class = CentroEsportivoSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsGerente]
+    pagination_class = PaginacaoOrdenavel
     filter_backends = [DjangoFilterBackend]
     filterset_class = CentroEsportivoFilter
 
@@ -75,15 +121,30 @@ class CentroEsportivoViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("Apenas gerentes podem criar centros esportivos.")
         serializer.save(gerente=self.request.user)
 
+    # as agendas apagadas em cascata recalculam os preços uma vez só, no fim
+    def perform_destroy(self, instance):
+        with adiar_recalculo_de_precos():
+            instance.delete()
+
 
 # crud do espaco esportivo, apenas o gerente do seu centro pode criar, editar e deletar
 class EspacoEsportivoViewSet(viewsets.ModelViewSet):
     queryset = EspacoEsportivo.objects.all()
     serializer_class = EspacoEsportivoSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsGerente]
+    pagination_class = PaginacaoOrdenavel
     filter_backends = [DjangoFilterBackend]
     filterset_class = EspacoEsportivoFilter
 
+    # só carrega o centro se o serializer for mostrá-lo (?fields= e ?expand=)
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if EspacoEsportivoSerializer.campo_solicitado(
+            self.request, "centro_esportivo_details"
+        ):
+            queryset = queryset.com_centro_resumido()
+        return queryset
+
     # Override perform_create para atribuir o gerente automaticamente
     def perform_create(self, serializer):
         centro_esportivo = serializer.validated_data.get("centro_esportivo")
@@ -96,12 +157,17 @@ class EspacoEsportivoViewSet(viewsets.ModelViewSet):
             )
         serializer.save()
 
+    def perform_destroy(self, instance):
+        with adiar_recalculo_de_precos():
+            instance.delete()
+
 
 # crud da agenda, apenas o gerente do seu centro pode criar, editar e deletar, com filtros por status, dia e espaço esportivo
 class AgendaViewSet(viewsets.ModelViewSet):
     queryset = Agenda.objects.all()
     serializer_class = AgendaSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsGerente]
+    pagination_class = PaginacaoPadrao
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["status", "dia", "espacoesportivo"]
     filterset_class = AgendaFilter
@@ -125,15 +191,46 @@ class ReservaCreateview(CreateAPIView):
     serializer_class = ReservaSerializer
     permission_classes = [IsOrganizador]
 
-    # atribuir reserva diretamente ao organizador que criou
+    # reserva já existente no mesmo horário (UniqueTogetherValidator) também é conflito,
+    # então quem perde a disputa recebe 409 tanto antes quanto depois do commit do vencedor
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            erros = serializer.errors.get("non_field_errors", [])
+            if any(getattr(erro, "code", None) == "unique" for erro in erros):
+                raise HorarioIndisponivel()
+            raise ValidationError(serializer.errors)
+
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(
+            serializer.data, status=status.HTTP_201_CREATED, headers=headers
+        )
+
+    # atribuir reserva diretamente ao organizador que criou. o horário é tomado com um
+    # compare-and-swap no status da agenda: só um UPDATE consegue trocar "ativo" por
+    # "indisponível", então entre requisições simultâneas só uma cria a reserva e as
+    # outras recebem 409 na hora, sem esperar o validator. horários com bloqueio válido
+    # de outro organizador ficam de fora do UPDATE; o bloqueio do próprio é consumido
     def perform_create(self, serializer):
         agenda = serializer.validated_data.get("agenda")
-        if agenda.status != "ativo":
-            raise ValidationError("Horário não está disponível para reserva.")
+        user = self.request.user
+
+        with transaction.atomic():
+            tomado = (
+                Agenda.objects.filter(pk=agenda.pk, status="ativo")
+                .exclude(pk__in=bloqueios_de_terceiros(user).values("agenda"))
+                .update(status="indisponível")
+            )
+            if not tomado:
+                raise HorarioIndisponivel()
+            agenda.status = "indisponível"
+            # o UPDATE não dispara signals, então o preço mínimo é recalculado aqui
+            marcar_precos(espacos=[agenda.espacoesportivo_id])
+            BloqueioAgenda.objects.filter(agenda=agenda, organizador=user).delete()
 
-        agenda.status = "indisponível"
-        agenda.save()
-        serializer.save(organizador=self.request.user, status="pendente")
+            reserva = serializer.save(organizador=user, status="pendente")
+            registrar_mudanca_status(reserva, None, "pendente")
 
 
 # vai pegar os centros e os espaços dentro dele, retornando os dois juntos (nao ta sendo usado no front)
@@ -142,11 +239,18 @@ class Centro_com_espacosRetrieveView(RetrieveAPIView):
     serializer_class = Centro_com_espacosSerializer
     permission_classes = [AllowAny]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if Centro_com_espacosSerializer.campo_solicitado(self.request, "espacos"):
+            queryset = queryset.prefetch_related("espacos")
+        return queryset
+
 
 # pega as reservas do organizador
 class MinhasReservasListView(viewsets.ReadOnlyModelViewSet):
     serializer_class = ReservaDetalhadaSerializer
     permission_classes = [IsOrganizador]
+    pagination_class = PaginacaoRecentes
 
     # somente retorna as reservas do organizador logado, nao consegue ver as dos outros
     def get_queryset(self):
@@ -184,51 +288,194 @@ class HorariosDisponiveisView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        snapshot = horarios_disponiveis(espaco_id, dia)
+        if snapshot is None:
+            return Response(
+                {"error": "Espaço esportivo não encontrado."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # o cliente que já tem a versão atual recebe 304 sem corpo. a comparação do
+        # If-None-Match é fraca: W/"x" também casa com "x"
+        etags = {
+            etag.removeprefix("W/")
+            for etag in parse_etags(request.headers.get("If-None-Match", ""))
+        }
+        if "*" in etags or snapshot["etag"] in etags:
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": snapshot["etag"]}
+            )
+        return Response(
+            snapshot["horarios"],
+            status=status.HTTP_200_OK,
+            headers={"ETag": snapshot["etag"]},
+        )
+
+
+# horários disponíveis de um espaço em vários dias (semana/mês do calendário), agrupados por
+# dia e período como no HorariosDisponiveisView
+class HorariosDisponiveisIntervaloView(APIView):
+    def get(self, request, espaco_id):
+        inicio_str = request.query_params.get("inicio")
+        fim_str = request.query_params.get("fim")
+        if not inicio_str or not fim_str:
+            return Response(
+                {"error": 'Parâmetros "inicio" e "fim" são obrigatórios.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         try:
-            espaco = EspacoEsportivo.objects.get(id=espaco_id)
-        except EspacoEsportivo.DoesNotExist:
+            inicio = datetime.strptime(inicio_str, "%Y-%m-%d").date()
+            fim = datetime.strptime(fim_str, "%Y-%m-%d").date()
+        except ValueError:
+            return Response(
+                {"error": "Formato de data inválido. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if fim < inicio or (fim - inicio).days >= MAXIMO_DIAS_INTERVALO:
+            return Response(
+                {
+                    "error": f'"fim" deve ser igual ou posterior a "inicio", com no máximo {MAXIMO_DIAS_INTERVALO} dias.'
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dias = horarios_disponiveis_intervalo(espaco_id, inicio, fim)
+        if dias is None:
             return Response(
                 {"error": "Espaço esportivo não encontrado."},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        return Response(dias, status=status.HTTP_200_OK)
 
-        # Busca as agendas disponíveis
-        agendas_disponiveis = Agenda.objects.filter(
-            espacoesportivo=espaco, dia=dia, status="ativo"
-        ).exclude(reserva__status="pago")
 
-        # Agrupar os horários
-        horarios_categorizados = {"manha": [], "tarde": [], "noite": []}
+# horários disponíveis no dia de vários espaços (?espacos=1,2,3) ou de todos os espaços de
+# um centro (?centro=5), agrupados por espaço e período. usa os mesmos snapshots em cache
+# do HorariosDisponiveisView e busca os que faltam numa única consulta
+class HorariosDisponiveisLoteView(APIView):
+    def get(self, request):
+        dia_str = request.query_params.get("dia")
+        if not dia_str:
+            return Response(
+                {"error": 'Parâmetro "dia" é obrigatório.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        for agenda in agendas_disponiveis:
-            hora_inicio = agenda.h_inicial
+        try:
+            dia = datetime.strptime(dia_str, "%Y-%m-%d").date()
+        except ValueError:
+            return Response(
+                {"error": "Formato de data inválido. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            if time(5, 0) <= hora_inicio < time(12, 0):
-                categoria = "manha"
-            elif time(12, 0) <= hora_inicio < time(18, 0):
-                categoria = "tarde"
+        espacos_str = request.query_params.get("espacos")
+        centro_str = request.query_params.get("centro")
+        try:
+            if espacos_str:
+                espaco_ids = list(
+                    dict.fromkeys(int(valor) for valor in espacos_str.split(","))
+                )
+            elif centro_str:
+                espaco_ids = list(
+                    EspacoEsportivo.objects.filter(centro_esportivo_id=int(centro_str))
+                    .order_by("id")
+                    .values_list("id", flat=True)
+                )
             else:
-                categoria = "noite"
+                return Response(
+                    {"error": 'Informe "espacos" ou "centro".'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        except ValueError:
+            return Response(
+                {"error": "Identificadores inválidos."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(espaco_ids) > MAXIMO_ESPACOS_LOTE:
+            return Response(
+                {"error": f"Informe no máximo {MAXIMO_ESPACOS_LOTE} espaços."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        snapshots = horarios_disponiveis_em_lote(espaco_ids, dia)
+        return Response(
+            {
+                espaco_id: snapshots[espaco_id]["horarios"]
+                for espaco_id in espaco_ids
+                if espaco_id in snapshots
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+# busca horários livres em todos os espaços (cidade/UF, categoria, dia, janela de horário e
+# preço máximo), numa única consulta com o espaço e o centro no mesmo join
+class BuscaHorariosView(ListAPIView):
+    serializer_class = HorarioBuscaSerializer
+    permission_classes = [AllowAny]
+    pagination_class = PaginacaoBuscaHorarios
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = BuscaHorariosFilter
+
+    def get_queryset(self):
+        return agendas_livres().select_related("espacoesportivo__centro_esportivo")
+
+
+# bloqueia temporariamente um horário para o organizador enquanto ele conclui a reserva
+class BloquearAgendaView(APIView):
+    permission_classes = [IsAuthenticated, IsOrganizador]
 
-            horarios_categorizados[categoria].append(
-                HorarioDisponivelSerializer(agenda).data
+    def post(self, request, pk):
+        try:
+            agenda = Agenda.objects.get(pk=pk)
+        except Agenda.DoesNotExist:
+            return Response(
+                {"error": "Agenda não encontrada."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        return Response(horarios_categorizados, status=status.HTTP_200_OK)
+        bloqueio, criado = bloquear_agenda(agenda, request.user)
+        return Response(
+            BloqueioAgendaSerializer(bloqueio).data,
+            status=status.HTTP_201_CREATED if criado else status.HTTP_200_OK,
+        )
+
+
+# prorroga uma única vez o bloqueio do organizador logado
+class ProrrogarBloqueioView(APIView):
+    permission_classes = [IsAuthenticated, IsOrganizador]
+
+    def post(self, request, pk):
+        bloqueio = prorrogar_bloqueio(pk, request.user)
+        if bloqueio is None:
+            return Response(
+                {"error": "Bloqueio não encontrado, expirado ou já prorrogado."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            BloqueioAgendaSerializer(bloqueio).data, status=status.HTTP_200_OK
+        )
 
 
 # dashboard do gerente com as reservas do seu centro esportivo
 class GerenteDashboardViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = DashboardGerenteSerializer
     permission_classes = [IsAuthenticated, IsGerente]
+    pagination_class = PaginacaoRecentes
     filter_backends = [DjangoFilterBackend]
     filterset_class = DashboardFilter
 
     def get_queryset(self):
         user = self.request.user
-        return Reserva.objects.filter(
-            agenda__espacoesportivo__centro_esportivo__gerente=user
-        ).order_by("-criado_em")
+        # a ordenação (mais recentes primeiro) vem da paginação. o filtro usa o gerente
+        # copiado na própria reserva. o select_related traz tudo que o
+        # DashboardGerenteSerializer lê num único join; o pagamento é um one-to-one
+        # reverso, então reservas sem pagamento ficam com ele em cache como ausente
+        return Reserva.objects.filter(gerente=user).select_related(
+            "organizador", "agenda__espacoesportivo", "pagamento"
+        )
 
 
 # view para cancelar a reserva, apenas o gerente do centro pode cancelar
@@ -242,9 +489,7 @@ class CancelarReservaView(APIView):
 
             # Verificação de Permissão Manual
             is_dono_reserva = reserva.organizador == user
-            is_dono_espaco = (
-                reserva.agenda.espacoesportivo.centro_esportivo.gerente == user
-            )
+            is_dono_espaco = reserva.gerente_id == user.id
 
             # Se não for nem um nem outro, bloqueia
             if not is_dono_reserva and not is_dono_espaco:
@@ -263,14 +508,18 @@ class CancelarReservaView(APIView):
             # Opcional: Impedir cancelamento de jogos que já aconteceram
             # if reserva.agenda.dia < timezone.now().date(): ...
 
-            # Executa o cancelamento
-            reserva.status = "cancelada"
-            reserva.cancelar_reserva = datetime.now()
-            reserva.save()
+            with transaction.atomic():
+                # Executa o cancelamento
+                status_anterior = reserva.status
+                reserva.status = "cancelada"
+                reserva.cancelar_reserva = datetime.now()
+                reserva.save()
+
+                # Libera a agenda novamente
+                reserva.agenda.status = "ativo"
+                reserva.agenda.save()
 
-            # Libera a agenda novamente
-            reserva.agenda.status = "ativo"
-            reserva.agenda.save()
+                registrar_mudanca_status(reserva, status_anterior, "cancelada")
 
             return Response(
                 {"message": "Reserva cancelada com sucesso."}, status=status.HTTP_200_OK
@@ -282,6 +531,86 @@ class CancelarReservaView(APIView):
             )
 
 
+# avaliação da reserva pelo organizador que a fez, depois de concluída. o resumo de
+# avaliações do centro e do espaço é atualizado pelo signal da reserva só com a diferença
+# das notas; a reserva é relida com lock para a diferença partir das notas atuais
+class AvaliarReservaView(APIView):
+    permission_classes = [IsOrganizador]
+
+    def post(self, request, pk):
+        with transaction.atomic():
+            reserva = (
+                Reserva.objects.select_for_update()
+                .select_related("agenda")
+                .filter(pk=pk)
+                .first()
+            )
+            if reserva is None:
+                return Response(
+                    {"error": "Reserva não encontrada."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            if reserva.organizador_id != request.user.id:
+                return Response(
+                    {"error": "Você não tem permissão para avaliar esta reserva."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            if reserva.status != "pago":
+                return Response(
+                    {"error": "Apenas reservas concluídas podem ser avaliadas."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            serializer = AvaliacaoSerializer(reserva, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save(avaliado_em=timezone.now())
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+# avaliações de um centro (ou de um espaço, em AvaliacoesEspacoView), das mais recentes
+# para as mais antigas. o filtro repete avaliado_em IS NOT NULL para a consulta usar o
+# índice parcial das reservas avaliadas, e só as colunas mostradas são lidas
+class AvaliacoesCentroView(ListAPIView):
+    serializer_class = AvaliacaoPublicaSerializer
+    permission_classes = [AllowAny]
+    pagination_class = PaginacaoAvaliacoes
+    filter_backends = []
+    modelo = CentroEsportivo
+    campo = "centro_esportivo"
+    nao_encontrado = "Centro esportivo não encontrado."
+
+    def list(self, request, *args, **kwargs):
+        if not self.modelo.objects.filter(pk=kwargs["pk"]).exists():
+            return Response(
+                {"error": self.nao_encontrado}, status=status.HTTP_404_NOT_FOUND
+            )
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return (
+            Reserva.objects.filter(
+                **{self.campo: self.kwargs["pk"]}, avaliado_em__isnull=False
+            )
+            .select_related("organizador")
+            .only(
+                "id",
+                "nota_atendimento",
+                "nota_espacoesportivo",
+                "nota_limpeza",
+                "comentario_avaliacao",
+                "avaliado_em",
+                "organizador__nome_completo",
+            )
+        )
+
+
+class AvaliacoesEspacoView(AvaliacoesCentroView):
+    modelo = EspacoEsportivo
+    campo = "espacoesportivo"
+    nao_encontrado = "Espaço esportivo não encontrado."
+
+
 # view para concluir a reserva, apenas o gerente do centro pode concluir
 class ConcluirReservaView(APIView):
     permission_classes = [IsAuthenticated, IsGerente]
@@ -292,7 +621,7 @@ class ConcluirReservaView(APIView):
             reserva = Reserva.objects.get(pk=pk)
 
             # Verificar se o gerente tem permissão para esta reserva
-            if reserva.agenda.espacoesportivo.centro_esportivo.gerente != request.user:
+            if reserva.gerente_id != request.user.id:
                 return Response(
                     {"error": "Você não tem permissão para concluir esta reserva."},
                     status=status.HTTP_403_FORBIDDEN,
@@ -306,8 +635,11 @@ class ConcluirReservaView(APIView):
                 )
 
             # Marcar como pago (concluída)
-            reserva.status = "pago"
-            reserva.save()
+            with transaction.atomic():
+                status_anterior = reserva.status
+                reserva.status = "pago"
+                reserva.save()
+                registrar_mudanca_status(reserva, status_anterior, "pago")
 
             return Response(
                 {"message": "Reserva concluída com sucesso."}, status=status.HTTP_200_OK
@@ -319,6 +651,132 @@ class ConcluirReservaView(APIView):
             )
 
 
+# contagem de centros por UF, cidade e categoria para os filtros da busca, aplicando os
+# mesmos parâmetros do CentroEsportivoFilter
+class FacetasCentrosView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        filtro = CentroEsportivoFilter(
+            request.query_params, queryset=CentroEsportivo.objects.all()
+        )
+        if not filtro.is_valid():
+            return Response(filtro.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(contar_facetas_em_cache(filtro.qs, request.query_params))
+
+
+# busca textual de centros (?q=) por nome, descrição, cidade e nomes dos espaços, do mais
+# relevante para o menos relevante. o índice devolve os ids ranqueados e só os centros da
+# página são carregados, com o resumo, numa única consulta
+class BuscaCentrosView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        termo = request.query_params.get("q", "").strip()
+        if not termo:
+            return Response(
+                {"error": 'Parâmetro "q" é obrigatório.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        paginador = PaginacaoBusca()
+        ids = paginador.paginate_queryset(buscar_centros(termo), request, view=self)
+        centros = CentroEsportivo.objects.in_bulk(ids)
+        serializer = CentroEsportivoSerializer(
+            [centros[centro_id] for centro_id in ids if centro_id in centros],
+            many=True,
+            context={"request": request},
+        )
+        return paginador.get_paginated_response(serializer.data)
+
+
+# centros mais próximos de um ponto (?lat=&lon=), do mais perto para o mais longe, com a
+# distância em km. ?raio= limita a distância e ?k= a quantidade (padrão 20, máximo 100)
+class CentrosProximosView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            lat = float(request.query_params["lat"])
+            lon = float(request.query_params["lon"])
+            k = int(request.query_params.get("k", 20))
+            raio = request.query_params.get("raio")
+            raio = float(raio) if raio is not None else None
+        except (KeyError, ValueError):
+            return Response(
+                {
+                    "error": 'Informe "lat" e "lon" numéricos; "raio" e "k" são opcionais.'
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return Response(
+                {"error": "Coordenadas fora do intervalo válido."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 1 <= k <= 100 or (raio is not None and raio <= 0):
+            return Response(
+                {"error": '"k" deve estar entre 1 e 100 e "raio" deve ser positivo.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        proximos = centros_proximos(lat, lon, k, raio)
+
+        # só os centros escolhidos são carregados, numa única consulta
+        centros = CentroEsportivo.objects.in_bulk(
+            [centro_id for _, centro_id in proximos]
+        )
+        resultado = []
+        for distancia, centro_id in proximos:
+            centro = centros[centro_id]
+            centro.distancia_km = round(distancia, 3)
+            resultado.append(centro)
+
+        serializer = CentroProximoSerializer(
+            resultado, many=True, context={"request": request}
+        )
+        return Response(serializer.data)
+
+
+# centros agrupados numa grade para o mapa: recebe o retângulo visível (lat_min, lat_max,
+# lon_min, lon_max) e o zoom, e devolve por célula o total, o centróide e o centro mais
+# bem avaliado
+class CentrosMapaView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            coordenadas = [
+                float(request.query_params[nome])
+                for nome in ("lat_min", "lat_max", "lon_min", "lon_max")
+            ]
+            # float() aceita "nan" e "inf", que não passam nas comparações de faixa
+            if not all(math.isfinite(valor) for valor in coordenadas):
+                raise ValueError
+            lat_min, lat_max, lon_min, lon_max = coordenadas
+            zoom = int(request.query_params["zoom"])
+        except (KeyError, ValueError):
+            return Response(
+                {
+                    "error": 'Informe "lat_min", "lat_max", "lon_min", "lon_max" e "zoom" numéricos.'
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not 0 <= zoom <= MAXIMO_ZOOM or lat_min > lat_max or lon_min > lon_max:
+            return Response(
+                {
+                    "error": f'"zoom" deve estar entre 0 e {MAXIMO_ZOOM} e os mínimos não podem passar dos máximos.'
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        lat_min, lat_max = max(lat_min, -90), min(lat_max, 90)
+        lon_min, lon_max = max(lon_min, -180), min(lon_max, 180)
+        return Response(agrupar_no_mapa(lat_min, lat_max, lon_min, lon_max, zoom))
+
+
 # view para listar os centros esportivos do gerente logado
 class MeuCentroEsportivoView(APIView):
     permission_classes = [IsGerente]
@@ -338,68 +796,149 @@ class EstatisticasGerenteView(APIView):
 
     def get(self, request):
         user = request.user
-        reservas = Reserva.objects.filter(
-            agenda__espacoesportivo__centro_esportivo__gerente=user
+        reservas = Reserva.objects.filter(gerente=user)
+
+        # os números vêm da tabela pré-agregada EstatisticaDiaria (poucas linhas por
+        # espaço/dia/horário), mantida pelas views que mudam o status das reservas
+        estatisticas = EstatisticaDiaria.objects.filter(centro_esportivo__gerente=user)
+        total_linha = F("pendentes") + F("pagas") + F("canceladas")
+
+        totais = estatisticas.aggregate(
+            arrecadacao_total=Coalesce(
+                Sum("arrecadacao"),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            **{
+                status_reserva: Coalesce(Sum(campo), 0)
+                for status_reserva, campo in CAMPO_POR_STATUS.items()
+            },
         )
 
-        stats_status = (
-            reservas.values("status").annotate(total=Count("id")).order_by("-total")
+        stats_status = sorted(
+            (
+                {"status": status_reserva, "total": totais[status_reserva]}
+                for status_reserva in CAMPO_POR_STATUS
+                if totais[status_reserva]
+            ),
+            key=lambda item: -item["total"],
         )
 
         espacos_populares = (
-            reservas.values(
-                "agenda__espacoesportivo__nome", "agenda__espacoesportivo__categoria"
+            estatisticas.values(
+                agenda__espacoesportivo__nome=F("espacoesportivo__nome"),
+                agenda__espacoesportivo__categoria=F("categoria"),
             )
-            .annotate(total_reservas=Count("id"))
+            .annotate(total_reservas=Sum(total_linha))
             .order_by("-total_reservas")[:5]
         )
 
         horarios_populares = (
-            reservas.values("agenda__h_inicial", "agenda__h_final")
-            .annotate(total_reservas=Count("id"))
+            estatisticas.values(
+                agenda__h_inicial=F("h_inicial"), agenda__h_final=F("h_final")
+            )
+            .annotate(total_reservas=Sum(total_linha))
             .order_by("-total_reservas")[:5]
         )
 
         categorias_populares = (
-            reservas.values("agenda__espacoesportivo__categoria")
-            .annotate(total_reservas=Count("id"))
+            estatisticas.values(agenda__espacoesportivo__categoria=F("categoria"))
+            .annotate(total_reservas=Sum(total_linha))
             .order_by("-total_reservas")
         )
 
-        arrecadacao_total = sum(
-            reserva.agenda.preco for reserva in reservas if reserva.status == "pago"
-        )
-
-        reservas_concluidas = (
-            reservas.filter(status="pago")
-            .values(
+        # as reservas pagas vêm paginadas por cursor, o restante segue em ?cursor=
+        paginador = PaginacaoReservasPagas()
+        reservas_concluidas = paginador.paginate_queryset(
+            reservas.filter(status="pago").values(
+                "id",
                 "agenda__espacoesportivo__nome",
                 "agenda__dia",
                 "organizador__nome_completo",
                 "criado_em",
-            )
-            .order_by("-criado_em")
+            ),
+            request,
+            view=self,
         )
 
         return Response(
             {
-                "resumo_status": list(stats_status),
+                "resumo_status": stats_status,
                 "espacos_mais_reservados": list(espacos_populares),
                 "horarios_mais_reservados": list(horarios_populares),
                 "categorias_mais_populares": list(categorias_populares),
-                "total_reservas": reservas.count(),
-                "reservas_canceladas": reservas.filter(status="cancelada").count(),
-                "reservas_pagas": list(reservas_concluidas),
-                "arrecadacao_total": arrecadacao_total,
+                "total_reservas": sum(
+                    totais[status_reserva] for status_reserva in CAMPO_POR_STATUS
+                ),
+                "reservas_canceladas": totais["cancelada"],
+                "reservas_pagas": reservas_concluidas,
+                "reservas_pagas_proximo": paginador.get_next_link(),
+                "arrecadacao_total": totais["arrecadacao_total"],
             }
         )
 
 
+# série temporal de reservas, arrecadação e ocupação do gerente por dia/semana/mês, em formato colunar para gráficos
+class EstatisticasSerieView(APIView):
+    permission_classes = [IsAuthenticated, IsGerente]
+
+    def get(self, request):
+        try:
+            inicio = datetime.strptime(
+                request.query_params.get("inicio", ""), "%Y-%m-%d"
+            ).date()
+            fim = datetime.strptime(
+                request.query_params.get("fim", ""), "%Y-%m-%d"
+            ).date()
+        except ValueError:
+            return Response(
+                {
+                    "error": 'Parâmetros "inicio" e "fim" são obrigatórios no formato YYYY-MM-DD.'
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if fim < inicio:
+            return Response(
+                {"error": 'O parâmetro "fim" deve ser igual ou posterior a "inicio".'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        granularidade = request.query_params.get("granularidade", "dia")
+        if granularidade not in TRUNCAMENTOS:
+            return Response(
+                {"error": 'Granularidade inválida. Use "dia", "semana" ou "mes".'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if (fim - inicio).days >= MAXIMO_DIAS_SERIE[granularidade]:
+            return Response(
+                {
+                    "error": f'Com granularidade "{granularidade}" o intervalo pode ter no máximo {MAXIMO_DIAS_SERIE[granularidade]} dias.'
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        filtros = {}
+        for parametro in ("centro", "espaco"):
+            valor = request.query_params.get(parametro)
+            if valor is None:
+                continue
+            if not valor.isdigit():
+                return Response(
+                    {"error": f'Parâmetro "{parametro}" deve ser um id numérico.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            filtros[parametro] = int(valor)
+
+        serie = serie_temporal(request.user, inicio, fim, granularidade, **filtros)
+        return Response(serie, status=status.HTTP_200_OK)
+
+
 # viewset para o pagamento, apenas o organizador pode criar o pagamento da sua reserva
 class PagamentoViewSet(viewsets.ModelViewSet):
     queryset = Pagamento.objects.all()
     serializer_class = PagamentoSerializer
     permission_classes = [IsAuthenticated, IsOrganizador]
+    pagination_class = PaginacaoRecentes
 
     def perform_create(self, serializer):
         reserva = serializer.validated_data.get("reserva")
@@ -420,6 +959,18 @@ class PagamentoViewSet(viewsets.ModelViewSet):
                 f"O pagamento mínimo é de 50% do valor total (R$ {valor_total_reserva / 2:.2f})."
             )
 
-        pagamento = serializer.save(confirmado=False)
+        with transaction.atomic():
+            pagamento = serializer.save(confirmado=False)
+            registrar_pagamento(pagamento)
         # Mantém o status da reserva como 'pendente' para confirmação manual
         # O status só será alterado para 'pago' quando um gerente confirmar o pagamento
+
+    # o valor (ou a reserva) do pagamento pode mudar: sai o valor anterior do horário
+    # antigo e entra o novo
+    def perform_update(self, serializer):
+        agenda_anterior = serializer.instance.reserva.agenda
+        valor_anterior = serializer.instance.valor
+        with transaction.atomic():
+            pagamento = serializer.save()
+            remover_pagamento(agenda_anterior, valor_anterior)
+            registrar_pagamento(pagamento)
@@ -11,15 +11,15 @@ Feature: Testes de Agendas - API Reserva
     When method get
     Then status 200
     
-    And match response == '#array'
-    * print 'Total de agendas:', response.length
+    And match response.results == '#array'
+    * print 'Total de agendas:', response.results.length
 
   Scenario: Consultar agenda específica
     Given path 'agendas'
     And header Authorization = 'Bearer ' + tokenGerente
     When method get
     Then status 200
-    * def agendaId = response[0].id
+    * def agendaId = response.results[0].id
     
     Given path 'agendas', agendaId
     And header Authorization = 'Bearer ' + tokenGerente
@@ -39,7 +39,7 @@ Feature: Testes de Agendas - API Reserva
     And header Authorization = 'Bearer ' + tokenGerente
     When method get
     Then status 200
-    * def espacoId = response[0].id
+    * def espacoId = response.results[0].id
     * def randomDay = '' + (Math.floor(Math.random() * 28) + 1)
     * def diaFormatado = randomDay.length == 1 ? '0' + randomDay : randomDay
     * def diaUnico = '2027-03-' + diaFormatado
@@ -89,7 +89,7 @@ Feature: Testes de Agendas - API Reserva
     When method get
     Then status 200
     
-    And match response[0] contains
+    And match response.results[0] contains
       """
       {
         id: '#number',
@@ -108,4 +108,4 @@ Feature: Testes de Agendas - API Reserva
     Then status 200
     
     # Valida que todos os status são strings
-    And match each response[*].status == '#string'
+    And match each response.results[*].status == '#string'
@@ -12,8 +12,8 @@ Feature: Testes de Centros Esportivos - API Reserva
     When method get
     Then status 200
     
-    And match response == '#array'
-    * print 'Total de centros esportivos:', response.length
+    And match response.results == '#array'
+    * print 'Total de centros esportivos:', response.results.length
 
   Scenario: Consultar centro esportivo específico
     # Primeiro lista para pegar um ID válido
@@ -21,7 +21,7 @@ Feature: Testes de Centros Esportivos - API Reserva
     And header Authorization = 'Bearer ' + tokenGerente
     When method get
     Then status 200
-    * def centroId = response[0].id
+    * def centroId = response.results[0].id
     
     Given path 'centros', centroId
     And header Authorization = 'Bearer ' + tokenGerente
@@ -80,7 +80,7 @@ Feature: Testes de Centros Esportivos - API Reserva
     When method get
     Then status 200
     
-    And match response[0] contains
+    And match response.results[0] contains
       """
       {
         id: '#number',
@@ -11,15 +11,15 @@ Feature: Testes de Espaços Esportivos - API Reserva
     When method get
     Then status 200
     
-    And match response == '#array'
-    * print 'Total de espaços esportivos:', response.length
+    And match response.results == '#array'
+    * print 'Total de espaços esportivos:', response.results.length
 
   Scenario: Consultar espaço esportivo específico
     Given path 'espacos'
     And header Authorization = 'Bearer ' + tokenGerente
     When method get
     Then status 200
-    * def espacoId = response[0].id
+    * def espacoId = response.results[0].id
     
     Given path 'espacos', espacoId
     And header Authorization = 'Bearer ' + tokenGerente
@@ -37,7 +37,7 @@ Feature: Testes de Espaços Esportivos - API Reserva
     And header Authorization = 'Bearer ' + tokenGerente
     When method get
     Then status 200
-    * def centroId = response[0].id
+    * def centroId = response.results[0].id
     * def nomeUnico = 'Quadra Karate ' + java.util.UUID.randomUUID().toString().substring(0,8)
     
     # Cria o espaço
@@ -80,4 +80,4 @@ Feature: Testes de Espaços Esportivos - API Reserva
     Then status 200
     
     # Valida que todas as categorias são strings
-    And match each response[*].categoria == '#string'
+    And match each response.results[*].categoria == '#string'
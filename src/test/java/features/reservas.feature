@@ -15,8 +15,8 @@ Feature: Testes de Reservas - API Reserva
     When method get
     Then status 200
     
-    And match response == '#array'
-    * print 'Total de minhas reservas:', response.length
+    And match response.results == '#array'
+    * print 'Total de minhas reservas:', response.results.length
 
   Scenario: Criar reserva com sucesso
     # Primeiro obtém uma agenda ativa
@@ -24,7 +24,7 @@ Feature: Testes de Reservas - API Reserva
     And header Authorization = 'Bearer ' + tokenGerente
     When method get
     Then status 200
-    * def agendasAtivas = karate.filter(response, function(x){ return x.status == 'ativo' })
+    * def agendasAtivas = karate.filter(response.results, function(x){ return x.status == 'ativo' })
     * def agendaId = agendasAtivas[0].id
     
     # Cria a reserva
@@ -52,8 +52,8 @@ Feature: Testes de Reservas - API Reserva
     Then status 200
     
     # Se houver reservas, valida o schema
-    * def temReservas = response.length > 0
-    * if (temReservas) karate.match(response[0], { id: '#number', status: '#string', agenda: '#object' })
+    * def temReservas = response.results.length > 0
+    * if (temReservas) karate.match(response.results[0], { id: '#number', status: '#string', agenda: '#object' })
 
   Scenario: Listar reservas sem autenticação (deve falhar)
     Given path 'minhas-reservas'
@@ -68,7 +68,7 @@ Feature: Testes de Reservas - API Reserva
     
     # Status deve ser um dos valores válidos
     * def statusValidos = ['pendente', 'pago', 'cancelada']
-    * def reservasFiltradas = karate.filter(response, function(x){ return x.status == '<status>' })
+    * def reservasFiltradas = karate.filter(response.results, function(x){ return x.status == '<status>' })
     
     Examples:
       | status    |